@@ -1,23 +1,49 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 from datetime import datetime, timezone, timedelta
 
 from app.models.event import Event
 from app.services.event_service import EventService
+from app.services.event_partitions import EventPartitions
 from app.services.database import Database
+from app.utils.streaming import streaming_response
+from app.utils.fast_json import json_response
+from app.config import settings
 
 router = APIRouter()
 
 @router.get("/recent")
-async def get_recent_events():
+async def get_recent_events(
+    format: str = Query("json", regex="^(json|ndjson)$", description="json array or ndjson stream"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
     """Get active events from last 2 hours only"""
-    return await EventService.get_recent_events()
+    if limit or cursor:
+        try:
+            return json_response(await EventService.get_recent_events_page(
+                limit or settings.MAX_PAGE_SIZE, cursor, raw=settings.FAST_JSON
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return streaming_response(EventService.stream_recent_events(raw=settings.FAST_JSON), format)
 
 @router.get("/archived")
-async def get_archived_events():
+async def get_archived_events(
+    format: str = Query("json", regex="^(json|ndjson)$", description="json array or ndjson stream"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
     """Get archived events (2-48 hours old)"""
-    return await EventService.get_archived_events()
+    if limit or cursor:
+        try:
+            return json_response(await EventService.get_archived_events_page(
+                limit or settings.MAX_PAGE_SIZE, cursor, raw=settings.FAST_JSON
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return streaming_response(EventService.stream_archived_events(raw=settings.FAST_JSON), format)
 
 @router.get("/stats", response_model=List[Dict])
 async def get_event_stats(
@@ -30,6 +56,21 @@ async def get_event_stats(
         logging.error(f"Error getting event stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve event statistics: {str(e)}")
 
+@router.get("/timeseries", response_model=List[Dict])
+async def get_event_timeseries(
+    hours: int = Query(48, description="Hours to look back for statistics"),
+    bucket: str = Query("5m", description="Bucket size such as 1m, 5m, 1h or 1d"),
+    trigger_id: Optional[str] = Query(None, description="Only include this trigger")
+):
+    """Get event statistics per time bucket"""
+    try:
+        return await EventService.get_event_timeseries(hours, bucket, trigger_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error getting event timeseries: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve event timeseries: {str(e)}")
+
 @router.post("/test/create_past_event", response_model=Dict)
 async def create_past_event(hours_ago: int = Query(3, description="Hours in the past")):
     """Create a test event with timestamp in the past"""
@@ -49,7 +90,8 @@ async def create_past_event(hours_ago: int = Query(3, description="Hours in the
             "expiry_time": past_time + timedelta(hours=48)
         }
         
-        event_id = await Database.insert_one("events", event)
+        collection = await EventPartitions.collection_for_write(past_time)
+        event_id = await Database.insert_one(collection, event)
         
         # Trigger archival check
         await EventService.archive_events()
@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, Dict
+from fastapi.responses import JSONResponse
+from typing import List, Optional, Dict, Union
 from app.models.trigger import TriggerCreate, TriggerUpdate, TriggerType
 from app.services.trigger_service import TriggerService
+from app.services.execution_queue import ExecutionQueue
+from app.services.resilience import TriggerExecutionError
+from app.services.payload_validator import PayloadValidator, PayloadValidationError, compile_schema
 from app.utils.scheduler import execute_api_trigger
+from app.utils.fast_json import json_response
+from app.config import settings
 import logging
 from bson.objectid import ObjectId
 
@@ -23,14 +29,22 @@ async def create_trigger(trigger: TriggerCreate):
         logging.error(f"Error creating trigger: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create trigger")
 
-@router.get("/", response_model=List[Dict])
+@router.get("/", response_model=Union[List[Dict], Dict])
 async def get_all_triggers(
-    active_only: bool = Query(True, description="Only show active triggers")
+    active_only: bool = Query(True, description="Only show active triggers"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """Get all non-deleted triggers"""
     try:
-        triggers = await TriggerService.get_all_triggers(active_only=active_only)
-        return triggers
+        if limit or cursor:
+            return json_response(await TriggerService.get_triggers_page(
+                limit or settings.MAX_PAGE_SIZE, cursor, active_only=active_only, raw=settings.FAST_JSON
+            ))
+        triggers = await TriggerService.get_all_triggers(active_only=active_only, raw=settings.FAST_JSON)
+        return json_response(triggers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting triggers: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve triggers: {str(e)}")
@@ -87,6 +101,9 @@ async def update_trigger(trigger_id: str, trigger: TriggerUpdate):
                 detail="Cannot update inactive trigger"
             )
 
+        if trigger.api_config:
+            compile_schema(trigger.api_config.get("payload_schema"))
+
         success = await TriggerService.update_trigger(trigger_id, trigger)
         if not success:
             raise HTTPException(
@@ -138,7 +155,8 @@ async def test_trigger(trigger: TriggerCreate):
             await execute_api_trigger(
                 "test",
                 trigger.api_config.model_dump(),
-                is_test=True
+                is_test=True,
+                max_attempts=1
             )
             return {"message": "API trigger tested successfully"}
         else:
@@ -151,8 +169,20 @@ async def test_trigger(trigger: TriggerCreate):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/executions/{execution_id}", response_model=Dict)
+async def get_execution(execution_id: str):
+    """Get the status of a queued execution"""
+    execution = await ExecutionQueue.get_execution(execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
 @router.post("/{trigger_id}/execute")
-async def execute_trigger(trigger_id: str, payload: Optional[Dict] = None):
+async def execute_trigger(
+    trigger_id: str,
+    payload: Optional[Dict] = None,
+    mode: str = Query("sync", regex="^(sync|async)$", description="async queues the call and returns 202")
+):
     """Manually execute an API trigger"""
     try:
         trigger = await TriggerService.get_trigger(trigger_id)
@@ -160,12 +190,53 @@ async def execute_trigger(trigger_id: str, payload: Optional[Dict] = None):
             raise HTTPException(status_code=404, detail="Trigger not found")
 
         if trigger["trigger_type"] == "api":
-            await execute_api_trigger(
+            # A missing payload must still satisfy the schema's required fields
+            try:
+                PayloadValidator.validate(
+                    trigger_id,
+                    trigger.get("updated_at"),
+                    trigger["api_config"].get("payload_schema"),
+                    payload if payload is not None else {}
+                )
+            except PayloadValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors)
+
+        if trigger["trigger_type"] == "api" and mode == "async":
+            execution_id = await ExecutionQueue.enqueue(
                 trigger_id,
                 trigger["api_config"],
                 payload,
                 is_manual=True
             )
+            return JSONResponse(
+                status_code=202,
+                content={"execution_id": execution_id, "status": "queued"}
+            )
+        elif trigger["trigger_type"] == "api":
+            try:
+                await execute_api_trigger(
+                    trigger_id,
+                    trigger["api_config"],
+                    payload,
+                    is_manual=True
+                )
+            except TriggerExecutionError as e:
+                if not e.will_retry:
+                    raise HTTPException(status_code=502, detail=str(e))
+                # Retry from the execution queue instead of holding this request open
+                execution_id = await ExecutionQueue.enqueue(
+                    trigger_id,
+                    trigger["api_config"],
+                    payload,
+                    is_manual=True,
+                    attempts=e.attempt,
+                    delay_seconds=e.retry_delay,
+                    error_message=str(e)
+                )
+                return JSONResponse(
+                    status_code=202,
+                    content={"execution_id": execution_id, "status": "retrying"}
+                )
             return {"message": "Trigger executed successfully"}
         else:
             raise HTTPException(
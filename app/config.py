@@ -6,6 +6,12 @@ class Settings(BaseSettings):
     MONGODB_URL: str = os.getenv('MONGODB_URL', '')
     DATABASE_NAME: str = os.getenv('DATABASE_NAME', 'event_triggers')
     ENVIRONMENT: str = os.getenv('ENVIRONMENT', 'production')
+    DB_CURSOR_BATCH_SIZE: int = 500
+    STREAM_CHUNK_SIZE: int = 100
+    STREAM_PREFETCH_SIZE: int = 1000
+    MAX_PAGE_SIZE: int = 1000
+    # Serve list endpoints from raw BSON through orjson instead of jsonable_encoder
+    FAST_JSON: bool = False
     
     # Application settings
     APP_NAME: str = "Event Trigger Platform"
@@ -15,11 +21,110 @@ class Settings(BaseSettings):
     EVENT_ACTIVE_HOURS: int = 2
     EVENT_ARCHIVE_HOURS: int = 46
     EVENT_TOTAL_RETENTION_HOURS: int = 48
+    RETENTION_SWEEP_INTERVAL_SECONDS: int = 60
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_MAX_BATCHES_PER_RUN: int = 100
+    RETENTION_MIN_BATCH_SIZE: int = 100
+    RETENTION_BATCH_TIME_BUDGET_MS: int = 500
+    RETENTION_RUN_TIME_BUDGET_SECONDS: int = 30
+    RETENTION_BATCH_PAUSE_MS: int = 0
+    # "none" keeps every event in one collection; "daily" or "hourly" writes to
+    # events_YYYYMMDD / events_YYYYMMDDHH partitions that expire by dropping them
+    EVENT_PARTITIONING: str = "none"
+    # Move archived events to the compressed events_archive collection
+    ARCHIVE_TIER: bool = False
+    ARCHIVE_COMPRESSION_LEVEL: int = 3
+    # Store api_payload/response_data bodies once in the blobs collection, keyed by
+    # content hash; leave on while events written with it are still retained
+    EVENT_BLOB_DEDUP: bool = False
+    EVENT_BLOB_MIN_BYTES: int = 256
+    EVENT_BLOB_CACHE_SIZE: int = 10000
     
+    # "all" runs the API and the background tier in one process, "api" only
+    # serves requests and "worker" is set for `python -m app.worker`
+    PROCESS_ROLE: str = os.getenv('PROCESS_ROLE', 'all')
+
     # Scheduler settings
     MIN_INTERVAL_MINUTES: int = 5
     MIN_INTERVAL_HOURS: int = 1
     MIN_INTERVAL_DAYS: int = 1
+    SCHEDULER_REHYDRATE_BATCH_SIZE: int = 5000
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 60
+    # "none" runs the scheduler in every process, "leader" only in the lease holder
+    SCHEDULER_COORDINATION: str = "none"
+    LEADER_LEASE_SECONDS: int = 15
+    LEADER_RENEW_INTERVAL_SECONDS: int = 5
+    # "apscheduler", "timing_wheel" (compact in-process wheel for very large trigger
+    # counts) or "polling" (every process claims due triggers by next_run_at)
+    SCHEDULER_ENGINE: str = "apscheduler"
+    TIMING_WHEEL_TICK_MS: int = 100
+    SCHEDULER_POLL_INTERVAL_MS: int = 1000
+    SCHEDULER_POLL_BATCH_SIZE: int = 100
+    SCHEDULER_CLAIM_LEASE_SECONDS: int = 60
+
+    # Redis settings
+    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # Trigger cache settings
+    TRIGGER_CACHE_ENABLED: bool = True
+    TRIGGER_CACHE_MAX_SIZE: int = 10000
+    TRIGGER_CACHE_TTL_SECONDS: int = 300
+
+    # Outbound HTTP client settings
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 10.0
+    HTTP_WRITE_TIMEOUT_SECONDS: float = 10.0
+    HTTP_POOL_TIMEOUT_SECONDS: float = 5.0
+
+    # Outbound limits per trigger (api_config can override each of these);
+    # a rate of 0 disables the token bucket
+    TRIGGER_MAX_CONCURRENCY: int = 10
+    TRIGGER_RATE_LIMIT_PER_SECOND: float = 0.0
+    TRIGGER_RATE_LIMIT_BURST: int = 10
+    OUTBOUND_LIMITER_MAX_TRIGGERS: int = 10000
+    OUTBOUND_LIMITER_MAX_HOSTS: int = 10000
+    PAYLOAD_VALIDATOR_CACHE_SIZE: int = 10000
+
+    # Adaptive (AIMD) per-host concurrency. HTTP_MAX_CONNECTIONS_PER_HOST is the
+    # starting limit and stays the ceiling; ADAPTIVE_MAX_LIMIT can only lower it
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = False
+    ADAPTIVE_MIN_LIMIT: int = 1
+    ADAPTIVE_MAX_LIMIT: int = 200
+    ADAPTIVE_BACKOFF_FACTOR: float = 0.5
+    ADAPTIVE_LATENCY_THRESHOLD_MS: float = 5000.0
+    ADAPTIVE_ERROR_RATE_THRESHOLD: float = 0.5
+    ADAPTIVE_DECREASE_COOLDOWN_SECONDS: float = 1.0
+
+    # Retries (api_config can override attempts and base delay) and circuit breakers
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY_SECONDS: float = 1.0
+    RETRY_MAX_DELAY_SECONDS: float = 60.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Dead letters
+    DEAD_LETTER_RETENTION_DAYS: int = 14
+    REDRIVE_RATE_PER_SECOND: float = 50.0
+    REDRIVE_BATCH_SIZE: int = 1000
+
+    # Event write buffer settings
+    EVENT_BUFFER_ENABLED: bool = False
+    EVENT_BUFFER_BATCH_SIZE: int = 500
+    EVENT_BUFFER_FLUSH_INTERVAL_MS: int = 200
+    EVENT_BUFFER_MAX_PENDING: int = 10000
+
+    # Execution queue settings
+    EXECUTION_WORKERS: int = 8
+    EXECUTION_VISIBILITY_TIMEOUT_SECONDS: int = 60
+    EXECUTION_POLL_INTERVAL_MS: int = 500
+    EXECUTION_MAX_DELIVERIES: int = 5
+    EXECUTION_RETENTION_HOURS: int = 48
 
     class Config:
         env_file = ".env"
@@ -2,10 +2,22 @@ from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import triggers, events
+from app.routers import triggers, events, admin
 from app.services.database import Database
-from app.services.event_service import EventService
-from app.utils.scheduler import setup_scheduler
+from app.services.http_client import HTTPClient
+from app.services.cache import RedisCache
+from app.services.event_buffer import EventWriteBuffer
+from app.services.execution_queue import ExecutionQueue
+from app.services.outbound_limits import OutboundLimiter
+from app.services.resilience import CircuitBreakers
+from app.services.trigger_cache import TriggerCache
+from app.services.retention import RetentionService
+from app.services.event_partitions import EventPartitions
+from app.services.archive_tier import ArchiveTier
+from app.services.blob_store import BlobStore
+from app.services.leader_election import LeaderElection
+from app.utils.scheduler import timing_wheel, get_poller_metrics
+from app.worker import start_worker_components, stop_worker_components
 from app.middleware.error_handler import error_handler, validation_error_handler
 from app.middleware.logging import logging_middleware
 from app.utils.logger import logger
@@ -43,14 +55,25 @@ app.include_router(
     prefix="/api/v1/events",
     tags=["events"]
 )
+app.include_router(
+    admin.router,
+    prefix="/api/v1/admin",
+    tags=["admin"]
+)
 
 @app.on_event("startup")
 async def startup_event():
     try:
         await Database.connect_db()
         await Database.setup_indexes()
-        await EventService.setup_change_stream()
-        await setup_scheduler()
+        await HTTPClient.open_client()
+        await EventWriteBuffer.start()
+        # Open the invalidation stream first so nothing warmed can go stale unseen
+        await TriggerCache.setup_change_stream()
+        await TriggerCache.warm()
+        # PROCESS_ROLE=api leaves scheduling and execution to `python -m app.worker`
+        if settings.PROCESS_ROLE != "api":
+            await start_worker_components()
         logger.info("Application started successfully")
     except Exception as e:
         logger.error(f"Startup error: {str(e)}")
@@ -59,6 +82,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     try:
+        await stop_worker_components()
+        await EventWriteBuffer.stop()
+        await HTTPClient.close_client()
+        await RedisCache.close_client()
         await Database.close_db()
         logger.info("Application shutdown successfully")
     except Exception as e:
@@ -80,4 +107,22 @@ async def health_check():
         }
     except Exception as e:
         logger.error(f"Health check error: {str(e)}")
-        return {"status": "unhealthy", "error": str(e)} 
\ No newline at end of file
+        return {"status": "unhealthy", "error": str(e)}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Get internal performance metrics"""
+    return {
+        "event_buffer": EventWriteBuffer.get_metrics(),
+        "execution_queue": ExecutionQueue.get_metrics(),
+        "outbound": OutboundLimiter.get_metrics(),
+        "circuit_breakers": CircuitBreakers.get_metrics(),
+        "trigger_cache": TriggerCache.get_metrics(),
+        "retention": RetentionService.get_metrics(),
+        "event_partitions": EventPartitions.get_metrics(),
+        "archive_tier": ArchiveTier.get_metrics(),
+        "blobs": BlobStore.get_metrics(),
+        "leader_election": LeaderElection.get_status(),
+        "timing_wheel": timing_wheel.get_metrics(),
+        "trigger_poller": get_poller_metrics()
+    }
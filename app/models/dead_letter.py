@@ -0,0 +1,8 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class RedriveRequest(BaseModel):
+    trigger_id: Optional[str] = None
+    ids: Optional[List[str]] = None
+    limit: Optional[int] = Field(default=None, ge=1)
+    rate_per_second: Optional[float] = Field(default=None, gt=0)
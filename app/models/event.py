@@ -20,6 +20,7 @@ class Event(BaseModel):
     api_payload: Optional[Dict] = None
     response_data: Optional[Dict] = None
     error_message: Optional[str] = None
+    attempts: int = 1
     retention_state: Literal["active", "archived"] = "active"
     created_at: datetime
     archived_at: Optional[datetime] = None
@@ -75,6 +75,11 @@ class APIConfig(BaseModel):
     endpoint: str
     method: str = Field(default="POST")
     payload_schema: Dict[str, Any] = Field(default_factory=dict)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    rate_limit_per_second: Optional[float] = Field(default=None, gt=0)
+    rate_limit_burst: Optional[int] = Field(default=None, ge=1)
+    retry_max_attempts: Optional[int] = Field(default=None, ge=1)
+    retry_base_delay_seconds: Optional[float] = Field(default=None, gt=0)
 
     @validator('endpoint')
     def validate_endpoint(cls, v):
@@ -146,6 +151,14 @@ class TriggerUpdate(BaseModel):
             # Validate headers if present
             if 'headers' in v and not isinstance(v['headers'], dict):
                 raise ValueError("headers must be a dictionary")
+
+            # Validate outbound limit overrides if present
+            for field in ('max_concurrency', 'rate_limit_burst', 'retry_max_attempts'):
+                if v.get(field) is not None and (not isinstance(v[field], int) or v[field] < 1):
+                    raise ValueError(f"{field} must be a positive integer")
+            for field in ('rate_limit_per_second', 'retry_base_delay_seconds'):
+                if v.get(field) is not None and (not isinstance(v[field], (int, float)) or v[field] <= 0):
+                    raise ValueError(f"{field} must be positive")
         return v
 
 class Trigger(BaseModel):
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from bson import ObjectId
+from app.models.dead_letter import RedriveRequest
+from app.services.dead_letters import DeadLetterService
+from app.services.execution_queue import ExecutionQueue
+from app.config import settings
+
+router = APIRouter()
+
+@router.get("/dead-letters")
+async def get_dead_letters(
+    trigger_id: Optional[str] = None,
+    status: str = Query("dead", regex="^(dead|redriven)$"),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Get failed executions, newest first"""
+    try:
+        page = await DeadLetterService.get_page(limit, cursor, trigger_id, status)
+        page["pending"] = await DeadLetterService.count(trigger_id)
+        return page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/dead-letters/redrive", status_code=202)
+async def redrive_dead_letters(request: RedriveRequest):
+    """Queue dead letters for execution again at a controlled rate"""
+    if request.ids and not all(ObjectId.is_valid(dead_letter_id) for dead_letter_id in request.ids):
+        raise HTTPException(status_code=400, detail="Invalid dead letter ID format")
+    try:
+        return await ExecutionQueue.redrive_dead_letters(
+            trigger_id=request.trigger_id,
+            ids=request.ids,
+            limit=request.limit,
+            rate_per_second=request.rate_per_second
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,16 +1,29 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from app.services.event_service import EventService
-from typing import List
+from app.utils.streaming import streaming_response
+from app.utils.fast_json import json_response
+from app.config import settings
+from typing import List, Optional
 from app.models.event import Event
 
 router = APIRouter()
 
 @router.get("/recent")
-async def get_recent_events(hours: int = 2):
+async def get_recent_events(
+    hours: int = 2,
+    format: str = Query("json", regex="^(json|ndjson)$", description="json array or ndjson stream"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
     """Get recent events from the last N hours"""
     try:
-        events = await EventService.get_recent_events(hours)
-        return events
+        if limit or cursor:
+            return json_response(await EventService.get_recent_events_page(
+                limit or settings.MAX_PAGE_SIZE, cursor, hours, raw=settings.FAST_JSON
+            ))
+        return streaming_response(EventService.stream_recent_events(hours, raw=settings.FAST_JSON), format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -18,16 +31,40 @@ async def get_recent_events(hours: int = 2):
 async def get_event_stats(hours: int = 48):
     """Get aggregated event statistics"""
     try:
-        stats = await EventService.get_aggregated_events(hours)
+        stats = await EventService.get_event_stats(hours)
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/timeseries")
+async def get_event_timeseries(
+    hours: int = 48,
+    bucket: str = Query("5m", description="Bucket size such as 1m, 5m, 1h or 1d"),
+    trigger_id: Optional[str] = None
+):
+    """Get event statistics per time bucket"""
+    try:
+        return await EventService.get_event_timeseries(hours, bucket, trigger_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/archived")
-async def get_archived_events(hours: int = 46):
+async def get_archived_events(
+    hours: int = 46,
+    format: str = Query("json", regex="^(json|ndjson)$", description="json array or ndjson stream"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
     """Get archived events from the last N hours"""
     try:
-        events = await EventService.get_archived_events(hours)
-        return events
+        if limit or cursor:
+            return json_response(await EventService.get_archived_events_page(
+                limit or settings.MAX_PAGE_SIZE, cursor, hours, raw=settings.FAST_JSON
+            ))
+        return streaming_response(EventService.stream_archived_events(hours, raw=settings.FAST_JSON), format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
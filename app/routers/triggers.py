@@ -1,20 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, HttpUrl
-from typing import Dict, Any
-from app.utils.scheduler import add_scheduled_trigger, execute_api_trigger
+from typing import Dict, Any, Optional
+from app.utils.scheduler import add_scheduled_trigger, execute_api_trigger, remove_scheduled_trigger
 from app.services.database import Database
+from app.services.trigger_service import TriggerService
+from app.services.trigger_cache import TriggerCache
+from app.utils.fast_json import json_response
+from app.services.execution_queue import ExecutionQueue
+from app.services.resilience import TriggerExecutionError
+from app.services.payload_validator import PayloadValidator, PayloadValidationError, compile_schema
+from app.config import settings
 from app.models.trigger import TriggerCreate, Trigger, ScheduleConfig, TriggerUpdate
+from bson import ObjectId
 from datetime import datetime
 import uuid
 
 router = APIRouter()
 
+def _trigger_query(trigger_id: str) -> Dict:
+    """Triggers are stored under ObjectId _ids"""
+    return {"_id": ObjectId(trigger_id) if ObjectId.is_valid(trigger_id) else trigger_id}
+
 @router.post("/")
 async def create_trigger(trigger: TriggerCreate):
     """Create a new trigger"""
     try:
+        if trigger.api_config:
+            compile_schema(trigger.api_config.payload_schema)
+
         # Prepare trigger document
         trigger_doc = trigger.model_dump()
+        trigger_doc["is_active"] = True
+        trigger_doc["is_deleted"] = False
         trigger_doc["created_at"] = datetime.utcnow()
         trigger_doc["updated_at"] = datetime.utcnow()
 
@@ -40,7 +58,7 @@ async def create_trigger(trigger: TriggerCreate):
 @router.get("/{trigger_id}")
 async def get_trigger(trigger_id: str):
     """Get a trigger by ID"""
-    trigger = await Database.find_one("triggers", {"_id": trigger_id})
+    trigger = await TriggerService.get_trigger(trigger_id)
     if not trigger:
         raise HTTPException(status_code=404, detail="Trigger not found")
     return trigger
@@ -52,7 +70,7 @@ async def delete_trigger(trigger_id: str):
         # First, deactivate the trigger
         await Database.update_one(
             "triggers",
-            {"_id": trigger_id},
+            _trigger_query(trigger_id),
             {
                 "$set": {
                     "is_active": False,
@@ -62,15 +80,12 @@ async def delete_trigger(trigger_id: str):
         )
 
         # Remove from scheduler if it exists
-        try:
-            scheduler.remove_job(f"{trigger_id}_permanent")
-        except:
-            pass  # Job might not exist in scheduler
+        remove_scheduled_trigger(trigger_id)
 
         # Mark trigger as deleted but keep the record
         await Database.update_one(
             "triggers",
-            {"_id": trigger_id},
+            _trigger_query(trigger_id),
             {
                 "$set": {
                     "is_deleted": True,
@@ -78,6 +93,7 @@ async def delete_trigger(trigger_id: str):
                 }
             }
         )
+        TriggerCache.invalidate(trigger_id)
 
         return {"message": "Trigger deleted successfully"}
     except Exception as e:
@@ -92,8 +108,22 @@ async def test_trigger(trigger: TriggerCreate):
             schedule_config = trigger.schedule_config.model_dump()
             # Force one-time execution
             schedule_config["schedule_type"] = "one_time"
+            trigger_id = "test_" + str(uuid.uuid4())
+            if settings.PROCESS_ROLE == "api":
+                # No scheduler runs here: store the test trigger so a worker picks it up
+                now = datetime.utcnow()
+                trigger_id = await Database.insert_one("triggers", {
+                    "name": trigger.name,
+                    "trigger_type": "scheduled",
+                    "schedule_config": schedule_config,
+                    "is_test": True,
+                    "is_active": True,
+                    "is_deleted": False,
+                    "created_at": now,
+                    "updated_at": now
+                })
             await add_scheduled_trigger(
-                "test_" + str(uuid.uuid4()),
+                trigger_id,
                 schedule_config,
                 is_test=True
             )
@@ -101,22 +131,58 @@ async def test_trigger(trigger: TriggerCreate):
             await execute_api_trigger(
                 "test_" + str(uuid.uuid4()),
                 trigger.api_config.model_dump(),
-                is_test=True
+                is_test=True,
+                max_attempts=1
             )
         return {"message": "Test trigger created successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/executions/{execution_id}")
+async def get_execution(execution_id: str):
+    """Get the status of a queued execution"""
+    execution = await ExecutionQueue.get_execution(execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
 @router.post("/{trigger_id}/execute")
-async def execute_trigger(trigger_id: str, payload: Dict[str, Any] = None):
+async def execute_trigger(
+    trigger_id: str,
+    payload: Dict[str, Any] = None,
+    mode: str = Query("sync", regex="^(sync|async)$", description="async queues the call and returns 202")
+):
     """Execute an API trigger manually"""
-    trigger = await Database.find_one("triggers", {"_id": trigger_id})
+    trigger = await TriggerService.get_trigger(trigger_id)
     if not trigger:
         raise HTTPException(status_code=404, detail="Trigger not found")
     
     if trigger["trigger_type"] != "api":
         raise HTTPException(status_code=400, detail="Only API triggers can be executed manually")
 
+    # A missing payload must still satisfy the schema's required fields
+    try:
+        PayloadValidator.validate(
+            trigger_id,
+            trigger.get("updated_at"),
+            trigger["api_config"].get("payload_schema"),
+            payload if payload is not None else {}
+        )
+    except PayloadValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    if mode == "async":
+        execution_id = await ExecutionQueue.enqueue(
+            trigger_id,
+            trigger["api_config"],
+            payload,
+            is_manual=True
+        )
+        return JSONResponse(
+            status_code=202,
+            content={"execution_id": execution_id, "status": "queued"}
+        )
+
     try:
         await execute_api_trigger(
             trigger_id,
@@ -126,6 +192,23 @@ async def execute_trigger(trigger_id: str, payload: Dict[str, Any] = None):
             is_manual=True
         )
         return {"message": "Trigger executed successfully"}
+    except TriggerExecutionError as e:
+        if not e.will_retry:
+            raise HTTPException(status_code=502, detail=str(e))
+        # Retry from the execution queue instead of holding this request open
+        execution_id = await ExecutionQueue.enqueue(
+            trigger_id,
+            trigger["api_config"],
+            payload,
+            is_manual=True,
+            attempts=e.attempt,
+            delay_seconds=e.retry_delay,
+            error_message=str(e)
+        )
+        return JSONResponse(
+            status_code=202,
+            content={"execution_id": execution_id, "status": "retrying"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -133,18 +216,22 @@ async def execute_trigger(trigger_id: str, payload: Dict[str, Any] = None):
 async def update_trigger(trigger_id: str, trigger: TriggerUpdate):
     """Update a trigger"""
     try:
-        existing_trigger = await Database.find_one("triggers", {"_id": trigger_id})
+        existing_trigger = await TriggerService.get_trigger(trigger_id)
         if not existing_trigger:
             raise HTTPException(status_code=404, detail="Trigger not found")
 
+        if trigger.api_config:
+            compile_schema(trigger.api_config.get("payload_schema"))
+
         update_data = trigger.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow()
 
         await Database.update_one(
             "triggers",
-            {"_id": trigger_id},
+            _trigger_query(trigger_id),
             {"$set": update_data}
         )
+        TriggerCache.invalidate(trigger_id)
 
         # Update scheduler if it's a scheduled trigger
         if existing_trigger["trigger_type"] == "scheduled" and trigger.schedule_config:
@@ -159,15 +246,21 @@ async def update_trigger(trigger_id: str, trigger: TriggerUpdate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/")
-async def get_all_triggers():
+async def get_all_triggers(
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size for keyset pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
     """Get all active triggers"""
     try:
-        triggers = await Database.find(
-            "triggers", 
-            {
-                "is_deleted": {"$ne": True}
-            }
-        )
-        return triggers
+        # Equality on both flags lets the (is_deleted, is_active, created_at, _id) index serve the sort
+        query = {"is_deleted": False, "is_active": True}
+        if limit or cursor:
+            return json_response(await Database.find_page(
+                "triggers", query, limit or settings.MAX_PAGE_SIZE, cursor, raw=settings.FAST_JSON
+            ))
+        triggers = await Database.find_many("triggers", query, raw=settings.FAST_JSON)
+        return json_response(triggers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from bson import Binary, ObjectId, decode, encode
+from pymongo.errors import BulkWriteError
+from app.services.database import Database
+from app.utils.compression import compress, decompress
+from app.config import settings
+import logging
+
+# Bulky fields kept compressed in the cold tier
+_BODY_FIELDS = ("api_payload", "response_data")
+
+class ArchiveTier:
+    """Compact cold storage for archived events.
+
+    With ARCHIVE_TIER on, the retention sweep moves due events out of the hot
+    collection into events_archive, keeping the queryable fields as-is and
+    api_payload/response_data as one zstd (or zlib) compressed blob. The
+    collection only has a listing index and a TTL index.
+    """
+    COLLECTION = "events_archive"
+    _metrics: Dict = {
+        "moved": 0,
+        "raw_bytes": 0,
+        "compressed_bytes": 0
+    }
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.ARCHIVE_TIER
+
+    @classmethod
+    def _to_cold(cls, event: Dict, now: datetime) -> Dict:
+        document = {key: value for key, value in event.items() if key not in _BODY_FIELDS}
+        document["_id"] = ObjectId(document.pop("id"))
+        document.pop("retention_state", None)
+        document["archived_at"] = now
+
+        body = {field: event.get(field) for field in _BODY_FIELDS if event.get(field) is not None}
+        if body:
+            raw = encode(body)
+            codec, compressed = compress(raw)
+            document["codec"] = codec
+            document["body"] = Binary(compressed)
+            cls._metrics["raw_bytes"] += len(raw)
+            cls._metrics["compressed_bytes"] += len(compressed)
+        return document
+
+    @staticmethod
+    def _from_cold(document: Dict) -> Dict:
+        """Expand a cold document back into the shape of an archived event"""
+        body = document.pop("body", None)
+        codec = document.pop("codec", None)
+        fields = decode(decompress(codec, bytes(body))) if body is not None else {}
+        for field in _BODY_FIELDS:
+            document[field] = fields.get(field)
+        document["retention_state"] = "archived"
+        return document
+
+    @classmethod
+    async def move(cls, collection: str, ids: List[ObjectId], now: datetime) -> int:
+        """Copy events into the cold tier, then delete them from the hot collection"""
+        events = await Database.find_many(collection, {"_id": {"$in": ids}})
+        if not events:
+            return 0
+        try:
+            await Database.insert_many(cls.COLLECTION, [cls._to_cold(event, now) for event in events], ordered=False)
+        except BulkWriteError as e:
+            # Duplicates are events copied by a run interrupted before its delete
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errors:
+                logging.error(f"Failed to move {len(errors)} events to the archive tier")
+                raise
+        moved = await Database.delete_many(collection, {"_id": {"$in": [ObjectId(event["id"]) for event in events]}})
+        cls._metrics["moved"] += moved
+        return moved
+
+    @staticmethod
+    def _cold_query(query: Dict) -> Dict:
+        # The tier only holds archived events, so retention_state is implied
+        return {key: value for key, value in query.items() if key != "retention_state"}
+
+    @classmethod
+    async def iter_events(cls, query: Dict) -> AsyncIterator[Dict]:
+        """Stream archived events, newest first, decompressed"""
+        async for document in Database.iter_many(cls.COLLECTION, cls._cold_query(query), sort=[("created_at", -1)]):
+            yield cls._from_cold(document)
+
+    @classmethod
+    async def find_page(cls, query: Dict, limit: int, cursor: Optional[str] = None) -> Dict:
+        """One keyset page of archived events, newest first, decompressed"""
+        page = await Database.find_page(cls.COLLECTION, cls._cold_query(query), limit, cursor)
+        page["items"] = [cls._from_cold(document) for document in page["items"]]
+        return page
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        raw_bytes = cls._metrics["raw_bytes"]
+        return {
+            **cls._metrics,
+            "compression_ratio": raw_bytes / cls._metrics["compressed_bytes"] if raw_bytes else 0.0
+        }
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import AsyncIterator, Dict, List
+from pymongo import UpdateOne
+from app.services.database import Database
+from app.config import settings
+import hashlib
+import json
+
+# Event fields that can be stored once and referenced by hash
+BLOB_FIELDS = ("api_payload", "response_data")
+
+def _canonical(value) -> bytes:
+    """Stable JSON encoding, so equal bodies always hash the same"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+class BlobStore:
+    """Content-addressed store for large event payloads and responses.
+
+    With EVENT_BLOB_DEDUP on, api_payload/response_data bodies of at least
+    EVENT_BLOB_MIN_BYTES are written once to the blobs collection under the
+    sha256 of their canonical JSON, and the event keeps only
+    <field>_ref. Blobs are not reference counted: each write pushes the
+    blob's expires_at (TTL-indexed) out to the referencing event's retention
+    end, so a blob outlives every event that points at it whether events are
+    removed by TTL, cleanup or a partition drop, and expires through
+    expires_at alone.
+    """
+    COLLECTION = "blobs"
+    # Hashes recently written, so repeat bodies are not sent to the server again
+    _known: "OrderedDict[str, None]" = OrderedDict()
+    _metrics: Dict = {
+        "refs_written": 0,
+        "blobs_created": 0,
+        "bytes_referenced": 0,
+        "bytes_written": 0
+    }
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.EVENT_BLOB_DEDUP
+
+    @classmethod
+    async def store(cls, events: List[Dict]):
+        """Swap large bodies on the events for refs, writing new blobs first"""
+        retention = timedelta(hours=settings.EVENT_TOTAL_RETENTION_HOURS)
+        refs: Dict[str, Dict] = {}
+        replacements = []
+        for event in events:
+            expires_at = _as_utc(event["created_at"]) + retention
+            for field in BLOB_FIELDS:
+                value = event.get(field)
+                if value is None:
+                    continue
+                data = _canonical(value)
+                if len(data) < settings.EVENT_BLOB_MIN_BYTES:
+                    continue
+                key = hashlib.sha256(data).hexdigest()
+                ref = refs.setdefault(key, {"body": value, "size": len(data), "count": 0, "expires_at": expires_at})
+                ref["count"] += 1
+                ref["expires_at"] = max(ref["expires_at"], expires_at)
+                replacements.append((event, field, key))
+        if not refs:
+            return
+
+        # Known blobs only need their expiry extended; the body is not resent
+        known = [key for key in refs if key in cls._known]
+        if known:
+            result = await Database.bulk_write(cls.COLLECTION, [
+                UpdateOne({"_id": key}, {"$max": {"expires_at": refs[key]["expires_at"]}})
+                for key in known
+            ], ordered=False)
+            if result.matched_count < len(known):
+                # Some expired since we saw them: upsert those with their body
+                missing = await Database.bulk_write(cls.COLLECTION, [
+                    UpdateOne(
+                        {"_id": key},
+                        {"$setOnInsert": cls._new_blob(refs[key]), "$max": {"expires_at": refs[key]["expires_at"]}},
+                        upsert=True
+                    )
+                    for key in known
+                ], ordered=False)
+                cls._metrics["blobs_created"] += missing.upserted_count
+            for key in known:
+                cls._remember(key)
+
+        new = [key for key in refs if key not in cls._known]
+        if new:
+            result = await Database.bulk_write(cls.COLLECTION, [
+                UpdateOne(
+                    {"_id": key},
+                    {
+                        "$setOnInsert": cls._new_blob(refs[key]),
+                        "$max": {"expires_at": refs[key]["expires_at"]}
+                    },
+                    upsert=True
+                )
+                for key in new
+            ], ordered=False)
+            cls._metrics["blobs_created"] += result.upserted_count
+            cls._metrics["bytes_written"] += sum(refs[key]["size"] for key in new)
+            for key in new:
+                cls._remember(key)
+
+        # Only point events at blobs once the blobs are written
+        for event, field, key in replacements:
+            del event[field]
+            event[f"{field}_ref"] = key
+
+        cls._metrics["refs_written"] += sum(ref["count"] for ref in refs.values())
+        cls._metrics["bytes_referenced"] += sum(ref["size"] * ref["count"] for ref in refs.values())
+
+    @staticmethod
+    def _new_blob(ref: Dict) -> Dict:
+        return {
+            "body": ref["body"],
+            "size": ref["size"],
+            "created_at": datetime.now(timezone.utc)
+        }
+
+    @classmethod
+    def _remember(cls, key: str):
+        cls._known[key] = None
+        cls._known.move_to_end(key)
+        if len(cls._known) > settings.EVENT_BLOB_CACHE_SIZE:
+            cls._known.popitem(last=False)
+
+    @classmethod
+    async def resolve(cls, documents: List[Dict]) -> List[Dict]:
+        """Put referenced bodies back on the events with one lookup for the whole batch"""
+        keys = {
+            document[f"{field}_ref"]
+            for document in documents
+            for field in BLOB_FIELDS
+            if f"{field}_ref" in document
+        }
+        if not keys:
+            return documents
+
+        blobs = {
+            blob["id"]: blob["body"]
+            for blob in await Database.find_many(cls.COLLECTION, {"_id": {"$in": list(keys)}}, projection={"body": 1})
+        }
+        for document in documents:
+            for field in BLOB_FIELDS:
+                key = document.pop(f"{field}_ref", None)
+                if key is not None:
+                    document[field] = blobs.get(key)
+        return documents
+
+    @classmethod
+    async def resolve_stream(cls, documents: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """Resolve a stream of events STREAM_CHUNK_SIZE documents at a time"""
+        chunk = []
+        async for document in documents:
+            chunk.append(document)
+            if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                for resolved in await cls.resolve(chunk):
+                    yield resolved
+                chunk = []
+        for resolved in await cls.resolve(chunk):
+            yield resolved
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        referenced = cls._metrics["bytes_referenced"]
+        return {
+            **cls._metrics,
+            "dedup_ratio": referenced / cls._metrics["bytes_written"] if cls._metrics["bytes_written"] else 0.0,
+            "known_blobs": len(cls._known)
+        }
@@ -1,27 +1,58 @@
-import redis
+import redis.asyncio as redis
 from app.config import settings
-import json
+from typing import Dict, List, Optional
 import logging
 
+try:
+    import orjson
+
+    def _dumps(value) -> bytes:
+        return orjson.dumps(value)
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def _dumps(value) -> bytes:
+        return json.dumps(value).encode()
+
+    def _loads(data):
+        return json.loads(data)
+
 class RedisCache:
+    _pool = None
     _client = None
 
     @classmethod
     def get_client(cls):
         if cls._client is None:
             try:
-                cls._client = redis.from_url(settings.REDIS_URL)
+                cls._pool = redis.ConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS
+                )
+                cls._client = redis.Redis(connection_pool=cls._pool)
                 logging.info("Connected to Redis.")
             except Exception as e:
                 logging.error(f"Failed to connect to Redis: {e}")
                 raise
         return cls._client
 
+    @classmethod
+    async def close_client(cls):
+        if cls._client is not None:
+            await cls._client.close()
+            await cls._pool.disconnect()
+            cls._client = None
+            cls._pool = None
+            logging.info("Closed Redis connection.")
+
     @classmethod
     async def set_cache(cls, key: str, value: dict, expiry: int = 3600):
         try:
             client = cls.get_client()
-            client.setex(key, expiry, json.dumps(value))
+            await client.setex(key, expiry, _dumps(value))
         except Exception as e:
             logging.error(f"Cache set error: {e}")
 
@@ -29,8 +60,38 @@ class RedisCache:
     async def get_cache(cls, key: str):
         try:
             client = cls.get_client()
-            data = client.get(key)
-            return json.loads(data) if data else None
+            data = await client.get(key)
+            return _loads(data) if data else None
         except Exception as e:
             logging.error(f"Cache get error: {e}")
-            return None 
\ No newline at end of file
+            return None
+
+    @classmethod
+    async def set_many(cls, values: Dict[str, dict], expiry: int = 3600):
+        """Set several keys in one pipelined round trip"""
+        if not values:
+            return
+        try:
+            client = cls.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.setex(key, expiry, _dumps(value))
+                await pipe.execute()
+        except Exception as e:
+            logging.error(f"Cache set_many error: {e}")
+
+    @classmethod
+    async def get_many(cls, keys: List[str]) -> Dict[str, Optional[dict]]:
+        """Get several keys with a single MGET"""
+        if not keys:
+            return {}
+        try:
+            client = cls.get_client()
+            values = await client.mget(keys)
+            return {
+                key: _loads(data) if data else None
+                for key, data in zip(keys, values)
+            }
+        except Exception as e:
+            logging.error(f"Cache get_many error: {e}")
+            return {key: None for key in keys}
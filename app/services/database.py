@@ -1,10 +1,13 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from datetime import datetime
 import logging
 from app.config import settings
+from app.utils.fast_json import RAW_CODEC_OPTIONS
 import asyncio
+import base64
+import json
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -64,6 +67,12 @@ class Database:
         result = await cls.db[collection].insert_one(document)
         return str(result.inserted_id)
 
+    @classmethod
+    async def insert_many(cls, collection: str, documents: List[Dict], ordered: bool = True) -> List[str]:
+        """Insert multiple documents and return their IDs"""
+        result = await cls.db[collection].insert_many(documents, ordered=ordered)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     @classmethod
     async def find_one(cls, collection: str, query: Dict) -> Optional[Dict]:
         """Find a single document"""
@@ -77,17 +86,122 @@ class Database:
             raise
 
     @classmethod
-    async def find_many(cls, collection: str, query: Dict) -> List[Dict]:
+    async def find_many(
+        cls,
+        collection: str,
+        query: Dict,
+        projection: Optional[Dict] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        raw: bool = False
+    ) -> List[Dict]:
         """Find multiple documents"""
+        return [
+            document async for document in cls.iter_many(
+                collection, query, projection=projection, sort=sort, limit=limit, raw=raw
+            )
+        ]
+
+    @classmethod
+    async def iter_many(
+        cls,
+        collection: str,
+        query: Dict,
+        projection: Optional[Dict] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        batch_size: Optional[int] = None,
+        raw: bool = False
+    ) -> AsyncIterator[Dict]:
+        """Stream documents from a cursor, fetching batch_size documents per round trip.
+
+        With raw=True documents are yielded as undecoded RawBSONDocuments that
+        keep their _id; app.utils.fast_json maps _id to id while serializing.
+        """
+        source = cls.db[collection]
+        if raw:
+            source = source.with_options(codec_options=RAW_CODEC_OPTIONS)
+        cursor = source.find(
+            query,
+            projection,
+            batch_size=batch_size or settings.DB_CURSOR_BATCH_SIZE
+        )
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
         try:
-            cursor = cls.db[collection].find(query)
-            documents = []
             async for document in cursor:
-                documents.append(cls._convert_id(document))
-            return documents
+                yield document if raw else cls._convert_id(document)
         except Exception as e:
-            logging.error(f"Database find_many error: {str(e)}")
+            logging.error(f"Database iter_many error: {str(e)}")
             raise
+        finally:
+            await cursor.close()
+
+    @staticmethod
+    def encode_cursor(document: Dict, sort_field: str) -> str:
+        """Encode the last document of a page as an opaque keyset cursor; a missing sort value encodes as null"""
+        value = document.get(sort_field)
+        payload = {
+            "v": value.isoformat() if isinstance(value, datetime) else value,
+            "dt": isinstance(value, datetime),
+            "id": str(document["id"] if "id" in document else document["_id"])
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+        """Decode a keyset cursor into its sort value and _id"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value = datetime.fromisoformat(payload["v"]) if payload["dt"] else payload["v"]
+            return value, ObjectId(payload["id"])
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+
+    @classmethod
+    async def find_page(
+        cls,
+        collection: str,
+        query: Dict,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_field: str = "created_at",
+        projection: Optional[Dict] = None,
+        raw: bool = False
+    ) -> Dict:
+        """Find one page of documents ordered by (sort_field, _id) descending"""
+        if cursor:
+            value, last_id = cls.decode_cursor(cursor)
+            if value is None:
+                # Documents without the sort field sort last, ordered by _id alone
+                after = {sort_field: None, "_id": {"$lt": last_id}}
+            else:
+                # $lt never crosses BSON types, so the missing/null tail is matched explicitly
+                after = {
+                    "$or": [
+                        {sort_field: {"$lt": value}},
+                        {sort_field: value, "_id": {"$lt": last_id}},
+                        {sort_field: None}
+                    ]
+                }
+            query = {"$and": [query, after]}
+
+        # Fetch one extra document to know whether another page exists
+        documents = await cls.find_many(
+            collection,
+            query,
+            projection=projection,
+            sort=[(sort_field, -1), ("_id", -1)],
+            limit=limit + 1,
+            raw=raw
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = cls.encode_cursor(documents[-1], sort_field)
+        return {"items": documents, "next_cursor": next_cursor}
 
     @classmethod
     async def update_one(cls, collection: str, query: Dict, update: Dict) -> bool:
@@ -105,6 +219,11 @@ class Database:
         result = await cls.db[collection].update_many(query, update)
         return result.modified_count
 
+    @classmethod
+    async def bulk_write(cls, collection: str, operations: List, ordered: bool = True):
+        """Run a batch of write operations in one round trip"""
+        return await cls.db[collection].bulk_write(operations, ordered=ordered)
+
     @classmethod
     async def delete_one(cls, collection: str, query: Dict) -> bool:
         """Delete a document"""
@@ -122,29 +241,95 @@ class Database:
         """Setup database indexes"""
         try:
             # First, drop existing indexes that we want to recreate with TTL
-            try:
-                await cls.db.events.drop_index("archive_time_ttl")
-                await cls.db.events.drop_index("expiry_time_ttl")
-            except Exception as e:
-                logging.info(f"Indexes don't exist yet or already dropped: {str(e)}")
+            # active_retention_ttl deleted active events at 2h, racing the archival
+            # sweep; archival is handled by RetentionService now
+            for index_name in ("archive_time_ttl", "expiry_time_ttl", "active_retention_ttl"):
+                try:
+                    await cls.db.events.drop_index(index_name)
+                except Exception as e:
+                    logging.info(f"Index {index_name} doesn't exist yet or already dropped: {str(e)}")
 
             # Triggers collection indexes
             await cls.db.triggers.create_index([("is_active", 1)])
             await cls.db.triggers.create_index([("trigger_type", 1)])
+            await cls.db.triggers.create_index(
+                [("is_deleted", 1), ("is_active", 1), ("created_at", -1), ("_id", -1)]
+            )
+            # Listings that include inactive triggers only filter on is_deleted
+            await cls.db.triggers.create_index(
+                [("is_deleted", 1), ("created_at", -1), ("_id", -1)]
+            )
+            # Due-trigger claims for the polling scheduler engine
+            await cls.db.triggers.create_index(
+                [("next_run_at", 1)],
+                partialFilterExpression={"next_run_at": {"$type": "date"}},
+                name="next_run_at_due"
+            )
             
             # Events collection indexes
             await cls.db.events.create_index([("trigger_id", 1)])
             await cls.db.events.create_index([("retention_state", 1)])
             await cls.db.events.create_index([("created_at", -1)])
-            
-            # TTL indexes for strict retention rules
             await cls.db.events.create_index(
-                [("created_at", 1)],
-                expireAfterSeconds=7200,  # 2 hours - active to archived
-                partialFilterExpression={"retention_state": "active"},
-                name="active_retention_ttl"
+                [("retention_state", 1), ("created_at", -1), ("_id", -1)]
             )
             
+            # Event rollup indexes
+            await cls.db.event_rollups.create_index(
+                [("trigger_id", 1), ("bucket", 1)],
+                unique=True
+            )
+            await cls.db.event_rollups.create_index(
+                [("bucket", 1)],
+                expireAfterSeconds=settings.EVENT_TOTAL_RETENTION_HOURS * 3600,
+                name="rollup_expiry_ttl"
+            )
+
+            # Cold archive tier: one listing index plus expiry
+            await cls.db.events_archive.create_index([("created_at", -1), ("_id", -1)])
+            await cls.db.events_archive.create_index(
+                [("created_at", 1)],
+                expireAfterSeconds=settings.EVENT_TOTAL_RETENTION_HOURS * 3600,
+                name="archive_tier_expiry_ttl"
+            )
+
+            # Deduplicated event bodies expire once no retained event can reference them
+            await cls.db.blobs.create_index(
+                [("expires_at", 1)],
+                expireAfterSeconds=0,
+                name="blob_expiry_ttl"
+            )
+
+            # Archival sweep checkpoints; stale ones (e.g. for dropped partitions) expire
+            await cls.db.retention_checkpoints.create_index(
+                [("updated_at", 1)],
+                expireAfterSeconds=settings.EVENT_TOTAL_RETENTION_HOURS * 3600,
+                name="retention_checkpoint_ttl"
+            )
+
+            # Execution queue indexes
+            await cls.db.execution_queue.create_index([("status", 1), ("visible_at", 1)])
+            await cls.db.execution_queue.create_index(
+                [("finished_at", 1)],
+                expireAfterSeconds=settings.EXECUTION_RETENTION_HOURS * 3600,
+                name="execution_finished_ttl"
+            )
+
+            # Dead letter indexes
+            await cls.db.dead_letters.create_index(
+                [("status", 1), ("created_at", -1), ("_id", -1)]
+            )
+            await cls.db.dead_letters.create_index(
+                [("trigger_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)]
+            )
+            await cls.db.dead_letters.create_index([("redrive_id", 1)], sparse=True)
+            await cls.db.dead_letters.create_index(
+                [("created_at", 1)],
+                expireAfterSeconds=settings.DEAD_LETTER_RETENTION_DAYS * 86400,
+                name="dead_letter_expiry_ttl"
+            )
+
+            # TTL indexes for strict retention rules
             await cls.db.events.create_index(
                 [("created_at", 1)],
                 expireAfterSeconds=172800,  # 48 hours - total lifetime
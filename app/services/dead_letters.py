@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from bson import ObjectId
+from app.services.database import Database
+import logging
+
+class DeadLetterService:
+    """Executions that failed after all their retries, kept for inspection and redrive"""
+    COLLECTION = "dead_letters"
+
+    @classmethod
+    async def record(
+        cls,
+        trigger_id: str,
+        api_config: Dict,
+        payload: Optional[Dict],
+        error_message: str,
+        attempts: int,
+        status_code: Optional[int] = None,
+        is_manual: bool = False
+    ) -> Optional[str]:
+        """Persist a failed execution with everything needed to replay it"""
+        now = datetime.now(timezone.utc)
+        try:
+            return await Database.insert_one(cls.COLLECTION, {
+                "trigger_id": trigger_id,
+                "api_config": api_config,
+                "payload": payload,
+                "is_manual": is_manual,
+                "error_message": error_message,
+                "status_code": status_code,
+                "attempts": attempts,
+                "status": "dead",
+                "created_at": now,
+                "updated_at": now
+            })
+        except Exception as e:
+            logging.error(f"Failed to dead-letter execution of trigger {trigger_id}: {str(e)}")
+            return None
+
+    @staticmethod
+    def redrivable_query(trigger_id: Optional[str] = None, ids: Optional[List[str]] = None) -> Dict:
+        """Dead letters not yet redriven, optionally narrowed to a trigger or to explicit ids"""
+        query = {"status": "dead"}
+        if trigger_id:
+            query["trigger_id"] = trigger_id
+        if ids:
+            query["_id"] = {"$in": [ObjectId(dead_letter_id) for dead_letter_id in ids]}
+        return query
+
+    @classmethod
+    async def get_page(
+        cls,
+        limit: int,
+        cursor: Optional[str] = None,
+        trigger_id: Optional[str] = None,
+        status: str = "dead"
+    ) -> Dict:
+        """Get one keyset page of dead letters, newest first"""
+        query = {"status": status}
+        if trigger_id:
+            query["trigger_id"] = trigger_id
+        return await Database.find_page(
+            cls.COLLECTION,
+            query,
+            limit,
+            cursor,
+            projection={"api_config": 0}
+        )
+
+    @classmethod
+    async def count(cls, trigger_id: Optional[str] = None) -> int:
+        """Count dead letters waiting for redrive"""
+        return await Database.db[cls.COLLECTION].count_documents(cls.redrivable_query(trigger_id))
@@ -0,0 +1,173 @@
+from typing import List, Dict, Optional
+from app.services.database import Database
+from app.services.event_rollup import EventRollupService
+from app.services.event_partitions import EventPartitions
+from app.services.blob_store import BlobStore
+from app.config import settings
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+import time
+
+class EventWriteBuffer:
+    """In-memory buffer that batches event inserts into unordered insert_many calls"""
+    _pending: List[Dict] = []
+    _flush_lock: Optional[asyncio.Lock] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _flush_task: Optional[asyncio.Task] = None
+    _stopping = False
+    _metrics: Dict = {
+        "flushes": 0,
+        "documents_flushed": 0,
+        "failed_documents": 0,
+        "direct_writes": 0,
+        "last_flush_size": 0,
+        "max_flush_size": 0,
+        "last_flush_latency_ms": 0.0,
+        "max_flush_latency_ms": 0.0,
+        "total_flush_latency_ms": 0.0
+    }
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._flush_task is not None
+
+    @classmethod
+    async def start(cls):
+        """Start the background flusher if buffering is enabled"""
+        if not settings.EVENT_BUFFER_ENABLED or cls.is_running():
+            return
+        cls._flush_lock = asyncio.Lock()
+        cls._wakeup = asyncio.Event()
+        cls._stopping = False
+        cls._flush_task = asyncio.create_task(cls._run())
+        logging.info("Event write buffer started")
+
+    @classmethod
+    async def stop(cls):
+        """Stop the background flusher and write out everything still pending"""
+        if not cls.is_running():
+            return
+        # Let the flusher finish the batch it is writing instead of cancelling it mid-insert
+        cls._stopping = True
+        cls._wakeup.set()
+        await cls._flush_task
+        cls._flush_task = None
+        flushed = await cls.flush()
+        logging.info(f"Event write buffer stopped, flushed {flushed} pending events")
+
+    @classmethod
+    async def add(cls, document: Dict):
+        """Queue an event document for the next batch insert"""
+        if len(cls._pending) >= settings.EVENT_BUFFER_MAX_PENDING:
+            # Bounded memory: make the writer wait for a flush instead of growing the buffer
+            await cls.flush()
+            if len(cls._pending) >= settings.EVENT_BUFFER_MAX_PENDING:
+                cls._metrics["direct_writes"] += 1
+                if BlobStore.enabled():
+                    await BlobStore.store([document])
+                collection = await EventPartitions.collection_for_write(document["created_at"])
+                await Database.insert_one(collection, document)
+                await EventRollupService.record([document])
+                return
+
+        cls._pending.append(document)
+        if len(cls._pending) >= settings.EVENT_BUFFER_BATCH_SIZE:
+            cls._wakeup.set()
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Write all pending events in batches and return how many were flushed"""
+        if cls._flush_lock is None:
+            return 0
+
+        flushed = 0
+        async with cls._flush_lock:
+            while cls._pending:
+                batch = cls._pending[:settings.EVENT_BUFFER_BATCH_SIZE]
+                del cls._pending[:settings.EVENT_BUFFER_BATCH_SIZE]
+                try:
+                    unwritten = await cls._write_batch(batch)
+                except asyncio.CancelledError:
+                    cls._pending[:0] = batch
+                    raise
+                except Exception as e:
+                    # Put the batch back so a later flush can retry it
+                    cls._pending[:0] = batch
+                    logging.error(f"Event buffer flush error: {str(e)}")
+                    break
+                flushed += len(batch) - len(unwritten)
+                if unwritten:
+                    # Retry only the partitions that failed; the rest are already in
+                    cls._pending[:0] = unwritten
+                    break
+        return flushed
+
+    @classmethod
+    async def _write_batch(cls, batch: List[Dict]) -> List[Dict]:
+        """Insert one batch unordered, record flush metrics and return the events left to retry"""
+        start = time.perf_counter()
+        if BlobStore.enabled():
+            # One blob write for the batch, before any event references it
+            await BlobStore.store(batch)
+        # One insert_many per partition (a single one when partitioning is off)
+        partitions: Dict[str, List[Dict]] = {}
+        for document in batch:
+            partitions.setdefault(EventPartitions.name_for(document["created_at"]), []).append(document)
+
+        written = []
+        unwritten = []
+        for documents in partitions.values():
+            try:
+                collection = await EventPartitions.collection_for_write(documents[0]["created_at"])
+                await Database.insert_many(collection, documents, ordered=False)
+                written.extend(documents)
+            except BulkWriteError as e:
+                # A duplicate key is an event an earlier, interrupted flush already wrote
+                failed = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != 11000
+                }
+                written.extend(document for index, document in enumerate(documents) if index not in failed)
+                cls._metrics["failed_documents"] += len(failed)
+            except Exception as e:
+                logging.error(f"Event buffer partition write error: {str(e)}")
+                unwritten.extend(documents)
+        if len(written) + len(unwritten) < len(batch):
+            logging.error(f"Event buffer flush wrote {len(written)} of {len(batch)} events")
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        cls._metrics["flushes"] += 1
+        cls._metrics["documents_flushed"] += len(batch) - len(unwritten)
+        cls._metrics["last_flush_size"] = len(batch)
+        cls._metrics["max_flush_size"] = max(cls._metrics["max_flush_size"], len(batch))
+        cls._metrics["last_flush_latency_ms"] = latency_ms
+        cls._metrics["max_flush_latency_ms"] = max(cls._metrics["max_flush_latency_ms"], latency_ms)
+        cls._metrics["total_flush_latency_ms"] += latency_ms
+
+        await EventRollupService.record(written)
+        return unwritten
+
+    @classmethod
+    async def _run(cls):
+        """Flush when the batch size is reached or the flush interval elapses"""
+        interval = settings.EVENT_BUFFER_FLUSH_INTERVAL_MS / 1000
+        while not cls._stopping:
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            cls._wakeup.clear()
+            await cls.flush()
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Get flush size and latency metrics"""
+        flushes = cls._metrics["flushes"]
+        return {
+            **cls._metrics,
+            "enabled": cls.is_running(),
+            "pending": len(cls._pending),
+            "avg_flush_size": cls._metrics["documents_flushed"] / flushes if flushes else 0,
+            "avg_flush_latency_ms": cls._metrics["total_flush_latency_ms"] / flushes if flushes else 0.0
+        }
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Set
+from app.services.database import Database
+from app.config import settings
+import logging
+import re
+
+# Partition collections are events_YYYYMMDD (daily) or events_YYYYMMDDHH (hourly)
+PARTITION_PREFIX = "events_"
+_PARTITION_NAME = re.compile(r"^events_(\d{8}|\d{10})$")
+_FORMATS = {
+    "daily": ("%Y%m%d", timedelta(days=1)),
+    "hourly": ("%Y%m%d%H", timedelta(hours=1))
+}
+_EARLIEST = datetime.min.replace(tzinfo=timezone.utc)
+_LATEST = datetime.max.replace(tzinfo=timezone.utc)
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+class EventPartitions:
+    """Time-partitioned event storage, so expiry is a collection drop.
+
+    With EVENT_PARTITIONING set to "daily" or "hourly", each event is written
+    to the collection for its created_at, reads only touch the partitions
+    overlapping the requested range, and partitions entirely past
+    EVENT_TOTAL_RETENTION_HOURS are dropped instead of deleted document by
+    document. With "none" everything stays in the single events collection.
+    """
+    _indexed: Set[str] = set()
+    _metrics: Dict = {
+        "partitions_created": 0,
+        "partitions_dropped": 0
+    }
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.EVENT_PARTITIONING in _FORMATS
+
+    @staticmethod
+    def name_for(created_at: datetime) -> str:
+        """Collection holding events created at created_at"""
+        if not EventPartitions.enabled():
+            return "events"
+        name_format, _ = _FORMATS[settings.EVENT_PARTITIONING]
+        return PARTITION_PREFIX + _as_utc(created_at).strftime(name_format)
+
+    @staticmethod
+    def bounds(name: str) -> Optional[tuple]:
+        """(start, end) covered by a partition name, or None if it is not a partition"""
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            return None
+        suffix = match.group(1)
+        name_format, span = _FORMATS["daily" if len(suffix) == 8 else "hourly"]
+        start = datetime.strptime(suffix, name_format).replace(tzinfo=timezone.utc)
+        return start, start + span
+
+    @classmethod
+    async def collection_for_write(cls, created_at: datetime) -> str:
+        """Collection for a new event, creating the partition's indexes on first use"""
+        name = cls.name_for(created_at)
+        if name != "events" and name not in cls._indexed:
+            await cls._create_indexes(name)
+            cls._indexed.add(name)
+        return name
+
+    @classmethod
+    async def _create_indexes(cls, name: str):
+        # Same read indexes as the events collection, but no TTL: whole partitions expire
+        collection = Database.db[name]
+        await collection.create_index([("trigger_id", 1)])
+        await collection.create_index([("created_at", -1)])
+        await collection.create_index([("retention_state", 1), ("created_at", -1), ("_id", -1)])
+        cls._metrics["partitions_created"] += 1
+
+    @classmethod
+    async def _existing(cls) -> List[str]:
+        names = await Database.db.list_collection_names(
+            filter={"name": {"$regex": _PARTITION_NAME.pattern}}
+        )
+        return [name for name in names if cls.bounds(name)]
+
+    @classmethod
+    async def collections_between(cls, start: datetime, end: datetime) -> List[str]:
+        """Existing collections that can hold events created in [start, end), newest first"""
+        if not cls.enabled():
+            return ["events"]
+        start, end = _as_utc(start), _as_utc(end)
+        overlapping = []
+        for name in await cls._existing():
+            partition_start, partition_end = cls.bounds(name)
+            if partition_start < end and partition_end > start:
+                overlapping.append((partition_start, name))
+        return [name for _, name in sorted(overlapping, reverse=True)]
+
+    @staticmethod
+    def _query_range(query: Dict) -> tuple:
+        """The [start, end) created_at range a query can match"""
+        created_at = query.get("created_at", {})
+        start = created_at.get("$gte") or created_at.get("$gt") or _EARLIEST
+        end = created_at.get("$lt") or created_at.get("$lte") or _LATEST
+        if "$lte" in created_at and "$lt" not in created_at:
+            end += timedelta(microseconds=1)
+        return start, end
+
+    @classmethod
+    async def iter_events(cls, query: Dict, raw: bool = False) -> AsyncIterator[Dict]:
+        """Stream matching events newest first across the partitions in the query's range"""
+        # Partitions do not overlap in time, so newest-first per partition is newest-first overall
+        for name in await cls.collections_between(*cls._query_range(query)):
+            async for document in Database.iter_many(name, query, sort=[("created_at", -1)], raw=raw):
+                yield document
+
+    @classmethod
+    async def find_page(
+        cls,
+        query: Dict,
+        limit: int,
+        cursor: Optional[str] = None,
+        raw: bool = False
+    ) -> Dict:
+        """One keyset page of events, newest first, filled from as many partitions as needed"""
+        if not cls.enabled():
+            return await Database.find_page("events", query, limit, cursor, raw=raw)
+
+        start, end = cls._query_range(query)
+        if cursor:
+            value, _ = Database.decode_cursor(cursor)
+            # Partitions newer than the cursor were already paged through
+            end = min(_as_utc(end), _as_utc(value) + timedelta(microseconds=1))
+
+        items: List[Dict] = []
+        partitions = await cls.collections_between(start, end)
+        for index, name in enumerate(partitions):
+            page = await Database.find_page(name, query, limit - len(items), cursor, raw=raw)
+            items.extend(page["items"])
+            if page["next_cursor"]:
+                return {"items": items, "next_cursor": page["next_cursor"]}
+            if len(items) >= limit:
+                # Older partitions only hold events after this page's last item
+                for older in partitions[index + 1:]:
+                    if await Database.db[older].find_one(query, {"_id": 1}):
+                        return {
+                            "items": items,
+                            "next_cursor": Database.encode_cursor(items[-1], "created_at")
+                        }
+                break
+        return {"items": items, "next_cursor": None}
+
+    @classmethod
+    async def drop_expired(cls, now: Optional[datetime] = None) -> int:
+        """Drop partitions whose every event is past EVENT_TOTAL_RETENTION_HOURS"""
+        now = now or datetime.now(timezone.utc)
+        threshold = now - timedelta(hours=settings.EVENT_TOTAL_RETENTION_HOURS)
+        dropped = 0
+        for name in await cls._existing():
+            _, partition_end = cls.bounds(name)
+            if partition_end <= threshold:
+                await Database.db.drop_collection(name)
+                cls._indexed.discard(name)
+                dropped += 1
+                logging.info(f"Dropped expired event partition {name}")
+        cls._metrics["partitions_dropped"] += dropped
+        return dropped
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        return {**cls._metrics, "mode": settings.EVENT_PARTITIONING}
@@ -0,0 +1,157 @@
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Optional, Tuple
+from pymongo import UpdateOne
+from app.services.database import Database
+import logging
+import re
+
+BUCKET_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+def parse_bucket_size(bucket: str) -> int:
+    """Parse a bucket size such as "5m", "1h" or "1d" into seconds"""
+    match = re.fullmatch(r"(\d+)([mhd])", bucket)
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError("Bucket must look like 5m, 1h or 1d")
+    return int(match.group(1)) * BUCKET_UNITS[match.group(2)]
+
+class EventRollupService:
+    """Per-trigger, per-minute event counters maintained as events are written"""
+    COLLECTION = "event_rollups"
+
+    @staticmethod
+    def _minute(timestamp: datetime) -> datetime:
+        return timestamp.replace(second=0, microsecond=0)
+
+    @staticmethod
+    async def record(events: List[Dict]):
+        """Fold a batch of events into their minute rollups with $inc upserts"""
+        rollups: Dict[Tuple[str, datetime], Dict] = {}
+        for event in events:
+            key = (event["trigger_id"], EventRollupService._minute(event["created_at"]))
+            rollup = rollups.setdefault(key, {
+                "counts": {
+                    "total": 0,
+                    "success": 0,
+                    "failed": 0,
+                    "test": 0,
+                    "manual": 0
+                },
+                "last_execution": event["execution_time"]
+            })
+            counts = rollup["counts"]
+            counts["total"] += 1
+            if event.get("status") == "success":
+                counts["success"] += 1
+            elif event.get("status") == "failed":
+                counts["failed"] += 1
+            if event.get("is_test"):
+                counts["test"] += 1
+            if event.get("is_manual"):
+                counts["manual"] += 1
+            rollup["last_execution"] = max(rollup["last_execution"], event["execution_time"])
+
+        operations = [
+            UpdateOne(
+                {"trigger_id": trigger_id, "bucket": bucket},
+                {
+                    "$inc": rollup["counts"],
+                    "$max": {"last_execution": rollup["last_execution"]}
+                },
+                upsert=True
+            )
+            for (trigger_id, bucket), rollup in rollups.items()
+        ]
+        if not operations:
+            return
+
+        try:
+            await Database.bulk_write(EventRollupService.COLLECTION, operations, ordered=False)
+        except Exception as e:
+            # Rollups are derived data; never fail the event write because of them
+            logging.error(f"Error recording event rollups: {str(e)}")
+
+    @staticmethod
+    async def get_stats(hours: int = 48) -> List[Dict]:
+        """Merge minute rollups into per-trigger statistics"""
+        db = Database.get_db()
+        time_threshold = EventRollupService._minute(
+            datetime.now(timezone.utc) - timedelta(hours=hours)
+        )
+
+        pipeline = [
+            {
+                "$match": {
+                    "bucket": {"$gte": time_threshold}
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$trigger_id",
+                    "total_executions": {"$sum": "$total"},
+                    "successful_executions": {"$sum": "$success"},
+                    "failed_executions": {"$sum": "$failed"},
+                    "test_executions": {"$sum": "$test"},
+                    "manual_executions": {"$sum": "$manual"},
+                    "last_execution": {"$max": "$last_execution"}
+                }
+            }
+        ]
+
+        return await db[EventRollupService.COLLECTION].aggregate(pipeline).to_list(None)
+
+    @staticmethod
+    async def get_timeseries(
+        hours: int = 48,
+        bucket: str = "5m",
+        trigger_id: Optional[str] = None
+    ) -> List[Dict]:
+        """Merge minute rollups into buckets of an arbitrary size for charting"""
+        bucket_ms = parse_bucket_size(bucket) * 1000
+        db = Database.get_db()
+        time_threshold = EventRollupService._minute(
+            datetime.now(timezone.utc) - timedelta(hours=hours)
+        )
+
+        match = {"bucket": {"$gte": time_threshold}}
+        if trigger_id:
+            match["trigger_id"] = trigger_id
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {
+                        "trigger_id": "$trigger_id",
+                        # Floor the minute bucket to the requested bucket size
+                        "bucket_start": {
+                            "$subtract": [
+                                "$bucket",
+                                {"$mod": [{"$toLong": "$bucket"}, bucket_ms]}
+                            ]
+                        }
+                    },
+                    "total_executions": {"$sum": "$total"},
+                    "successful_executions": {"$sum": "$success"},
+                    "failed_executions": {"$sum": "$failed"},
+                    "test_executions": {"$sum": "$test"},
+                    "manual_executions": {"$sum": "$manual"},
+                    "last_execution": {"$max": "$last_execution"}
+                }
+            },
+            {"$sort": {"_id.bucket_start": 1}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "trigger_id": "$_id.trigger_id",
+                    "bucket_start": "$_id.bucket_start",
+                    "total_executions": 1,
+                    "successful_executions": 1,
+                    "failed_executions": 1,
+                    "test_executions": 1,
+                    "manual_executions": 1,
+                    "last_execution": 1
+                }
+            }
+        ]
+
+        return await db[EventRollupService.COLLECTION].aggregate(pipeline).to_list(None)
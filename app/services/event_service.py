@@ -1,61 +1,19 @@
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, AsyncIterator
 from app.models.event import Event, EventStatus
 from app.services.database import Database
+from app.services.event_buffer import EventWriteBuffer
+from app.services.event_partitions import EventPartitions
+from app.services.archive_tier import ArchiveTier
+from app.services.blob_store import BlobStore
+from app.services.event_rollup import EventRollupService
+from app.services.retention import RetentionService
+from app.config import settings
 import logging
 import uuid
-import asyncio
 from bson.objectid import ObjectId
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 class EventService:
-    change_stream = None
-
-    @classmethod
-    async def setup_change_stream(cls):
-        """Setup change stream for event state management"""
-        pipeline = [
-            {
-                '$match': {
-                    'operationType': 'insert',
-                    'fullDocument.retention_state': 'active'
-                }
-            }
-        ]
-        
-        cls.change_stream = Database.db.events.watch(pipeline)
-        
-        async def process_changes():
-            async with cls.change_stream as stream:
-                async for change in stream:
-                    doc = change['fullDocument']
-                    # Schedule archival
-                    archive_at = doc['archive_time']
-                    scheduler.add_job(
-                        cls.archive_event,
-                        'date',
-                        run_date=archive_at,
-                        args=[str(doc['_id'])]
-                    )
-
-        asyncio.create_task(process_changes())
-
-    @staticmethod
-    async def archive_event(event_id: str):
-        """Archive a single event"""
-        now = datetime.now(timezone.utc)
-        query = {
-            "_id": ObjectId(event_id),
-            "retention_state": "active"
-        }
-        update = {
-            "$set": {
-                "retention_state": "archived",
-                "archived_at": now
-            }
-        }
-        await Database.update_one("events", query, update)
-
     @staticmethod
     async def create_event(
         trigger_id: str,
@@ -63,12 +21,16 @@ class EventService:
         is_test: bool = False,
         is_manual: bool = False,
         api_payload: Optional[Dict] = None,
-        response_data: Optional[Dict] = None
+        response_data: Optional[Dict] = None,
+        status: str = EventStatus.SUCCESS.value,
+        error_message: Optional[str] = None,
+        attempts: int = 1
     ) -> str:
         """Create an event log with all required information"""
         now = datetime.now(timezone.utc)
         
         event = {
+            "_id": ObjectId(),
             "trigger_id": trigger_id,
             "trigger_type": trigger_type,
             "is_test": is_test,
@@ -77,64 +39,133 @@ class EventService:
             "retention_state": "active",
             "api_payload": api_payload,
             "response_data": response_data,
+            "status": status,
+            "error_message": error_message,
+            "attempts": attempts,
             "created_at": now
         }
-        
-        return await Database.insert_one("events", event)
+
+        if EventWriteBuffer.is_running():
+            await EventWriteBuffer.add(event)
+            return str(event["_id"])
+
+        if BlobStore.enabled():
+            await BlobStore.store([event])
+        collection = await EventPartitions.collection_for_write(now)
+        event_id = await Database.insert_one(collection, event)
+        await EventRollupService.record([event])
+        return event_id
+
+    @staticmethod
+    def _recent_events_query(hours: int) -> Dict:
+        """Query for active events from the last N hours"""
+        time_threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return {
+            "created_at": {"$gte": time_threshold},
+            "retention_state": "active"  # Only active events
+        }
+
+    @staticmethod
+    def _archived_events_query(hours: int) -> Dict:
+        """Query for archived events from the N hours before the active window"""
+        now = datetime.now(timezone.utc)
+        active_threshold = now - timedelta(hours=settings.EVENT_ACTIVE_HOURS)
+        return {
+            "created_at": {
+                "$gte": active_threshold - timedelta(hours=hours),  # Not older than the archive window
+                "$lt": active_threshold                             # Past the active window
+            },
+            "retention_state": "archived"
+        }
+
+    @staticmethod
+    def _with_blobs(documents: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """Resolve blob refs on streamed events when payload dedup is on"""
+        return BlobStore.resolve_stream(documents) if BlobStore.enabled() else documents
+
+    @staticmethod
+    async def _page_with_blobs(page: Dict) -> Dict:
+        if BlobStore.enabled():
+            page["items"] = await BlobStore.resolve(page["items"])
+        return page
+
+    @staticmethod
+    def stream_recent_events(hours: int = settings.EVENT_ACTIVE_HOURS, raw: bool = False) -> AsyncIterator[Dict]:
+        """Stream recent events, newest first, without materializing them"""
+        # Raw documents cannot have their blob refs resolved
+        raw = raw and not BlobStore.enabled()
+        return EventService._with_blobs(
+            EventPartitions.iter_events(EventService._recent_events_query(hours), raw=raw)
+        )
+
+    @staticmethod
+    def stream_archived_events(hours: int = settings.EVENT_ARCHIVE_HOURS, raw: bool = False) -> AsyncIterator[Dict]:
+        """Stream archived events, newest first, without materializing them"""
+        if ArchiveTier.enabled():
+            return EventService._with_blobs(ArchiveTier.iter_events(EventService._archived_events_query(hours)))
+        raw = raw and not BlobStore.enabled()
+        return EventService._with_blobs(
+            EventPartitions.iter_events(EventService._archived_events_query(hours), raw=raw)
+        )
+
+    @staticmethod
+    async def get_recent_events_page(
+        limit: int,
+        cursor: Optional[str] = None,
+        hours: int = settings.EVENT_ACTIVE_HOURS,
+        raw: bool = False
+    ) -> Dict:
+        """Get one keyset page of recent events, newest first"""
+        return await EventService._page_with_blobs(await EventPartitions.find_page(
+            EventService._recent_events_query(hours), limit, cursor, raw=raw and not BlobStore.enabled()
+        ))
+
+    @staticmethod
+    async def get_archived_events_page(
+        limit: int,
+        cursor: Optional[str] = None,
+        hours: int = settings.EVENT_ARCHIVE_HOURS,
+        raw: bool = False
+    ) -> Dict:
+        """Get one keyset page of archived events, newest first"""
+        if ArchiveTier.enabled():
+            page = await ArchiveTier.find_page(EventService._archived_events_query(hours), limit, cursor)
+        else:
+            page = await EventPartitions.find_page(
+                EventService._archived_events_query(hours), limit, cursor, raw=raw and not BlobStore.enabled()
+            )
+        return await EventService._page_with_blobs(page)
 
     @staticmethod
-    async def get_recent_events() -> List[Dict]:
+    async def get_recent_events(hours: int = settings.EVENT_ACTIVE_HOURS) -> List[Dict]:
         """Get recent events (last 2 hours only)"""
         try:
-            time_threshold = datetime.now(timezone.utc) - timedelta(hours=2)
-            query = {
-                "created_at": {"$gte": time_threshold},
-                "retention_state": "active"  # Only active events
-            }
-            return await Database.find_many("events", query)
+            return [event async for event in EventService.stream_recent_events(hours)]
         except Exception as e:
             logging.error(f"Error getting recent events: {str(e)}")
             raise
 
     @staticmethod
-    async def get_archived_events() -> List[Dict]:
+    async def get_archived_events(hours: int = settings.EVENT_ARCHIVE_HOURS) -> List[Dict]:
         """Get archived events (2-48 hours old)"""
         try:
-            now = datetime.now(timezone.utc)
-            query = {
-                "created_at": {
-                    "$gte": now - timedelta(hours=48),  # Not older than 48 hours
-                    "$lt": now - timedelta(hours=2)     # At least 2 hours old
-                },
-                "retention_state": "archived"
-            }
-            return await Database.find_many("events", query)
+            return [event async for event in EventService.stream_archived_events(hours)]
         except Exception as e:
             logging.error(f"Error getting archived events: {str(e)}")
             raise
 
     @staticmethod
-    async def archive_events():
+    async def archive_events() -> int:
         """Archive events older than 2 hours"""
-        now = datetime.now(timezone.utc)
-        archive_threshold = now - timedelta(hours=2)
-        
-        # Find active events older than 2 hours
-        query = {
-            "retention_state": "active",
-            "created_at": {"$lt": archive_threshold}
-        }
-        update = {
-            "$set": {
-                "retention_state": "archived",
-                "archived_at": now
-            }
-        }
-        await Database.update_many("events", query, update)
+        return await RetentionService.sweep()
 
     @staticmethod
     async def cleanup_events():
         """Delete events older than 48 hours"""
+        if EventPartitions.enabled():
+            await EventPartitions.drop_expired()
+            return
+
         now = datetime.now(timezone.utc)
         delete_threshold = now - timedelta(hours=48)
         
@@ -147,38 +178,12 @@ class EventService:
     async def get_event_stats(hours: int = 48):
         """Get event statistics grouped by trigger"""
         try:
-            db = Database.get_db()
-            time_threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
-            
-            pipeline = [
-                {
-                    "$match": {
-                        "created_at": {"$gte": time_threshold}
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$trigger_id",
-                        "trigger_name": {"$first": "$trigger_name"},
-                        "total_executions": {"$sum": 1},
-                        "successful_executions": {
-                            "$sum": {"$cond": [{"$eq": ["$status", "success"]}, 1, 0]}
-                        },
-                        "failed_executions": {
-                            "$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}
-                        },
-                        "test_executions": {
-                            "$sum": {"$cond": ["$is_test", 1, 0]}
-                        },
-                        "manual_executions": {
-                            "$sum": {"$cond": ["$is_manual", 1, 0]}
-                        },
-                        "last_execution": {"$max": "$execution_time"}
-                    }
-                }
-            ]
-            
-            return await db.events.aggregate(pipeline).to_list(None)
+            return await EventRollupService.get_stats(hours)
         except Exception as e:
             logging.error(f"Error in get_event_stats: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+    @staticmethod
+    async def get_event_timeseries(hours: int = 48, bucket: str = "5m", trigger_id: Optional[str] = None):
+        """Get event statistics per time bucket"""
+        return await EventRollupService.get_timeseries(hours, bucket, trigger_id)
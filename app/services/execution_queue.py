@@ -0,0 +1,414 @@
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from app.services.database import Database
+from app.services.leader_election import LeaderElection
+from app.services.dead_letters import DeadLetterService
+from app.services.event_service import EventService
+from app.services.resilience import TriggerExecutionError
+from app.utils.scheduler import execute_api_trigger
+from app.config import settings
+import asyncio
+import logging
+
+class ExecutionQueue:
+    """MongoDB-backed queue of API trigger executions drained by async workers.
+
+    A worker leases a job by pushing its visible_at forward by the visibility
+    timeout and keeps extending it while the job runs. If the worker dies
+    mid-run the lease expires and the job is redelivered; after
+    EXECUTION_MAX_DELIVERIES expired leases it is failed. A retryable failure
+    puts the job back with visible_at set to its backoff, so retries wait in
+    the database rather than in a worker or request handler.
+    """
+    COLLECTION = "execution_queue"
+    _workers: List[asyncio.Task] = []
+    _wakeup: Optional[asyncio.Event] = None
+    _metrics: Dict = {
+        "enqueued": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "retried": 0,
+        "redelivered": 0,
+        "in_flight": 0,
+        "last_queue_wait_ms": 0.0,
+        "max_queue_wait_ms": 0.0
+    }
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return bool(cls._workers)
+
+    @classmethod
+    async def start(cls):
+        """Start EXECUTION_WORKERS workers"""
+        if cls.is_running() or settings.EXECUTION_WORKERS <= 0:
+            return
+        cls._wakeup = asyncio.Event()
+        cls._workers = [
+            asyncio.create_task(cls._run(f"{LeaderElection.node_id}:{index}"))
+            for index in range(settings.EXECUTION_WORKERS)
+        ]
+        logging.info(f"Execution queue started with {settings.EXECUTION_WORKERS} workers")
+
+    @classmethod
+    async def stop(cls):
+        """Stop the workers; leased jobs become visible again after their timeout"""
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+
+    @classmethod
+    async def enqueue(
+        cls,
+        trigger_id: str,
+        api_config: Dict,
+        payload: Optional[Dict] = None,
+        is_test: bool = False,
+        is_manual: bool = False,
+        attempts: int = 0,
+        delay_seconds: float = 0.0,
+        error_message: Optional[str] = None
+    ) -> str:
+        """Queue an API trigger execution and return its execution id.
+
+        `attempts` counts attempts already made elsewhere, e.g. the inline
+        first attempt of a synchronous /execute call.
+        """
+        now = datetime.now(timezone.utc)
+        execution_id = await Database.insert_one(cls.COLLECTION, cls._job_document(
+            trigger_id,
+            api_config,
+            payload,
+            is_test=is_test,
+            is_manual=is_manual,
+            attempts=attempts,
+            visible_at=now + timedelta(seconds=delay_seconds),
+            error_message=error_message,
+            now=now
+        ))
+        cls._metrics["enqueued"] += 1
+        if cls._wakeup is not None and not delay_seconds:
+            cls._wakeup.set()
+        return execution_id
+
+    @staticmethod
+    def _job_document(
+        trigger_id: str,
+        api_config: Dict,
+        payload: Optional[Dict],
+        is_test: bool,
+        is_manual: bool,
+        attempts: int,
+        visible_at: datetime,
+        error_message: Optional[str],
+        now: datetime
+    ) -> Dict:
+        return {
+            "trigger_id": trigger_id,
+            "api_config": api_config,
+            "payload": payload,
+            "is_test": is_test,
+            "is_manual": is_manual,
+            "status": "queued",
+            "attempts": attempts,
+            "error_message": error_message,
+            "visible_at": visible_at,
+            "created_at": now,
+            "updated_at": now
+        }
+
+    @classmethod
+    async def redrive_dead_letters(
+        cls,
+        trigger_id: Optional[str] = None,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        rate_per_second: Optional[float] = None
+    ) -> Dict:
+        """Queue dead letters for another run, oldest first, at a controlled rate.
+
+        Jobs get staggered visible_at times 1/rate apart, so the workers pick
+        them up no faster than `rate_per_second` however large the backlog.
+        Each batch is claimed with one update_many before its jobs are
+        inserted, so concurrent redrives never queue the same dead letter twice;
+        dead letters whose jobs fail to insert are handed back unclaimed.
+
+        The rate holds per call: each stagger starts at the call's own now, so
+        redrives running at the same time add up to the sum of their rates.
+        """
+        rate = rate_per_second or settings.REDRIVE_RATE_PER_SECOND
+        now = datetime.now(timezone.utc)
+        query = DeadLetterService.redrivable_query(trigger_id, ids)
+        redriven = 0
+
+        while limit is None or redriven < limit:
+            batch_size = settings.REDRIVE_BATCH_SIZE
+            if limit is not None:
+                batch_size = min(batch_size, limit - redriven)
+            candidates = await Database.find_many(
+                DeadLetterService.COLLECTION,
+                query,
+                projection={"_id": 1},
+                sort=[("created_at", 1)],
+                limit=batch_size
+            )
+            if not candidates:
+                break
+
+            redrive_id = ObjectId()
+            await Database.update_many(
+                DeadLetterService.COLLECTION,
+                {**query, "_id": {"$in": [ObjectId(dead_letter["id"]) for dead_letter in candidates]}},
+                {"$set": {"status": "redriven", "redrive_id": redrive_id, "redriven_at": now, "updated_at": now}}
+            )
+            claimed = await Database.find_many(
+                DeadLetterService.COLLECTION,
+                {"redrive_id": redrive_id},
+                sort=[("created_at", 1)]
+            )
+            if claimed:
+                jobs = []
+                for index, dead_letter in enumerate(claimed, start=redriven):
+                    job = cls._job_document(
+                        dead_letter["trigger_id"],
+                        dead_letter["api_config"],
+                        dead_letter.get("payload"),
+                        is_test=False,
+                        is_manual=dead_letter.get("is_manual", False),
+                        attempts=0,
+                        visible_at=now + timedelta(seconds=index / rate),
+                        error_message=None,
+                        now=now
+                    )
+                    job["dead_letter_id"] = dead_letter["id"]
+                    jobs.append(job)
+                try:
+                    await Database.insert_many(cls.COLLECTION, jobs, ordered=False)
+                except Exception as e:
+                    failed = range(len(jobs))
+                    if isinstance(e, BulkWriteError):
+                        failed = [error["index"] for error in e.details.get("writeErrors", [])]
+                    await cls._release_claim(redrive_id, [jobs[index]["dead_letter_id"] for index in failed])
+                    raise
+                redriven += len(jobs)
+                cls._metrics["enqueued"] += len(jobs)
+            # Keep serving requests while a large backlog is queued
+            await asyncio.sleep(0)
+
+        if redriven:
+            logging.info(f"Redrove {redriven} dead letters at {rate}/s")
+        return {
+            "redriven": redriven,
+            "rate_per_second": rate,
+            "completes_in_seconds": redriven / rate
+        }
+
+    @staticmethod
+    async def _release_claim(redrive_id: ObjectId, dead_letter_ids: List[str]):
+        """Put claimed dead letters whose jobs were not queued back up for redrive"""
+        await Database.update_many(
+            DeadLetterService.COLLECTION,
+            {"redrive_id": redrive_id, "_id": {"$in": [ObjectId(dead_letter_id) for dead_letter_id in dead_letter_ids]}},
+            {
+                "$set": {"status": "dead", "updated_at": datetime.now(timezone.utc)},
+                "$unset": {"redrive_id": "", "redriven_at": ""}
+            }
+        )
+
+    @classmethod
+    async def get_execution(cls, execution_id: str) -> Optional[Dict]:
+        """Get the status of an execution"""
+        if not ObjectId.is_valid(execution_id):
+            return None
+        execution = await Database.find_one(cls.COLLECTION, {"_id": ObjectId(execution_id)})
+        if execution:
+            # The lease bookkeeping is internal
+            for field in ("api_config", "locked_by", "visible_at"):
+                execution.pop(field, None)
+        return execution
+
+    @classmethod
+    async def _dequeue(cls, worker_id: str) -> Optional[Dict]:
+        """Lease the next visible job, including ones whose previous lease expired"""
+        now = datetime.now(timezone.utc)
+        job = await Database.db[cls.COLLECTION].find_one_and_update(
+            {
+                "status": {"$in": ["queued", "running"]},
+                "visible_at": {"$lte": now}
+            },
+            [{
+                "$set": {
+                    "status": "running",
+                    "locked_by": worker_id,
+                    "visible_at": now + timedelta(seconds=settings.EXECUTION_VISIBILITY_TIMEOUT_SECONDS),
+                    "started_at": now,
+                    "updated_at": now,
+                    "attempts": {"$add": ["$attempts", 1]},
+                    # Only an expired lease is a redelivery; queued retries are counted by attempts
+                    "redeliveries": {"$add": [
+                        {"$ifNull": ["$redeliveries", 0]},
+                        {"$cond": [{"$eq": ["$status", "running"]}, 1, 0]}
+                    ]}
+                }
+            }],
+            sort=[("visible_at", 1)],
+            # The previous status tells a crashed worker's job apart from a queued retry
+            return_document=ReturnDocument.BEFORE
+        )
+        if job is None:
+            return None
+        job.setdefault("redeliveries", 0)
+        if job["status"] == "running":
+            cls._metrics["redelivered"] += 1
+            job["redeliveries"] += 1
+        job["status"] = "running"
+        job["attempts"] += 1
+        return Database._convert_id(job)
+
+    @classmethod
+    async def _finish(cls, job: Dict, worker_id: str, status: str, error: Optional[str] = None):
+        """Record the outcome, unless the lease expired and another worker took the job"""
+        now = datetime.now(timezone.utc)
+        await Database.update_one(
+            cls.COLLECTION,
+            {"_id": ObjectId(job["id"]), "locked_by": worker_id},
+            {
+                "$set": {
+                    "status": status,
+                    "error_message": error,
+                    "finished_at": now,
+                    "updated_at": now
+                },
+                "$unset": {"locked_by": ""}
+            }
+        )
+        cls._metrics[status] += 1
+
+    @classmethod
+    async def _retry_later(cls, job: Dict, worker_id: str, error: TriggerExecutionError):
+        """Hand the job back to the queue, invisible until its backoff has passed"""
+        now = datetime.now(timezone.utc)
+        await Database.update_one(
+            cls.COLLECTION,
+            {"_id": ObjectId(job["id"]), "locked_by": worker_id},
+            {
+                "$set": {
+                    "status": "queued",
+                    "error_message": str(error),
+                    "visible_at": now + timedelta(seconds=error.retry_delay),
+                    "updated_at": now
+                },
+                "$unset": {"locked_by": ""}
+            }
+        )
+        cls._metrics["retried"] += 1
+
+    @classmethod
+    async def _heartbeat(cls, job: Dict, worker_id: str):
+        """Keep extending the job's lease while it runs, so slow calls are not redelivered"""
+        timeout = settings.EXECUTION_VISIBILITY_TIMEOUT_SECONDS
+        while True:
+            await asyncio.sleep(timeout / 3)
+            now = datetime.now(timezone.utc)
+            try:
+                await Database.update_one(
+                    cls.COLLECTION,
+                    {"_id": ObjectId(job["id"]), "locked_by": worker_id},
+                    {"$set": {"visible_at": now + timedelta(seconds=timeout), "updated_at": now}}
+                )
+            except Exception as e:
+                logging.error(f"Execution {job['id']} lease renewal failed: {str(e)}")
+
+    @classmethod
+    async def _process(cls, job: Dict, worker_id: str):
+        if job["redeliveries"] >= settings.EXECUTION_MAX_DELIVERIES:
+            await cls._finish(job, worker_id, "failed", "Exceeded maximum deliveries")
+            await EventService.create_event(
+                trigger_id=job["trigger_id"],
+                trigger_type="api",
+                is_test=job.get("is_test", False),
+                is_manual=job.get("is_manual", False),
+                api_payload=job.get("payload"),
+                status="failed",
+                error_message="Exceeded maximum deliveries",
+                attempts=job["attempts"] - 1
+            )
+            if not job.get("is_test", False):
+                await DeadLetterService.record(
+                    job["trigger_id"],
+                    job["api_config"],
+                    job.get("payload"),
+                    "Exceeded maximum deliveries",
+                    job["attempts"] - 1,
+                    is_manual=job.get("is_manual", False)
+                )
+            return
+
+        # visible_at still holds when the job became visible, so backoff is not counted as wait
+        visible_at = job["visible_at"]
+        if visible_at.tzinfo is None:
+            visible_at = visible_at.replace(tzinfo=timezone.utc)
+        wait_ms = max((datetime.now(timezone.utc) - visible_at).total_seconds() * 1000, 0.0)
+        cls._metrics["last_queue_wait_ms"] = wait_ms
+        cls._metrics["max_queue_wait_ms"] = max(cls._metrics["max_queue_wait_ms"], wait_ms)
+
+        cls._metrics["in_flight"] += 1
+        heartbeat = asyncio.create_task(cls._heartbeat(job, worker_id))
+        try:
+            await execute_api_trigger(
+                job["trigger_id"],
+                job["api_config"],
+                job.get("payload"),
+                is_test=job.get("is_test", False),
+                is_manual=job.get("is_manual", False),
+                attempt=job["attempts"]
+            )
+        except TriggerExecutionError as e:
+            if e.will_retry:
+                await cls._retry_later(job, worker_id, e)
+            else:
+                await cls._finish(job, worker_id, "failed", str(e))
+        except Exception as e:
+            await cls._finish(job, worker_id, "failed", str(e))
+        else:
+            await cls._finish(job, worker_id, "succeeded")
+        finally:
+            heartbeat.cancel()
+            cls._metrics["in_flight"] -= 1
+
+    @classmethod
+    async def _run(cls, worker_id: str):
+        """Drain the queue, sleeping until an enqueue or the poll interval when it is empty"""
+        interval = settings.EXECUTION_POLL_INTERVAL_MS / 1000
+        while True:
+            # Clear before looking so an enqueue that lands mid-dequeue still wakes us
+            cls._wakeup.clear()
+            try:
+                job = await cls._dequeue(worker_id)
+            except Exception as e:
+                logging.error(f"Execution queue dequeue error: {str(e)}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await cls._process(job, worker_id)
+            except Exception as e:
+                logging.error(f"Execution {job['id']} error: {str(e)}")
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Get execution counts and queue wait metrics"""
+        return {
+            **cls._metrics,
+            "workers": len(cls._workers)
+        }
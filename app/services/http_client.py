@@ -0,0 +1,67 @@
+import httpx
+import logging
+from typing import Dict, Optional
+from app.config import settings
+
+class HTTPClient:
+    client: httpx.AsyncClient = None
+
+    @classmethod
+    async def open_client(cls):
+        """Open the shared outbound HTTP client"""
+        if cls.client is None:
+            http2 = settings.HTTP2_ENABLED
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logging.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+                    http2 = False
+
+            cls.client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+                ),
+                timeout=httpx.Timeout(
+                    connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+                    read=settings.HTTP_READ_TIMEOUT_SECONDS,
+                    write=settings.HTTP_WRITE_TIMEOUT_SECONDS,
+                    pool=settings.HTTP_POOL_TIMEOUT_SECONDS
+                )
+            )
+            logging.info(f"Opened shared HTTP client (http2={http2})")
+
+    @classmethod
+    async def close_client(cls):
+        """Close the shared outbound HTTP client"""
+        if cls.client:
+            await cls.client.aclose()
+            cls.client = None
+            logging.info("Closed shared HTTP client")
+
+    @classmethod
+    async def get_client(cls) -> httpx.AsyncClient:
+        """Get the shared client, opening it lazily if startup did not"""
+        if cls.client is None:
+            await cls.open_client()
+        return cls.client
+
+    @classmethod
+    async def request(
+        cls,
+        method: str,
+        url: str,
+        json: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> httpx.Response:
+        """Send a request through the shared pool; callers apply OutboundLimiter"""
+        client = await cls.get_client()
+        return await client.request(
+            method=method,
+            url=url,
+            json=json,
+            headers=headers
+        )
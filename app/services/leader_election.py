@@ -0,0 +1,151 @@
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.services.database import Database
+from app.config import settings
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+class LeaderElection:
+    """MongoDB lease that lets exactly one process run the scheduler.
+
+    The leader renews its lease every LEADER_RENEW_INTERVAL_SECONDS and steps
+    down as soon as a renewal fails, well before the LEADER_LEASE_SECONDS
+    lease can expire and be taken by another node. Takeover callbacks run in
+    their own task so renewals keep going while a new leader rehydrates, and
+    losing the lease cancels a takeover still in progress.
+    """
+    COLLECTION = "scheduler_leases"
+    LEASE_ID = "scheduler"
+    node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    is_leader = False
+    lease_expires_at: Optional[datetime] = None
+    _task: Optional[asyncio.Task] = None
+    _election_task: Optional[asyncio.Task] = None
+    _on_elected: Optional[Callable[[], Awaitable[None]]] = None
+    _on_demoted: Optional[Callable[[], Awaitable[None]]] = None
+
+    @classmethod
+    async def start(
+        cls,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]]
+    ):
+        """Start campaigning for the lease"""
+        if cls._task is not None:
+            return
+        cls._on_elected = on_elected
+        cls._on_demoted = on_demoted
+        cls._task = asyncio.create_task(cls._run())
+        logging.info(f"Leader election started for node {cls.node_id}")
+
+    @classmethod
+    async def stop(cls):
+        """Stop campaigning and hand the lease back so another node can take over at once"""
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+
+        if cls.is_leader:
+            await cls._demote()
+            try:
+                await Database.update_one(
+                    cls.COLLECTION,
+                    {"_id": cls.LEASE_ID, "owner": cls.node_id},
+                    {"$set": {"expires_at": datetime.now(timezone.utc)}}
+                )
+            except Exception as e:
+                logging.error(f"Failed to release scheduler lease: {str(e)}")
+
+    @classmethod
+    async def _try_acquire(cls) -> bool:
+        """Take the lease if it is free or expired, or renew it if we hold it"""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=settings.LEADER_LEASE_SECONDS)
+        try:
+            await Database.db[cls.COLLECTION].find_one_and_update(
+                {
+                    "_id": cls.LEASE_ID,
+                    "$or": [
+                        {"owner": cls.node_id},
+                        {"expires_at": {"$lt": now}}
+                    ]
+                },
+                {"$set": {"owner": cls.node_id, "expires_at": expires_at, "renewed_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lease exists and is held by a live node
+            return False
+        cls.lease_expires_at = expires_at
+        return True
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            try:
+                acquired = await cls._try_acquire()
+            except Exception as e:
+                logging.error(f"Scheduler lease renewal failed: {str(e)}")
+                acquired = False
+
+            if acquired and not cls.is_leader:
+                cls.is_leader = True
+                cls._election_task = asyncio.create_task(cls._elect())
+            elif not acquired and cls.is_leader:
+                await cls._demote()
+
+            await asyncio.sleep(settings.LEADER_RENEW_INTERVAL_SECONDS)
+
+    @classmethod
+    async def _elect(cls):
+        logging.info(f"Node {cls.node_id} acquired the scheduler lease")
+        try:
+            await cls._on_elected()
+        except Exception as e:
+            logging.error(f"Error taking over scheduling: {str(e)}")
+
+    @classmethod
+    async def _demote(cls):
+        cls.is_leader = False
+        cls.lease_expires_at = None
+        if cls._election_task is not None and not cls._election_task.done():
+            cls._election_task.cancel()
+            try:
+                await cls._election_task
+            except asyncio.CancelledError:
+                pass
+        cls._election_task = None
+        logging.info(f"Node {cls.node_id} lost the scheduler lease")
+        try:
+            await cls._on_demoted()
+        except Exception as e:
+            logging.error(f"Error stepping down from scheduling: {str(e)}")
+
+    @classmethod
+    def holds_lease(cls) -> bool:
+        """Whether this node is leader and its last renewal has not expired"""
+        return (
+            cls.is_leader
+            and cls.lease_expires_at is not None
+            and cls.lease_expires_at > datetime.now(timezone.utc)
+        )
+
+    @classmethod
+    def get_status(cls) -> Dict:
+        return {
+            "enabled": cls._task is not None,
+            "node_id": cls.node_id,
+            "is_leader": cls.is_leader,
+            "lease_expires_at": cls.lease_expires_at
+        }
@@ -0,0 +1,311 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from app.config import settings
+import asyncio
+import httpx
+import time
+
+# Responses that mean the destination is over capacity
+OVERLOAD_STATUS_CODES = {429, 503}
+
+class Bulkhead:
+    """FIFO concurrency limit that queues callers instead of rejecting them"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.acquired = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def idle(self) -> bool:
+        return not self.active and not self._waiters
+
+    async def acquire(self):
+        start = time.perf_counter()
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # release() hands its slot straight to us, so active is already counted
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.acquired += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def set_limit(self, limit: int):
+        """Change the limit; a lower limit drains as in-flight calls finish"""
+        self.limit = max(limit, 1)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "avg_wait_ms": self.total_wait_ms / self.acquired if self.acquired else 0.0,
+            "max_wait_ms": self.max_wait_ms
+        }
+
+class AdaptiveBulkhead(Bulkhead):
+    """Bulkhead whose limit follows the destination's capacity (AIMD).
+
+    While the limit is actually in use, each full window of `limit` fast,
+    successful calls raises it by one. A timeout, a 429/503, latency above
+    ADAPTIVE_LATENCY_THRESHOLD_MS or an error rate above
+    ADAPTIVE_ERROR_RATE_THRESHOLD multiplies it by ADAPTIVE_BACKOFF_FACTOR,
+    at most once per cooldown so one burst of failures only backs off once;
+    the limit does not grow again until the cooldown has passed, and never
+    above `max_limit`.
+    """
+
+    def __init__(self, limit: int, max_limit: Optional[int] = None):
+        super().__init__(limit)
+        self.max_limit = max_limit or settings.ADAPTIVE_MAX_LIMIT
+        self._increase_credit = 0
+        self._last_decrease = 0.0
+        self.latency_ewma_ms = 0.0
+        self.error_rate = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    def record(self, latency_ms: float, overloaded: bool, failed: bool):
+        """Feed one finished call into the limit; call before release()"""
+        self.latency_ewma_ms += 0.1 * (latency_ms - self.latency_ewma_ms)
+        self.error_rate += 0.1 * ((1.0 if failed else 0.0) - self.error_rate)
+
+        cooling_down = time.monotonic() - self._last_decrease < settings.ADAPTIVE_DECREASE_COOLDOWN_SECONDS
+        if (
+            overloaded
+            or latency_ms > settings.ADAPTIVE_LATENCY_THRESHOLD_MS
+            or self.error_rate > settings.ADAPTIVE_ERROR_RATE_THRESHOLD
+        ):
+            self._increase_credit = 0
+            if not cooling_down:
+                self._decrease()
+        elif not failed and not cooling_down and (self.active >= self.limit or self.waiting):
+            # Only grow a limit that is the bottleneck, not one sitting idle
+            self._increase_credit += 1
+            if self._increase_credit >= self.limit:
+                self._increase_credit = 0
+                if self.limit < self.max_limit:
+                    self.increases += 1
+                    self.set_limit(self.limit + 1)
+
+    def _decrease(self):
+        self._last_decrease = time.monotonic()
+        limit = max(int(self.limit * settings.ADAPTIVE_BACKOFF_FACTOR), settings.ADAPTIVE_MIN_LIMIT)
+        if limit < self.limit:
+            self.decreases += 1
+            self.set_limit(limit)
+
+    def get_metrics(self) -> Dict:
+        return {
+            **super().get_metrics(),
+            "latency_ewma_ms": self.latency_ewma_ms,
+            "error_rate": self.error_rate,
+            "increases": self.increases,
+            "decreases": self.decreases
+        }
+
+class CallOutcome:
+    """Filled in by the caller inside OutboundLimiter.limit()"""
+    __slots__ = ("status_code",)
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+
+class TokenBucket:
+    """Token bucket where callers over the rate wait for their turn rather than fail"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiting = 0
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return not self.waiting and self.tokens >= self.burst
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take a token, sleeping until it is available; returns the wait in seconds"""
+        self._refill()
+        # Reserve the token up front (going negative) so waiters are served in order
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        delay = -self.tokens / self.rate
+        self.waiting += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Hand the reserved token back so a cancelled caller does not slow the rest
+            self.tokens += 1
+            raise
+        finally:
+            self.waiting -= 1
+        return delay
+
+class OutboundLimiter:
+    """Per-host bulkheads plus per-trigger bulkheads and rate limits for outbound calls.
+
+    Triggers can override the defaults with max_concurrency,
+    rate_limit_per_second and rate_limit_burst in their api_config.
+    """
+    _hosts: Dict[str, Bulkhead] = {}
+    _triggers: Dict[str, Tuple[Bulkhead, Optional[TokenBucket]]] = {}
+    _metrics: Dict = {
+        "rate_limited": 0,
+        "rate_limit_wait_ms": 0.0,
+        "max_rate_limit_wait_ms": 0.0
+    }
+
+    @classmethod
+    def _host_bulkhead(cls, host: str) -> Bulkhead:
+        bulkhead = cls._hosts.get(host)
+        if bulkhead is None:
+            if len(cls._hosts) >= settings.OUTBOUND_LIMITER_MAX_HOSTS:
+                cls._prune_hosts()
+            if settings.ADAPTIVE_CONCURRENCY_ENABLED:
+                # The configured per-host cap stays a hard ceiling; adapting only backs off below it
+                limit = min(settings.HTTP_MAX_CONNECTIONS_PER_HOST, settings.ADAPTIVE_MAX_LIMIT)
+                bulkhead = AdaptiveBulkhead(limit, max_limit=limit)
+            else:
+                bulkhead = Bulkhead(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            cls._hosts[host] = bulkhead
+        return bulkhead
+
+    @classmethod
+    def _trigger_limits(cls, trigger_id: str, api_config: Dict) -> Tuple[Bulkhead, Optional[TokenBucket]]:
+        concurrency = api_config.get("max_concurrency") or settings.TRIGGER_MAX_CONCURRENCY
+        rate = api_config.get("rate_limit_per_second") or settings.TRIGGER_RATE_LIMIT_PER_SECOND
+        burst = api_config.get("rate_limit_burst") or settings.TRIGGER_RATE_LIMIT_BURST
+
+        limits = cls._triggers.get(trigger_id)
+        if limits is None:
+            if len(cls._triggers) >= settings.OUTBOUND_LIMITER_MAX_TRIGGERS:
+                cls._prune()
+            limits = (Bulkhead(concurrency), TokenBucket(rate, burst) if rate > 0 else None)
+            cls._triggers[trigger_id] = limits
+            return limits
+
+        bulkhead, bucket = limits
+        if bulkhead.limit != concurrency:
+            bulkhead.set_limit(concurrency)
+        if rate <= 0:
+            bucket = None
+        elif bucket is None or (bucket.rate, bucket.burst) != (rate, burst):
+            bucket = TokenBucket(rate, burst)
+        cls._triggers[trigger_id] = (bulkhead, bucket)
+        return bulkhead, bucket
+
+    @classmethod
+    def _prune(cls):
+        """Forget triggers with nothing in flight; their limits start fresh next time"""
+        for trigger_id in [
+            trigger_id for trigger_id, (bulkhead, bucket) in cls._triggers.items()
+            if bulkhead.idle and (bucket is None or bucket.idle)
+        ]:
+            del cls._triggers[trigger_id]
+
+    @classmethod
+    def _prune_hosts(cls):
+        """Forget hosts with nothing in flight; an adaptive limit starts over next time"""
+        for host in [host for host, bulkhead in cls._hosts.items() if bulkhead.idle]:
+            del cls._hosts[host]
+
+    @classmethod
+    @asynccontextmanager
+    async def limit(cls, trigger_id: str, url: str, api_config: Dict) -> AsyncIterator[CallOutcome]:
+        """Wait for the trigger's rate limit, then hold a trigger slot and a host slot.
+
+        Set the response status on the yielded CallOutcome so an adaptive host
+        limit can learn from it; exceptions are observed automatically.
+        """
+        trigger_bulkhead, bucket = cls._trigger_limits(trigger_id, api_config)
+        if bucket is not None:
+            waited_ms = await bucket.acquire() * 1000
+            if waited_ms:
+                cls._metrics["rate_limited"] += 1
+                cls._metrics["rate_limit_wait_ms"] += waited_ms
+                cls._metrics["max_rate_limit_wait_ms"] = max(cls._metrics["max_rate_limit_wait_ms"], waited_ms)
+
+        host_bulkhead = cls._host_bulkhead(urlparse(url).netloc)
+        await trigger_bulkhead.acquire()
+        try:
+            await host_bulkhead.acquire()
+            outcome = CallOutcome()
+            start = time.perf_counter()
+            try:
+                yield outcome
+            except Exception as e:
+                if isinstance(host_bulkhead, AdaptiveBulkhead):
+                    host_bulkhead.record(
+                        (time.perf_counter() - start) * 1000,
+                        overloaded=isinstance(e, httpx.TimeoutException),
+                        failed=True
+                    )
+                raise
+            else:
+                if isinstance(host_bulkhead, AdaptiveBulkhead):
+                    status_code = outcome.status_code or 200
+                    host_bulkhead.record(
+                        (time.perf_counter() - start) * 1000,
+                        overloaded=status_code in OVERLOAD_STATUS_CODES,
+                        failed=status_code >= 500 or status_code in OVERLOAD_STATUS_CODES
+                    )
+            finally:
+                host_bulkhead.release()
+        finally:
+            trigger_bulkhead.release()
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Get queue depth and wait time per host, and totals across triggers"""
+        return {
+            **cls._metrics,
+            "hosts": {host: bulkhead.get_metrics() for host, bulkhead in cls._hosts.items()},
+            "host_limits": {host: bulkhead.limit for host, bulkhead in cls._hosts.items()},
+            "triggers_tracked": len(cls._triggers),
+            "triggers_waiting": sum(
+                bulkhead.waiting + (bucket.waiting if bucket else 0)
+                for bulkhead, bucket in cls._triggers.values()
+            )
+        }
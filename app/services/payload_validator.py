@@ -0,0 +1,279 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+import re
+
+try:
+    import fastjsonschema
+except ImportError:  # the built-in subset compiler below is used instead
+    fastjsonschema = None
+
+Validator = Callable[[Any], List[str]]
+
+# Type names accepted in legacy {"field": "type"} schemas
+_LEGACY_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "str": (str,),
+    "number": (int, float),
+    "float": (int, float),
+    "integer": (int,),
+    "int": (int,),
+    "boolean": (bool,),
+    "bool": (bool,),
+    "object": (dict,),
+    "dict": (dict,),
+    "array": (list,),
+    "list": (list,),
+    "null": (type(None),)
+}
+
+_JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+    "null": (type(None),)
+}
+
+class PayloadValidationError(ValueError):
+    """The payload does not match the trigger's payload_schema"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+# Top-level keys a JSON Schema may use; a legacy map with any other field name is not one
+_SCHEMA_KEYWORDS = frozenset({
+    "$schema", "$id", "$ref", "$defs", "definitions", "$comment",
+    "type", "properties", "required", "additionalProperties", "patternProperties",
+    "propertyNames", "minProperties", "maxProperties", "dependencies",
+    "items", "additionalItems", "contains", "minItems", "maxItems", "uniqueItems",
+    "enum", "const", "format", "pattern", "minLength", "maxLength", "multipleOf",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum",
+    "allOf", "anyOf", "oneOf", "not", "if", "then", "else",
+    "title", "description", "default", "examples"
+})
+
+def is_json_schema(schema: Dict) -> bool:
+    """Tell a JSON Schema apart from a legacy {"field": "type"} map.
+
+    `$schema` always marks a JSON Schema. Otherwise every key must be a
+    schema keyword and the schema must describe a container: "type" of
+    "object" or "array", or a well-formed "properties", "items" or
+    "required". Legacy maps such as {"type": "string"} stay legacy.
+    """
+    if "$schema" in schema:
+        return True
+    if not set(schema) <= _SCHEMA_KEYWORDS:
+        return False
+    structural = False
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        if not all(isinstance(name, str) and name in _JSON_TYPES for name in names):
+            return False
+        structural = "object" in names or "array" in names
+    if "properties" in schema:
+        properties = schema["properties"]
+        if not isinstance(properties, dict) or not all(isinstance(spec, dict) for spec in properties.values()):
+            return False
+        structural = True
+    if "items" in schema:
+        if not isinstance(schema["items"], (dict, list)):
+            return False
+        structural = True
+    if "required" in schema:
+        required = schema["required"]
+        if not isinstance(required, list) or not all(isinstance(name, str) for name in required):
+            return False
+        structural = True
+    return structural
+
+def _type_check(types: Tuple[type, ...]) -> Callable[[Any], bool]:
+    # bool is an int subclass, so keep true/false out of numeric types
+    if bool not in types and int in types:
+        return lambda value: isinstance(value, types) and not isinstance(value, bool)
+    return lambda value: isinstance(value, types)
+
+def _compile_legacy(schema: Dict, path: str = "") -> Validator:
+    checks = []
+    for key, spec in schema.items():
+        if isinstance(spec, dict):
+            checks.append((key, "object", _type_check((dict,)), _compile_legacy(spec, f"{path}{key}.")))
+        elif isinstance(spec, str) and spec.lower() in _LEGACY_TYPES:
+            checks.append((key, spec, _type_check(_LEGACY_TYPES[spec.lower()]), None))
+        else:
+            # Unknown type names only require the field to be present
+            checks.append((key, None, None, None))
+    checks = tuple(checks)
+
+    def validate(payload: Any) -> List[str]:
+        if not isinstance(payload, dict):
+            return [f"{path or 'payload'}: expected object"]
+        errors = []
+        for key, type_name, check, nested in checks:
+            if key not in payload:
+                errors.append(f"{path}{key}: is required")
+                continue
+            value = payload[key]
+            if check is not None and not check(value):
+                errors.append(f"{path}{key}: expected {type_name}")
+            elif nested is not None:
+                errors.extend(nested(value))
+        return errors
+    return validate
+
+def _compile_json_schema_subset(schema: Dict, path: str = "payload") -> Validator:
+    """Compile the commonly used JSON Schema keywords when fastjsonschema is not installed"""
+    checks: List[Callable[[Any], List[str]]] = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [_type_check(_JSON_TYPES[name]) for name in names]
+        expected = " or ".join(names)
+        checks.append(lambda value: [] if any(check(value) for check in type_checks) else [f"{path}: expected {expected}"])
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda value: [] if value in allowed else [f"{path}: must be one of {allowed}"])
+    if "const" in schema:
+        const = schema["const"]
+        checks.append(lambda value: [] if value == const else [f"{path}: must be {const!r}"])
+
+    bounds = [
+        ("minimum", lambda value, bound: value >= bound),
+        ("maximum", lambda value, bound: value <= bound),
+        ("exclusiveMinimum", lambda value, bound: value > bound),
+        ("exclusiveMaximum", lambda value, bound: value < bound)
+    ]
+    for keyword, compare in bounds:
+        if keyword in schema:
+            bound = schema[keyword]
+            checks.append(lambda value, bound=bound, compare=compare, keyword=keyword: (
+                [f"{path}: violates {keyword} {bound}"]
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and not compare(value, bound)
+                else []
+            ))
+
+    for keyword, compare, kind in (
+        ("minLength", lambda size, bound: size >= bound, str),
+        ("maxLength", lambda size, bound: size <= bound, str),
+        ("minItems", lambda size, bound: size >= bound, list),
+        ("maxItems", lambda size, bound: size <= bound, list)
+    ):
+        if keyword in schema:
+            bound = schema[keyword]
+            checks.append(lambda value, bound=bound, compare=compare, kind=kind, keyword=keyword: (
+                [f"{path}: violates {keyword} {bound}"]
+                if isinstance(value, kind) and not compare(len(value), bound)
+                else []
+            ))
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+        checks.append(lambda value: (
+            [f"{path}: does not match {pattern.pattern}"]
+            if isinstance(value, str) and not pattern.search(value)
+            else []
+        ))
+
+    properties = {
+        key: _compile_json_schema_subset(subschema, f"{path}.{key}")
+        for key, subschema in schema.get("properties", {}).items()
+    }
+    required = tuple(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    additional_validator = (
+        _compile_json_schema_subset(additional, f"{path}.*") if isinstance(additional, dict) else None
+    )
+    if properties or required or additional is not True:
+        def check_object(value: Any) -> List[str]:
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}.{key}: is required" for key in required if key not in value]
+            for key, item in value.items():
+                validator = properties.get(key)
+                if validator is not None:
+                    errors.extend(validator(item))
+                elif additional is False:
+                    errors.append(f"{path}.{key}: is not allowed")
+                elif additional_validator is not None:
+                    errors.extend(additional_validator(item))
+            return errors
+        checks.append(check_object)
+
+    if isinstance(schema.get("items"), dict):
+        item_validator = _compile_json_schema_subset(schema["items"], f"{path}[]")
+        checks.append(lambda value: (
+            [error for item in value for error in item_validator(item)] if isinstance(value, list) else []
+        ))
+
+    checks = tuple(checks)
+
+    def validate(value: Any) -> List[str]:
+        errors = []
+        for check in checks:
+            errors.extend(check(value))
+        return errors
+    return validate
+
+def _compile_json_schema(schema: Dict) -> Validator:
+    if fastjsonschema is None:
+        return _compile_json_schema_subset(schema)
+
+    compiled = fastjsonschema.compile(schema)
+
+    def validate(payload: Any) -> List[str]:
+        try:
+            compiled(payload)
+        except fastjsonschema.JsonSchemaValueException as e:
+            return [e.message]
+        return []
+    return validate
+
+def compile_schema(schema: Optional[Dict]) -> Validator:
+    """Compile a payload_schema (JSON Schema or legacy type map) into a validator returning errors"""
+    if not schema:
+        return lambda payload: []
+    try:
+        if is_json_schema(schema):
+            return _compile_json_schema(schema)
+        return _compile_legacy(schema)
+    except Exception as e:
+        raise ValueError(f"Invalid payload_schema: {str(e)}")
+
+class PayloadValidator:
+    """Compiled payload validators cached by (trigger id, updated_at)"""
+    _validators: "OrderedDict[Tuple[str, Any], Validator]" = OrderedDict()
+    _metrics: Dict = {
+        "hits": 0,
+        "compiles": 0
+    }
+
+    @classmethod
+    def get(cls, trigger_id: str, updated_at: Any, schema: Optional[Dict]) -> Validator:
+        """Get the trigger's validator, compiling it on first use or after the trigger changes"""
+        key = (trigger_id, updated_at)
+        validator = cls._validators.get(key)
+        if validator is not None:
+            cls._validators.move_to_end(key)
+            cls._metrics["hits"] += 1
+            return validator
+
+        validator = compile_schema(schema)
+        cls._metrics["compiles"] += 1
+        cls._validators[key] = validator
+        if len(cls._validators) > settings.PAYLOAD_VALIDATOR_CACHE_SIZE:
+            cls._validators.popitem(last=False)
+        return validator
+
+    @classmethod
+    def validate(cls, trigger_id: str, updated_at: Any, schema: Optional[Dict], payload: Any):
+        """Raise PayloadValidationError listing every problem with the payload"""
+        errors = cls.get(trigger_id, updated_at, schema)(payload)
+        if errors:
+            raise PayloadValidationError(errors)
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        return {**cls._metrics, "cached": len(cls._validators)}
@@ -0,0 +1,148 @@
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from app.config import settings
+import httpx
+import random
+import time
+
+# Statuses worth retrying: throttling and server-side failures
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised without calling out while a destination's circuit is open"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Circuit open for {host}, retry in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+class TriggerExecutionError(Exception):
+    """An API trigger attempt failed; will_retry tells the caller to queue retry_delay ahead"""
+
+    def __init__(
+        self,
+        message: str,
+        attempt: int,
+        retryable: bool,
+        will_retry: bool,
+        retry_delay: float = 0.0,
+        status_code: Optional[int] = None
+    ):
+        super().__init__(message)
+        self.attempt = attempt
+        self.retryable = retryable
+        self.will_retry = will_retry
+        self.retry_delay = retry_delay
+        self.status_code = status_code
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def for_config(cls, api_config: Dict) -> "RetryPolicy":
+        """Settings defaults, overridden by retry_max_attempts / retry_base_delay_seconds in api_config"""
+        return cls(
+            api_config.get("retry_max_attempts") or settings.RETRY_MAX_ATTEMPTS,
+            api_config.get("retry_base_delay_seconds") or settings.RETRY_BASE_DELAY_SECONDS,
+            settings.RETRY_MAX_DELAY_SECONDS
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the attempt after `attempt`, drawn uniformly up to the exponential cap"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, (CircuitOpenError, httpx.TransportError)):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one destination host.
+
+    After CIRCUIT_FAILURE_THRESHOLD failures in a row the circuit opens and
+    calls fail fast for CIRCUIT_RESET_SECONDS. Then a single probe is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        if self.state == "closed":
+            return
+        remaining = self.opened_at + settings.CIRCUIT_RESET_SECONDS - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.host, max(remaining, 0.0))
+
+    def release_probe(self):
+        """Free the half-open probe slot of a call that ended without an outcome, e.g. cancelled or a local error"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def get_metrics(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected
+        }
+
+class CircuitBreakers:
+    """Registry of circuit breakers keyed by destination host"""
+    _breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def for_url(cls, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            cls._breakers[host] = breaker
+        return breaker
+
+    @staticmethod
+    def counts_as_failure(error: Exception) -> bool:
+        """Only failures that say the destination is unhealthy trip the circuit"""
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            return status_code >= 500 or status_code == 429
+        return False
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        return {host: breaker.get_metrics() for host, breaker in cls._breakers.items()}
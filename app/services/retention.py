@@ -0,0 +1,237 @@
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+from bson.objectid import ObjectId
+from app.services.database import Database
+from app.services.event_partitions import EventPartitions
+from app.services.archive_tier import ArchiveTier
+from app.config import settings
+import asyncio
+import logging
+import time
+
+class RetentionService:
+    """Single sweeper that archives due events in bounded, resumable batches"""
+    CHECKPOINTS = "retention_checkpoints"
+    _batch_size: int = settings.RETENTION_BATCH_SIZE
+    _metrics: Dict = {
+        "runs": 0,
+        "last_run_at": None,
+        "last_run_archived": 0,
+        "last_run_batches": 0,
+        "last_run_duration_ms": 0.0,
+        "last_run_completed": True,
+        "interrupted_runs": 0,
+        "total_archived": 0,
+        "batch_size": settings.RETENTION_BATCH_SIZE,
+        "last_batch_ms": 0.0,
+        "checkpoint_at": None,
+        "lag_seconds": 0.0
+    }
+
+    @staticmethod
+    def _due_query(threshold: datetime) -> Dict:
+        return {
+            "retention_state": "active",
+            "created_at": {"$lt": threshold}
+        }
+
+    @classmethod
+    async def sweep(cls) -> int:
+        """Archive active events past the active window.
+
+        Each collection is walked in _id order from its persisted checkpoint,
+        one batch of at most RETENTION_BATCH_SIZE ids per update_many, with the
+        checkpoint saved after every batch. The batch size shrinks when a batch
+        overruns RETENTION_BATCH_TIME_BUDGET_MS, and a run stops after
+        RETENTION_MAX_BATCHES_PER_RUN batches or RETENTION_RUN_TIME_BUDGET_SECONDS;
+        the next run resumes from the checkpoint.
+        """
+        start = time.perf_counter()
+        deadline = start + settings.RETENTION_RUN_TIME_BUDGET_SECONDS
+        now = datetime.now(timezone.utc)
+        threshold = now - timedelta(hours=settings.EVENT_ACTIVE_HOURS)
+
+        # Oldest partition first; a single "events" collection when partitioning is off
+        collections = await EventPartitions.collections_between(
+            now - timedelta(hours=settings.EVENT_TOTAL_RETENTION_HOURS), threshold
+        )
+        collections.reverse()
+
+        progress = {"archived": 0, "batches": 0}
+        completed = True
+        for collection in collections:
+            if not await cls._sweep_collection(collection, threshold, now, deadline, progress):
+                completed = False
+                break
+
+        archived = progress["archived"]
+        cls._metrics["runs"] += 1
+        cls._metrics["last_run_at"] = now
+        cls._metrics["last_run_archived"] = archived
+        cls._metrics["last_run_batches"] = progress["batches"]
+        cls._metrics["last_run_duration_ms"] = (time.perf_counter() - start) * 1000
+        cls._metrics["last_run_completed"] = completed
+        cls._metrics["interrupted_runs"] += 0 if completed else 1
+        cls._metrics["total_archived"] += archived
+        cls._metrics["lag_seconds"] = await cls._get_lag_seconds(threshold, collections)
+
+        if archived:
+            logging.info(f"Retention sweep archived {archived} events in {progress['batches']} batches")
+        return archived
+
+    @classmethod
+    async def _sweep_collection(
+        cls,
+        collection: str,
+        threshold: datetime,
+        now: datetime,
+        deadline: float,
+        progress: Dict
+    ) -> bool:
+        """Archive one collection's due events; False if the run's budget ran out first"""
+        due = cls._due_query(threshold)
+        # Ids minted at or after the threshold cannot belong to due events, except
+        # for documents inserted with a backdated created_at (handled below)
+        upper = ObjectId.from_datetime(threshold)
+        checkpoint = await cls._load_checkpoint(collection)
+
+        while True:
+            if cls._out_of_budget(deadline, progress):
+                return False
+            id_range = {"$lt": upper}
+            if checkpoint:
+                id_range["$gt"] = checkpoint
+            ids, full = await cls._archive_batch(collection, {**due, "_id": id_range}, [("_id", 1)], now, progress)
+            if ids:
+                checkpoint = ids[-1]
+                await cls._save_checkpoint(collection, checkpoint, len(ids))
+            if not full:
+                break
+            # Let request handlers run between batches
+            await asyncio.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+        # Backdated inserts sit past the _id range; there are normally none
+        while True:
+            if cls._out_of_budget(deadline, progress):
+                return False
+            _, full = await cls._archive_batch(
+                collection, {**due, "_id": {"$gte": upper}}, [("created_at", 1)], now, progress
+            )
+            if not full:
+                break
+            await asyncio.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+        # With the cold tier on, events archived in place earlier are moved over too
+        while ArchiveTier.enabled():
+            if cls._out_of_budget(deadline, progress):
+                return False
+            _, full = await cls._archive_batch(
+                collection, {"retention_state": "archived"}, [("created_at", 1)], now, progress
+            )
+            if not full:
+                break
+            await asyncio.sleep(settings.RETENTION_BATCH_PAUSE_MS / 1000)
+        return True
+
+    @staticmethod
+    def _out_of_budget(deadline: float, progress: Dict) -> bool:
+        return (
+            progress["batches"] >= settings.RETENTION_MAX_BATCHES_PER_RUN
+            or time.perf_counter() >= deadline
+        )
+
+    @classmethod
+    async def _archive_batch(
+        cls,
+        collection: str,
+        query: Dict,
+        sort: List,
+        now: datetime,
+        progress: Dict
+    ) -> Tuple[List[ObjectId], bool]:
+        """Archive one batch; returns its ids and whether it was full (more may follow)"""
+        started = time.perf_counter()
+        batch_size = cls._batch_size
+        batch = await Database.find_many(
+            collection,
+            query,
+            projection={"_id": 1},
+            sort=sort,
+            limit=batch_size
+        )
+        ids = [ObjectId(event["id"]) for event in batch]
+        if ids:
+            progress["archived"] += await cls._archive(collection, ids, now)
+            progress["batches"] += 1
+
+        # Keep each batch inside its time budget: halve after an overrun, grow back when well under
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > settings.RETENTION_BATCH_TIME_BUDGET_MS:
+            cls._batch_size = max(batch_size // 2, settings.RETENTION_MIN_BATCH_SIZE)
+        elif elapsed_ms < settings.RETENTION_BATCH_TIME_BUDGET_MS / 2:
+            cls._batch_size = min(batch_size * 2, settings.RETENTION_BATCH_SIZE)
+        cls._metrics["batch_size"] = cls._batch_size
+        cls._metrics["last_batch_ms"] = elapsed_ms
+        return ids, len(ids) >= batch_size
+
+    @staticmethod
+    async def _archive(collection: str, ids: List[ObjectId], now: datetime) -> int:
+        """Move events to the cold tier, or flip them to archived in place"""
+        if ArchiveTier.enabled():
+            return await ArchiveTier.move(collection, ids, now)
+        return await Database.update_many(
+            collection,
+            {
+                "_id": {"$in": ids},
+                "retention_state": "active"
+            },
+            {
+                "$set": {
+                    "retention_state": "archived",
+                    "archived_at": now
+                }
+            }
+        )
+
+    @classmethod
+    async def _load_checkpoint(cls, collection: str) -> Optional[ObjectId]:
+        checkpoint = await Database.find_one(cls.CHECKPOINTS, {"_id": collection})
+        return checkpoint["last_id"] if checkpoint else None
+
+    @classmethod
+    async def _save_checkpoint(cls, collection: str, last_id: ObjectId, archived: int):
+        """Persist how far the _id walk got so an interrupted sweep resumes there"""
+        await Database.db[cls.CHECKPOINTS].update_one(
+            {"_id": collection},
+            {
+                "$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)},
+                "$inc": {"archived": archived}
+            },
+            upsert=True
+        )
+        cls._metrics["checkpoint_at"] = last_id.generation_time
+
+    @classmethod
+    async def _get_lag_seconds(cls, threshold: datetime, collections: List[str]) -> float:
+        """How long the oldest still-due event has been waiting past its archive time"""
+        for collection in collections:
+            oldest = await Database.find_many(
+                collection,
+                cls._due_query(threshold),
+                projection={"created_at": 1},
+                sort=[("created_at", 1)],
+                limit=1
+            )
+            if oldest:
+                break
+        else:
+            return 0.0
+        created_at = oldest[0]["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return max((threshold - created_at).total_seconds(), 0.0)
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Get how many events were processed and how far behind the sweeper is"""
+        return dict(cls._metrics)
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+from app.services.database import Database
+from app.config import settings
+import asyncio
+import copy
+import logging
+import time
+
+class TriggerCache:
+    """LRU/TTL cache of trigger documents keyed by trigger id.
+
+    Writes in this process invalidate directly; the change stream catches
+    writes from other processes. While the stream is down the cache is
+    bypassed, since invalidations could be missed.
+    """
+    change_stream = None
+    _watch_task: Optional[asyncio.Task] = None
+    _stream_down = False
+    # Bumped on every invalidation, so a fill that raced one can be dropped
+    _generation = 0
+    _entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+    _metrics: Dict = {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "invalidations": 0
+    }
+
+    @classmethod
+    def get(cls, trigger_id: str) -> Optional[Dict]:
+        """Get a cached trigger, or None on a miss or expired entry"""
+        if not settings.TRIGGER_CACHE_ENABLED or cls._stream_down:
+            return None
+
+        entry = cls._entries.get(trigger_id)
+        if entry is None:
+            cls._metrics["misses"] += 1
+            return None
+
+        expires_at, document = entry
+        if expires_at <= time.monotonic():
+            del cls._entries[trigger_id]
+            cls._metrics["misses"] += 1
+            return None
+
+        cls._entries.move_to_end(trigger_id)
+        cls._metrics["hits"] += 1
+        # Callers mutate trigger dicts, so never hand out the cached instance
+        return copy.deepcopy(document)
+
+    @classmethod
+    def generation(cls) -> int:
+        """Read before loading a trigger and pass to set()"""
+        return cls._generation
+
+    @classmethod
+    def set(cls, trigger_id: str, document: Dict, generation: Optional[int] = None):
+        """Cache a trigger, evicting the least recently used entries past the size bound.
+
+        Nothing is cached if an invalidation happened since `generation` was
+        read, as the document may predate it.
+        """
+        if not settings.TRIGGER_CACHE_ENABLED or cls._stream_down:
+            return
+        if generation is not None and generation != cls._generation:
+            return
+
+        expires_at = time.monotonic() + settings.TRIGGER_CACHE_TTL_SECONDS
+        cls._entries[trigger_id] = (expires_at, copy.deepcopy(document))
+        cls._entries.move_to_end(trigger_id)
+        while len(cls._entries) > settings.TRIGGER_CACHE_MAX_SIZE:
+            cls._entries.popitem(last=False)
+            cls._metrics["evictions"] += 1
+
+    @classmethod
+    def invalidate(cls, trigger_id: str):
+        """Drop a trigger from the cache"""
+        cls._generation += 1
+        if cls._entries.pop(trigger_id, None) is not None:
+            cls._metrics["invalidations"] += 1
+
+    @classmethod
+    def clear(cls):
+        cls._generation += 1
+        cls._entries.clear()
+
+    @classmethod
+    async def warm(cls):
+        """Load active triggers into the cache, up to its size bound"""
+        if not settings.TRIGGER_CACHE_ENABLED:
+            return
+
+        query = {"is_deleted": False, "is_active": True}
+        count = 0
+        async for trigger in Database.iter_many(
+            "triggers",
+            query,
+            sort=[("created_at", -1)],
+            limit=settings.TRIGGER_CACHE_MAX_SIZE
+        ):
+            cls.set(trigger["id"], trigger)
+            count += 1
+        logging.info(f"Warmed trigger cache with {count} triggers")
+
+    @classmethod
+    async def setup_change_stream(cls):
+        """Setup change stream for trigger cache invalidation.
+
+        Returns once the stream is open (or after a short wait), so a warm()
+        that follows cannot miss invalidations. Until it opens the cache is
+        bypassed.
+        """
+        if not settings.TRIGGER_CACHE_ENABLED or cls._watch_task is not None:
+            return
+        cls._stream_down = True
+        opened = asyncio.Event()
+
+        pipeline = [
+            {
+                '$match': {
+                    'operationType': {'$in': ['update', 'replace', 'delete']}
+                }
+            }
+        ]
+
+        async def process_changes():
+            failures = 0
+            while True:
+                try:
+                    async with Database.db.triggers.watch(pipeline) as stream:
+                        cls.change_stream = stream
+                        if cls._stream_down:
+                            # Changes made while the stream was down were never seen
+                            cls.clear()
+                            cls._stream_down = False
+                        failures = 0
+                        opened.set()
+                        async for change in stream:
+                            cls.invalidate(str(change['documentKey']['_id']))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Without invalidation events, bypass the cache until the stream is back
+                    cls._stream_down = True
+                    cls.clear()
+                    failures += 1
+                    delay = min(2 ** failures, 60)
+                    logging.error(f"Trigger cache change stream stopped, restarting in {delay}s: {str(e)}")
+                    await asyncio.sleep(delay)
+
+        cls._watch_task = asyncio.create_task(process_changes())
+        try:
+            await asyncio.wait_for(opened.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            logging.warning("Trigger cache change stream is not open yet; bypassing the cache until it is")
+
+    @classmethod
+    def get_metrics(cls) -> Dict:
+        """Get hit/miss counters and current size"""
+        lookups = cls._metrics["hits"] + cls._metrics["misses"]
+        return {
+            **cls._metrics,
+            "enabled": settings.TRIGGER_CACHE_ENABLED,
+            "bypassed": cls._stream_down,
+            "size": len(cls._entries),
+            "max_size": settings.TRIGGER_CACHE_MAX_SIZE,
+            "hit_ratio": cls._metrics["hits"] / lookups if lookups else 0.0
+        }
@@ -1,6 +1,7 @@
 from app.models.trigger import Trigger, TriggerType
 from app.models.event import Event
 from app.services.event_service import EventService
+from app.services.payload_validator import PayloadValidator
 from datetime import datetime, timedelta
 import asyncio
 import logging
@@ -45,7 +46,7 @@ class TriggerExecutor:
     async def execute_api_trigger(trigger: Trigger, payload: dict) -> Optional[Event]:
         try:
             # Validate payload against schema
-            if not TriggerExecutor._validate_payload(trigger.api_schema, payload):
+            if not TriggerExecutor._validate_payload(trigger, payload):
                 raise ValueError("Invalid payload for trigger schema")
 
             event_data = {
@@ -62,19 +63,12 @@ class TriggerExecutor:
             return None
 
     @staticmethod
-    def _validate_payload(schema: dict, payload: dict) -> bool:
+    def _validate_payload(trigger: Trigger, payload: dict) -> bool:
         """
         Validate that the payload matches the expected schema
         """
-        try:
-            for key, value_type in schema.items():
-                if key not in payload:
-                    return False
-                if not isinstance(payload[key], eval(value_type)):
-                    return False
-            return True
-        except Exception:
-            return False
+        validator = PayloadValidator.get(trigger.id, getattr(trigger, "updated_at", None), trigger.api_schema)
+        return not validator(payload)
 
     @staticmethod
     async def _schedule_next_execution(trigger: Trigger):
@@ -1,9 +1,11 @@
 from app.models.trigger import Trigger, TriggerCreate, TriggerUpdate, TriggerType, ScheduleType
 from app.services.database import Database
+from app.services.trigger_cache import TriggerCache
+from app.services.payload_validator import compile_schema
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 import logging
-from app.utils.scheduler import add_scheduled_trigger, execute_api_trigger
+from app.utils.scheduler import add_scheduled_trigger, execute_api_trigger, remove_scheduled_trigger
 from bson import ObjectId
 
 class TriggerService:
@@ -33,6 +35,8 @@ class TriggerService:
             api_config = trigger_dict["api_config"]
             # Ensure endpoint is string
             api_config["endpoint"] = str(api_config["endpoint"])
+            # Reject schemas that cannot be compiled before anything is stored
+            compile_schema(api_config["payload_schema"])
             trigger_doc["api_config"] = api_config
 
         # For test triggers, set expiry
@@ -67,28 +71,55 @@ class TriggerService:
             # Validate ObjectId format first
             if not ObjectId.is_valid(trigger_id):
                 return None
-            
+
+            cached = TriggerCache.get(trigger_id)
+            if cached:
+                return cached
+            generation = TriggerCache.generation()
+
             query = {
                 "_id": ObjectId(trigger_id),
                 "is_deleted": False
             }
-            return await Database.find_one("triggers", query)
+            trigger = await Database.find_one("triggers", query)
+            if trigger:
+                TriggerCache.set(trigger_id, trigger, generation)
+            return trigger
         except Exception as e:
             logging.error(f"Error getting trigger: {str(e)}")
             return None
 
     @staticmethod
-    async def get_all_triggers(active_only: bool = True) -> List[Dict]:
+    async def get_all_triggers(active_only: bool = True, raw: bool = False) -> List[Dict]:
         """Get all triggers"""
         try:
             query = {"is_deleted": False}
             if active_only:
                 query["is_active"] = True
-            return await Database.find_many("triggers", query)
+            return await Database.find_many("triggers", query, raw=raw)
         except Exception as e:
             logging.error(f"Error getting triggers: {str(e)}")
             raise
 
+    @staticmethod
+    async def get_triggers_page(
+        limit: int,
+        cursor: Optional[str] = None,
+        active_only: bool = True,
+        raw: bool = False
+    ) -> Dict:
+        """Get one keyset page of triggers, newest first"""
+        try:
+            query = {"is_deleted": False}
+            if active_only:
+                query["is_active"] = True
+            return await Database.find_page("triggers", query, limit, cursor, raw=raw)
+        except ValueError:
+            raise
+        except Exception as e:
+            logging.error(f"Error getting triggers page: {str(e)}")
+            raise
+
     @staticmethod
     async def update_trigger(trigger_id: str, trigger: TriggerUpdate) -> bool:
         """Update a trigger"""
@@ -133,6 +164,7 @@ class TriggerService:
             success = await Database.update_one("triggers", query, update)
             
             if success:
+                TriggerCache.invalidate(trigger_id)
                 logging.info(f"Trigger {trigger_id} updated successfully")
             return success
 
@@ -155,11 +187,9 @@ class TriggerService:
             result = await Database.update_one("triggers", query, update)
             
             if result:
+                TriggerCache.invalidate(trigger_id)
                 # Deactivate any scheduled jobs
-                from app.utils.scheduler import scheduler
-                job_id = f"{trigger_id}_permanent"
-                if scheduler.get_job(job_id):
-                    scheduler.remove_job(job_id)
+                remove_scheduled_trigger(trigger_id)
             
             return result
         except Exception as e:
@@ -174,7 +204,8 @@ class TriggerService:
                 await execute_api_trigger(
                     "test",
                     trigger.api_config.model_dump(),
-                    is_test=True
+                    is_test=True,
+                    max_attempts=1
                 )
                 return {"message": "API trigger tested successfully"}
             else:
@@ -0,0 +1,33 @@
+from typing import Tuple
+from app.config import settings
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zlib is used instead
+    zstandard = None
+
+_compressor = None
+_decompressor = None
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress with zstd when available, else zlib; returns (codec, compressed bytes)"""
+    global _compressor
+    if zstandard is not None:
+        if _compressor is None:
+            _compressor = zstandard.ZstdCompressor(level=settings.ARCHIVE_COMPRESSION_LEVEL)
+        return "zstd", _compressor.compress(data)
+    return "zlib", zlib.compress(data, min(settings.ARCHIVE_COMPRESSION_LEVEL, 9))
+
+def decompress(codec: str, data: bytes) -> bytes:
+    """Reverse compress() for the codec it reported"""
+    global _decompressor
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed data needs the 'zstandard' package")
+        if _decompressor is None:
+            _decompressor = zstandard.ZstdDecompressor()
+        return _decompressor.decompress(data)
+    raise ValueError(f"Unknown compression codec: {codec}")
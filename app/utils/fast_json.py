@@ -0,0 +1,56 @@
+from typing import Any, Union
+from bson import ObjectId, decode
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.config import settings
+import json
+
+try:
+    import orjson
+except ImportError:  # responses fall back to jsonable_encoder + json
+    orjson = None
+
+# Read mode for Database.iter_many(raw=True): documents stay as undecoded BSON
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+def _default(value: Any) -> Any:
+    """orjson hook for the BSON types it does not know"""
+    if isinstance(value, RawBSONDocument):
+        # Decode straight to a dict and rename _id while it is being serialized
+        document = decode(value.raw)
+        if "_id" in document:
+            document["id"] = str(document.pop("_id"))
+        return document
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError
+
+def dumps(content: Any) -> bytes:
+    """Encode API content, including raw BSON documents, as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(jsonable_encoder(_to_python(content))).encode()
+
+def _to_python(content: Any) -> Any:
+    # Slow-path conversion for raw documents when orjson is not installed
+    if isinstance(content, RawBSONDocument):
+        return _default(content)
+    if isinstance(content, dict):
+        return {key: _to_python(value) for key, value in content.items()}
+    if isinstance(content, list):
+        return [_to_python(value) for value in content]
+    return content
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, bypassing jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def json_response(content: Any) -> Union[FastJSONResponse, Any]:
+    """Wrap content in a FastJSONResponse when FAST_JSON is on, else let FastAPI encode it"""
+    if settings.FAST_JSON:
+        return FastJSONResponse(content)
+    return content
@@ -2,15 +2,42 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.base import BaseTrigger
 from datetime import datetime, timezone, timedelta
-import httpx
+from typing import Optional, Tuple, List, Dict, Set
 from app.utils.logger import logger
+from app.services.database import Database
+from app.config import settings
 from app.services.event_service import EventService
+from app.services.retention import RetentionService
+from app.services.leader_election import LeaderElection
+from app.services.http_client import HTTPClient
+from app.services.outbound_limits import OutboundLimiter
+from app.services.resilience import RetryPolicy, CircuitBreakers, CircuitOpenError, TriggerExecutionError
+from app.services.dead_letters import DeadLetterService
+from app.utils.timing_wheel import TimingWheelScheduler
+from bson import ObjectId
+from pymongo import UpdateOne
+from functools import lru_cache
+import asyncio
+import httpx
+import inspect
+import time
+import uuid
 
-scheduler = AsyncIOScheduler()
+scheduler = AsyncIOScheduler(timezone=timezone.utc)
+
+@lru_cache(maxsize=None)
+def _daily_cron_trigger(hour: int, minute: int) -> CronTrigger:
+    """Cron triggers are stateless, so jobs firing at the same time can share one"""
+    return CronTrigger(hour=hour, minute=minute, timezone=timezone.utc)
 
 async def execute_scheduled_trigger(trigger_id: str, is_test: bool = False):
     """Execute a scheduled trigger"""
+    if not _owns_schedule():
+        # Lost the lease after the job was submitted; the new leader fires it
+        logger.warning(f"Skipping trigger {trigger_id}: this node is not the scheduler leader")
+        return
     try:
         logger.info(f"Executing scheduled trigger: {trigger_id}")
         await EventService.create_event(
@@ -29,101 +56,702 @@ async def execute_api_trigger(
     api_config: dict,
     payload: dict = None,
     is_test: bool = False,
-    is_manual: bool = False
+    is_manual: bool = False,
+    attempt: int = 1,
+    max_attempts: Optional[int] = None
 ):
-    """Execute an API trigger"""
+    """Make one attempt at an API trigger.
+
+    Raises TriggerExecutionError on failure. When its will_retry is set the
+    caller should queue attempt + 1 after retry_delay; otherwise the failure
+    is final and has been recorded as a failed event and a dead letter.
+    """
+    policy = RetryPolicy.for_config(api_config)
+    max_attempts = max_attempts or policy.max_attempts
+    breaker = CircuitBreakers.for_url(api_config["endpoint"])
     try:
-        logger.info(f"Executing API trigger: {trigger_id}")
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=api_config["method"],
-                url=api_config["endpoint"],
-                json=payload or api_config["payload_schema"],
-                headers=api_config.get("headers", {})
-            )
+        logger.info(f"Executing API trigger: {trigger_id} (attempt {attempt})")
+        # Fail fast without taking a connection while the destination is down
+        breaker.before_call()
+        try:
+            async with OutboundLimiter.limit(trigger_id, api_config["endpoint"], api_config) as outcome:
+                response = await HTTPClient.request(
+                    method=api_config["method"],
+                    url=api_config["endpoint"],
+                    json=payload or api_config["payload_schema"],
+                    headers=api_config.get("headers", {})
+                )
+                outcome.status_code = response.status_code
             response.raise_for_status()
-            logger.info(f"API trigger {trigger_id} executed successfully")
-
-        await EventService.create_event(
-            trigger_id=trigger_id,
-            trigger_type="api",
-            is_test=is_test,
-            is_manual=is_manual,
-            api_payload=payload,
-            response_data=response.json()
-        )
+        except asyncio.CancelledError:
+            # A cancelled probe says nothing about the destination; let the next call probe
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if CircuitBreakers.counts_as_failure(e):
+                breaker.record_failure()
+            elif isinstance(e, httpx.HTTPStatusError):
+                # The destination answered, just not with a 2xx
+                breaker.record_success()
+            else:
+                # A local error never reached the destination, so it proves nothing either way
+                breaker.release_probe()
+            raise
+        breaker.record_success()
+        logger.info(f"API trigger {trigger_id} executed successfully")
     except Exception as e:
-        logger.error(f"Failed to execute API trigger {trigger_id}: {str(e)}")
-        raise
+        retryable = RetryPolicy.is_retryable(e)
+        will_retry = retryable and attempt < max_attempts
+        retry_delay = 0.0
+        if will_retry:
+            retry_delay = policy.backoff(attempt)
+            if isinstance(e, CircuitOpenError):
+                retry_delay = max(retry_delay, e.retry_after)
+            logger.warning(
+                f"API trigger {trigger_id} attempt {attempt} failed, retrying in {retry_delay:.1f}s: {str(e)}"
+            )
+        else:
+            logger.error(f"Failed to execute API trigger {trigger_id}: {str(e)}")
+            await EventService.create_event(
+                trigger_id=trigger_id,
+                trigger_type="api",
+                is_test=is_test,
+                is_manual=is_manual,
+                api_payload=payload,
+                status="failed",
+                error_message=str(e),
+                attempts=attempt
+            )
+        status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+        if not will_retry and not is_test:
+            await DeadLetterService.record(
+                trigger_id,
+                api_config,
+                payload,
+                str(e),
+                attempt,
+                status_code=status_code,
+                is_manual=is_manual
+            )
+        raise TriggerExecutionError(
+            str(e),
+            attempt,
+            retryable,
+            will_retry,
+            retry_delay,
+            status_code
+        ) from e
 
-async def add_scheduled_trigger(trigger_id: str, schedule_config: dict, is_test: bool = False):
-    """Add a scheduled trigger to the scheduler"""
-    now = datetime.now(timezone.utc)
+    try:
+        response_data = response.json()
+    except ValueError:
+        response_data = None
+    await EventService.create_event(
+        trigger_id=trigger_id,
+        trigger_type="api",
+        is_test=is_test,
+        is_manual=is_manual,
+        api_payload=payload,
+        response_data=response_data,
+        attempts=attempt
+    )
+    return response_data
+
+def _as_utc(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; make them timezone-aware"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
+def _build_trigger(
+    schedule_config: dict,
+    reference_time: datetime,
+    now: datetime
+) -> Optional[Tuple[BaseTrigger, Optional[datetime]]]:
+    """Build the APScheduler trigger and cleanup time, or None if nothing is left to run"""
     if schedule_config["schedule_type"] == "one_time":
         if schedule_config.get("specific_date"):
             # Use exact date-time
-            trigger = DateTrigger(run_date=schedule_config["specific_date"])
-            cleanup_time = schedule_config["specific_date"] + timedelta(minutes=1)
+            run_date = _as_utc(schedule_config["specific_date"])
         elif schedule_config.get("specific_time"):
-            trigger = DateTrigger(run_date=schedule_config["specific_time"])
-            cleanup_time = schedule_config["specific_time"] + timedelta(minutes=1)
+            run_date = _as_utc(schedule_config["specific_time"])
         else:
-            run_date = now + timedelta(
+            run_date = reference_time + timedelta(
                 **{schedule_config["interval_type"]: schedule_config["interval_value"]}
             )
-            trigger = DateTrigger(run_date=run_date)
-            cleanup_time = run_date + timedelta(minutes=1)
-    else:  # recurring
-        if schedule_config.get("specific_time"):
-            time_config = schedule_config["specific_time"]
-            trigger = CronTrigger(
-                hour=time_config["hour"],
-                minute=time_config["minute"]
+        if run_date <= now:
+            return None
+        return DateTrigger(run_date=run_date, timezone=timezone.utc), run_date + timedelta(minutes=1)
+
+    # recurring
+    if schedule_config.get("specific_time"):
+        time_config = schedule_config["specific_time"]
+        return _daily_cron_trigger(time_config["hour"], time_config["minute"]), None
+
+    interval = timedelta(**{schedule_config["interval_type"]: schedule_config["interval_value"]})
+    trigger = IntervalTrigger(
+        start_date=reference_time + interval,
+        timezone=timezone.utc,
+        **{schedule_config["interval_type"]: schedule_config["interval_value"]}
+    )
+    return trigger, None
+
+def next_run_time(
+    schedule_config: dict,
+    reference_time: datetime,
+    now: datetime
+) -> Optional[Tuple[datetime, Optional[timedelta]]]:
+    """Next run strictly after `now` and the repeat interval, or None if nothing is left to run.
+
+    Matches the APScheduler triggers built by _build_trigger: daily times are
+    UTC, and intervals keep their phase from `reference_time`.
+    """
+    if schedule_config["schedule_type"] == "one_time":
+        built = _build_trigger(schedule_config, reference_time, now)
+        return (built[0].run_date, None) if built else None
+
+    if schedule_config.get("specific_time"):
+        time_config = schedule_config["specific_time"]
+        run_time = now.replace(hour=time_config["hour"], minute=time_config["minute"], second=0, microsecond=0)
+        if run_time <= now:
+            run_time += timedelta(days=1)
+        return run_time, timedelta(days=1)
+
+    interval = timedelta(**{schedule_config["interval_type"]: schedule_config["interval_value"]})
+    run_time = reference_time + interval
+    if run_time <= now:
+        run_time += ((now - run_time) // interval + 1) * interval
+    return run_time, interval
+
+def _job_options() -> dict:
+    """Explicit job options; the scheduler only fills defaults in when these are missing"""
+    return {
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SECONDS
+    }
+
+def _trigger_jobs(
+    trigger_id: str,
+    schedule_config: dict,
+    is_test: bool,
+    trigger: BaseTrigger,
+    cleanup_time: Optional[datetime]
+) -> List[dict]:
+    """Describe the add_job calls for a trigger and its optional cleanup"""
+    jobs = [{
+        "func": execute_scheduled_trigger,
+        "trigger": trigger,
+        "args": [trigger_id, is_test],
+        "id": f"{trigger_id}_{'test' if is_test else 'permanent'}",
+        **_job_options()
+    }]
+    if (schedule_config["schedule_type"] == "one_time" or is_test) and cleanup_time:
+        jobs.append({
+            "func": cleanup_trigger,
+            "trigger": DateTrigger(run_date=cleanup_time, timezone=timezone.utc),
+            "args": [trigger_id, is_test],
+            "id": f"{trigger_id}_cleanup",
+            **_job_options()
+        })
+    return jobs
+
+def _register_scheduled_trigger(
+    trigger_id: str,
+    schedule_config: dict,
+    is_test: bool = False,
+    reference_time: Optional[datetime] = None,
+    now: Optional[datetime] = None
+):
+    """Register a scheduled trigger's jobs, or return None if it has nothing left to run"""
+    now = now or datetime.now(timezone.utc)
+    # Relative schedules count from when the trigger was created, so a
+    # rehydrated trigger keeps its original phase instead of restarting at boot
+    reference_time = _as_utc(reference_time) if reference_time else now
+
+    if _use_timing_wheel():
+        return _register_wheel_timer(trigger_id, schedule_config, is_test, reference_time, now)
+
+    built = _build_trigger(schedule_config, reference_time, now)
+    if built is None:
+        return None
+
+    jobs = [
+        scheduler.add_job(replace_existing=True, **job)
+        for job in _trigger_jobs(trigger_id, schedule_config, is_test, *built)
+    ]
+    return jobs[0]
+
+def _register_wheel_timer(
+    trigger_id: str,
+    schedule_config: dict,
+    is_test: bool,
+    reference_time: datetime,
+    now: datetime
+) -> Optional[str]:
+    """Put a trigger on the timing wheel; one-time timers drop themselves after firing"""
+    planned = next_run_time(schedule_config, reference_time, now)
+    if planned is None:
+        return None
+    run_time, interval = planned
+    key = f"{trigger_id}_{'test' if is_test else 'permanent'}"
+    timing_wheel.add(
+        key,
+        run_time.timestamp(),
+        interval.total_seconds() if interval else 0.0,
+        (trigger_id, is_test)
+    )
+    return key
+
+async def add_scheduled_trigger(trigger_id: str, schedule_config: dict, is_test: bool = False):
+    """Add a scheduled trigger to the scheduler"""
+    if not _owns_schedule():
+        # The leader picks the trigger up from the triggers change stream
+        return None
+    if _use_polling() and ObjectId.is_valid(trigger_id):
+        return await _store_next_run_at(trigger_id, schedule_config)
+    # Ad-hoc test triggers have no document to poll, so they always run in-process
+    return _register_scheduled_trigger(trigger_id, schedule_config, is_test)
+
+async def _store_next_run_at(trigger_id: str, schedule_config: dict) -> Optional[datetime]:
+    """Persist when a trigger is next due; any in-flight claim on the old schedule is dropped"""
+    now = datetime.now(timezone.utc)
+    planned = next_run_time(schedule_config, now, now)
+    next_run_at = planned[0] if planned else None
+    await Database.update_one(
+        "triggers",
+        {"_id": ObjectId(trigger_id)},
+        {
+            "$set": {"next_run_at": next_run_at},
+            "$unset": {"lease_owner": "", "lease_until": ""}
+        }
+    )
+    return next_run_at
+
+# Triggers created through app.routers may lack the flags, so match absent ones
+_REHYDRATE_QUERY = {
+    "trigger_type": "scheduled",
+    "is_active": {"$ne": False},
+    "is_deleted": {"$ne": True}
+}
+_REHYDRATE_PROJECTION = {"schedule_config": 1, "is_test": 1, "created_at": 1}
+# Jobs registered between yields to the event loop (~75ms of add_job at 100k triggers)
+_REHYDRATE_YIELD_EVERY = 1000
+
+async def rehydrate_scheduled_triggers(seen: Optional[Set[str]] = None) -> int:
+    """Register every active scheduled trigger from the database.
+
+    Triggers are streamed in batches with only the fields the scheduler needs.
+    Next run times are computed up front (once per distinct cron time) and the
+    jobs are added in run-time order, so the in-memory job store appends
+    instead of shifting its sorted list on every insert. At startup this runs
+    before the scheduler starts; on a leader takeover it runs against the
+    started, paused scheduler. Either way it yields to the event loop every
+    _REHYDRATE_YIELD_EVERY jobs, so lease renewals and requests keep being
+    served while a large schedule loads. The ids of registered jobs are
+    added to `seen` when it is given.
+    """
+    if _use_timing_wheel():
+        return await _rehydrate_timing_wheel(seen)
+    if _use_polling():
+        return await _backfill_next_run_at()
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    pending = []
+    cron_fire_times: Dict[int, datetime] = {}
+    skipped = 0
+    async for trigger in Database.iter_many(
+        "triggers",
+        _REHYDRATE_QUERY,
+        projection=_REHYDRATE_PROJECTION,
+        batch_size=settings.SCHEDULER_REHYDRATE_BATCH_SIZE
+    ):
+        try:
+            schedule_config = trigger["schedule_config"]
+            created_at = trigger.get("created_at")
+            built = _build_trigger(
+                schedule_config,
+                _as_utc(created_at) if created_at else now,
+                now
             )
-            cleanup_time = None
-        else:
-            trigger = IntervalTrigger(
-                **{schedule_config["interval_type"]: schedule_config["interval_value"]}
+            if built is None:
+                skipped += 1
+                continue
+            for job in _trigger_jobs(trigger["id"], schedule_config, trigger.get("is_test", False), *built):
+                job_trigger = job["trigger"]
+                if isinstance(job_trigger, CronTrigger):
+                    # Cron triggers are shared per time of day, so compute each once
+                    key = id(job_trigger)
+                    if key not in cron_fire_times:
+                        cron_fire_times[key] = job_trigger.get_next_fire_time(None, now)
+                    job["next_run_time"] = cron_fire_times[key]
+                else:
+                    job["next_run_time"] = job_trigger.get_next_fire_time(None, now)
+                pending.append(job)
+        except Exception as e:
+            logger.error(f"Failed to rehydrate trigger {trigger['id']}: {str(e)}")
+            skipped += 1
+
+    pending.sort(key=lambda job: job["next_run_time"])
+    registered = 0
+    for index, job in enumerate(pending, start=1):
+        scheduler.add_job(replace_existing=True, **job)
+        if seen is not None:
+            seen.add(job["id"])
+        if job["func"] is execute_scheduled_trigger:
+            registered += 1
+        if index % _REHYDRATE_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Rehydrated {registered} scheduled triggers in {elapsed:.2f}s "
+        f"({skipped} expired or invalid skipped)"
+    )
+    return registered
+
+async def _rehydrate_timing_wheel(seen: Optional[Set[str]] = None) -> int:
+    """Register every active scheduled trigger on the timing wheel; each insert is O(1)"""
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    registered = 0
+    skipped = 0
+    async for trigger in Database.iter_many(
+        "triggers",
+        _REHYDRATE_QUERY,
+        projection=_REHYDRATE_PROJECTION,
+        batch_size=settings.SCHEDULER_REHYDRATE_BATCH_SIZE
+    ):
+        try:
+            key = _register_scheduled_trigger(
+                trigger["id"],
+                trigger["schedule_config"],
+                trigger.get("is_test", False),
+                reference_time=trigger.get("created_at"),
+                now=now
             )
-            cleanup_time = None
+        except Exception as e:
+            logger.error(f"Failed to rehydrate trigger {trigger['id']}: {str(e)}")
+            key = None
+        if key is None:
+            skipped += 1
+        else:
+            registered += 1
+            if seen is not None:
+                seen.add(key)
+            if registered % _REHYDRATE_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
 
-    job = scheduler.add_job(
-        execute_scheduled_trigger,
-        trigger=trigger,
-        args=[trigger_id, is_test],
-        id=f"{trigger_id}_{'test' if is_test else 'permanent'}",
-        replace_existing=True
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Rehydrated {registered} scheduled triggers onto the timing wheel in {elapsed:.2f}s "
+        f"({skipped} expired or invalid skipped)"
     )
+    return registered
 
-    if (schedule_config["schedule_type"] == "one_time" or is_test) and cleanup_time:
-        scheduler.add_job(
-            cleanup_trigger,
-            trigger=DateTrigger(run_date=cleanup_time),
-            args=[trigger_id, is_test],
-            id=f"{trigger_id}_cleanup"
-        )
+async def _backfill_next_run_at() -> int:
+    """Give scheduled triggers created under another engine a next_run_at so the poller sees them"""
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    operations = []
+    backfilled = 0
+    async for trigger in Database.iter_many(
+        "triggers",
+        {**_REHYDRATE_QUERY, "next_run_at": {"$exists": False}},
+        projection=_REHYDRATE_PROJECTION,
+        batch_size=settings.SCHEDULER_REHYDRATE_BATCH_SIZE
+    ):
+        try:
+            created_at = trigger.get("created_at")
+            planned = next_run_time(
+                trigger["schedule_config"],
+                _as_utc(created_at) if created_at else now,
+                now
+            )
+        except Exception as e:
+            logger.error(f"Failed to backfill trigger {trigger['id']}: {str(e)}")
+            continue
+        operations.append(UpdateOne(
+            {"_id": ObjectId(trigger["id"]), "next_run_at": {"$exists": False}},
+            {"$set": {"next_run_at": planned[0] if planned else None}}
+        ))
+        if len(operations) >= settings.SCHEDULER_REHYDRATE_BATCH_SIZE:
+            await Database.bulk_write("triggers", operations, ordered=False)
+            backfilled += len(operations)
+            operations = []
+    if operations:
+        await Database.bulk_write("triggers", operations, ordered=False)
+        backfilled += len(operations)
 
-    return job
+    elapsed = time.perf_counter() - start
+    logger.info(f"Backfilled next_run_at for {backfilled} scheduled triggers in {elapsed:.2f}s")
+    return backfilled
 
 async def cleanup_trigger(trigger_id: str, is_test: bool):
     """Remove one-time or test triggers"""
     try:
         job_id = f"{trigger_id}_{'test' if is_test else 'permanent'}"
+        timing_wheel.remove(job_id)
         if scheduler.get_job(job_id):
             scheduler.remove_job(job_id)
         logger.info(f"Cleaned up trigger {trigger_id}")
     except Exception as e:
         logger.error(f"Error cleaning up trigger {trigger_id}: {str(e)}")
 
-async def setup_scheduler():
-    """Initialize the scheduler"""
-    # Archive events every 15 minutes
+# APScheduler validates job arguments with inspect.signature() on every add_job.
+# inspect honours a precomputed __signature__, which keeps bulk registration cheap.
+execute_scheduled_trigger.__signature__ = inspect.signature(execute_scheduled_trigger)
+cleanup_trigger.__signature__ = inspect.signature(cleanup_trigger)
+
+MAINTENANCE_JOB_IDS = {"archive_events", "cleanup_events"}
+_trigger_watch_task: Optional[asyncio.Task] = None
+
+# Trigger timers live here when SCHEDULER_ENGINE is "timing_wheel"; the
+# maintenance jobs always stay on APScheduler
+timing_wheel = TimingWheelScheduler(
+    execute_scheduled_trigger,
+    tick_seconds=settings.TIMING_WHEEL_TICK_MS / 1000
+)
+
+def _use_timing_wheel() -> bool:
+    return settings.SCHEDULER_ENGINE == "timing_wheel"
+
+def _use_polling() -> bool:
+    return settings.SCHEDULER_ENGINE == "polling"
+
+def _owns_schedule() -> bool:
+    """Whether this process should register and fire trigger jobs"""
+    # Polling claims are atomic, so every process may fire what it claimed
+    if _use_polling():
+        return True
+    if settings.PROCESS_ROLE == "api":
+        # Worker processes pick new triggers up from the triggers change stream
+        return False
+    return settings.SCHEDULER_COORDINATION != "leader" or LeaderElection.is_leader
+
+def remove_scheduled_trigger(trigger_id: str):
+    """Remove every job registered for a trigger"""
+    for suffix in ("permanent", "test", "cleanup"):
+        timing_wheel.remove(f"{trigger_id}_{suffix}")
+        job = scheduler.get_job(f"{trigger_id}_{suffix}")
+        if job:
+            job.remove()
+
+_poller_task: Optional[asyncio.Task] = None
+_poller_metrics: Dict = {
+    "polls": 0,
+    "claimed": 0,
+    "last_claimed": 0,
+    "lost_claims": 0,
+    "max_lag_seconds": 0.0,
+    "last_lag_seconds": 0.0
+}
+
+def _due_query(now: datetime) -> dict:
+    return {
+        "next_run_at": {"$lte": now},
+        "trigger_type": "scheduled",
+        "is_active": {"$ne": False},
+        "is_deleted": {"$ne": True},
+        "$or": [
+            {"lease_until": None},
+            {"lease_until": {"$lt": now}}
+        ]
+    }
+
+async def _claim_due_triggers(now: datetime) -> Tuple[str, List[Dict]]:
+    """Lease a batch of due triggers to this process.
+
+    Candidates are read from the next_run_at index, then leased with one
+    update_many that re-checks they are still due and unleased, so two
+    pollers racing for the same trigger cannot both win it. An expired lease
+    (the claimer died mid-run) makes the trigger claimable again.
+    """
+    candidates = await Database.find_many(
+        "triggers",
+        _due_query(now),
+        projection={"_id": 1},
+        sort=[("next_run_at", 1)],
+        limit=settings.SCHEDULER_POLL_BATCH_SIZE
+    )
+    if not candidates:
+        return "", []
+
+    lease_owner = f"{LeaderElection.node_id}:{uuid.uuid4().hex[:8]}"
+    await Database.update_many(
+        "triggers",
+        {**_due_query(now), "_id": {"$in": [ObjectId(trigger["id"]) for trigger in candidates]}},
+        {
+            "$set": {
+                "lease_owner": lease_owner,
+                "lease_until": now + timedelta(seconds=settings.SCHEDULER_CLAIM_LEASE_SECONDS)
+            }
+        }
+    )
+    claimed = await Database.find_many(
+        "triggers",
+        {"lease_owner": lease_owner},
+        projection={**_REHYDRATE_PROJECTION, "next_run_at": 1}
+    )
+    return lease_owner, claimed
+
+async def _run_claimed_trigger(trigger: Dict, lease_owner: str) -> Optional[UpdateOne]:
+    """Fire one claimed trigger and build the write that schedules its next run"""
+    try:
+        await execute_scheduled_trigger(trigger["id"], trigger.get("is_test", False))
+    except Exception:
+        # Already logged; a failed run still moves on to the next slot like an APScheduler job
+        pass
+
+    now = datetime.now(timezone.utc)
+    try:
+        created_at = trigger.get("created_at")
+        planned = next_run_time(
+            trigger["schedule_config"],
+            _as_utc(created_at) if created_at else now,
+            now
+        )
+    except Exception as e:
+        logger.error(f"Failed to compute next run for trigger {trigger['id']}: {str(e)}")
+        planned = None
+
+    return UpdateOne(
+        {"_id": ObjectId(trigger["id"]), "lease_owner": lease_owner},
+        {
+            "$set": {"next_run_at": planned[0] if planned else None, "last_run_at": now},
+            "$unset": {"lease_owner": "", "lease_until": ""}
+        }
+    )
+
+async def poll_due_triggers() -> int:
+    """Claim, fire and reschedule one batch of due triggers; returns how many ran"""
+    now = datetime.now(timezone.utc)
+    lease_owner, claimed = await _claim_due_triggers(now)
+    if not claimed:
+        return 0
+
+    lag = max((now - _as_utc(trigger["next_run_at"])).total_seconds() for trigger in claimed)
+    operations = await asyncio.gather(
+        *(_run_claimed_trigger(trigger, lease_owner) for trigger in claimed)
+    )
+    result = await Database.bulk_write("triggers", list(operations), ordered=False)
+
+    _poller_metrics["polls"] += 1
+    _poller_metrics["claimed"] += len(claimed)
+    _poller_metrics["last_claimed"] = len(claimed)
+    # The trigger was updated while it ran, so its new schedule wins
+    _poller_metrics["lost_claims"] += len(claimed) - result.modified_count
+    _poller_metrics["last_lag_seconds"] = lag
+    _poller_metrics["max_lag_seconds"] = max(_poller_metrics["max_lag_seconds"], lag)
+    return len(claimed)
+
+async def _run_poller():
+    """Poll until idle, then sleep for the poll interval"""
+    while True:
+        try:
+            claimed = await poll_due_triggers()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduler poll failed: {str(e)}")
+            claimed = 0
+        if claimed < settings.SCHEDULER_POLL_BATCH_SIZE:
+            await asyncio.sleep(settings.SCHEDULER_POLL_INTERVAL_MS / 1000)
+
+def get_poller_metrics() -> Dict:
+    return {**_poller_metrics, "running": _poller_task is not None}
+
+def _sync_trigger_change(change: Dict):
+    trigger_id = str(change['documentKey']['_id'])
+    trigger = change.get('fullDocument')
+    if (
+        trigger
+        and trigger.get("trigger_type") == "scheduled"
+        and trigger.get("is_active", True)
+        and not trigger.get("is_deleted", False)
+    ):
+        try:
+            _register_scheduled_trigger(
+                trigger_id,
+                trigger["schedule_config"],
+                trigger.get("is_test", False),
+                reference_time=trigger.get("created_at")
+            )
+        except Exception as e:
+            logger.error(f"Failed to sync trigger {trigger_id}: {str(e)}")
+    else:
+        remove_scheduled_trigger(trigger_id)
+
+def _trigger_job_keys() -> Set[str]:
+    """Ids of every trigger job and timer registered on this node"""
+    keys = {job.id for job in scheduler.get_jobs() if job.id not in MAINTENANCE_JOB_IDS}
+    keys.update(timing_wheel.wheel.keys())
+    return keys
+
+async def _resync_trigger_jobs():
+    """Rehydrate from scratch and drop jobs for triggers deleted or deactivated meanwhile"""
+    before = _trigger_job_keys()
+    seen: Set[str] = set()
+    await rehydrate_scheduled_triggers(seen)
+    stale = 0
+    for key in before - seen:
+        trigger_id = key.rsplit("_", 1)[0]
+        if not ObjectId.is_valid(trigger_id):
+            # Ad-hoc test triggers are never stored, so rehydrating cannot see them
+            continue
+        timing_wheel.remove(key)
+        job = scheduler.get_job(key)
+        if job:
+            job.remove()
+        stale += 1
+    if stale:
+        logger.info(f"Removed {stale} jobs for triggers changed while the change stream was down")
+
+async def _watch_trigger_changes():
+    """Keep the leader's jobs in sync with triggers written on other nodes"""
+    pipeline = [
+        {
+            '$match': {
+                'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}
+            }
+        }
+    ]
+    resume_token = None
+    failures = 0
+    while True:
+        try:
+            async with Database.db.triggers.watch(
+                pipeline, full_document='updateLookup', resume_after=resume_token
+            ) as stream:
+                if failures and resume_token is None:
+                    # Changes made while the stream was down cannot be replayed
+                    await _resync_trigger_jobs()
+                failures = 0
+                async for change in stream:
+                    _sync_trigger_change(change)
+                    resume_token = stream.resume_token
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failures += 1
+            if failures >= 3:
+                # The resume token may have fallen off the oplog; start fresh and resync
+                resume_token = None
+            delay = min(2 ** failures, 60)
+            logger.error(f"Trigger change stream stopped, restarting in {delay}s: {str(e)}")
+            await asyncio.sleep(delay)
+
+def _add_maintenance_jobs():
+    # Archive due events in bounded batches
     scheduler.add_job(
-        EventService.archive_events,
+        RetentionService.sweep,
         'interval',
-        minutes=15,
-        id='archive_events'
+        seconds=settings.RETENTION_SWEEP_INTERVAL_SECONDS,
+        id='archive_events',
+        coalesce=True,
+        max_instances=1,
+        replace_existing=True
     )
 
     # Cleanup old events every hour
@@ -131,7 +759,78 @@ async def setup_scheduler():
         EventService.cleanup_events,
         'interval',
         hours=1,
-        id='cleanup_events'
+        id='cleanup_events',
+        replace_existing=True
     )
 
-    scheduler.start() 
\ No newline at end of file
+async def _start_leading():
+    """Load every trigger and start firing them on this node"""
+    global _trigger_watch_task
+    if not _use_polling():
+        # Watch first so changes made while rehydrating are not missed
+        _trigger_watch_task = asyncio.create_task(_watch_trigger_changes())
+        await rehydrate_scheduled_triggers()
+    if not LeaderElection.holds_lease():
+        # The lease lapsed while rehydrating; the demotion undoes the rest
+        return
+    scheduler.resume()
+    if _use_timing_wheel():
+        timing_wheel.start()
+
+async def _stop_leading():
+    """Stop firing and drop all trigger jobs so a new leader owns them alone"""
+    global _trigger_watch_task
+    scheduler.pause()
+    timing_wheel.stop()
+    timing_wheel.wheel.clear()
+    if _trigger_watch_task:
+        _trigger_watch_task.cancel()
+        _trigger_watch_task = None
+    scheduler.remove_all_jobs()
+    _add_maintenance_jobs()
+
+async def setup_scheduler():
+    """Initialize the scheduler"""
+    global _poller_task, _trigger_watch_task
+    if settings.PROCESS_ROLE == "worker" and settings.SCHEDULER_COORDINATION != "leader" and not _use_polling():
+        logger.warning(
+            "Uncoordinated worker: every worker process fires every trigger. "
+            "Set SCHEDULER_COORDINATION=leader or SCHEDULER_ENGINE=polling before running more than one."
+        )
+    _add_maintenance_jobs()
+
+    if _use_polling():
+        # No in-memory trigger state: every process polls, and the lease
+        # election (if enabled) only decides who runs the maintenance jobs
+        await rehydrate_scheduled_triggers()
+        _poller_task = asyncio.create_task(_run_poller())
+
+    if settings.SCHEDULER_COORDINATION == "leader":
+        # Followers keep a paused scheduler until they win the lease
+        scheduler.start(paused=True)
+        await LeaderElection.start(on_elected=_start_leading, on_demoted=_stop_leading)
+        return
+
+    if not _use_polling():
+        if settings.PROCESS_ROLE == "worker":
+            # Triggers are created by the API processes, so follow their writes
+            _trigger_watch_task = asyncio.create_task(_watch_trigger_changes())
+        await rehydrate_scheduled_triggers()
+
+    scheduler.start()
+    if _use_timing_wheel():
+        timing_wheel.start()
+
+async def shutdown_scheduler():
+    """Stop scheduling and release the scheduler lease"""
+    global _poller_task, _trigger_watch_task
+    await LeaderElection.stop()
+    timing_wheel.stop()
+    if _trigger_watch_task:
+        _trigger_watch_task.cancel()
+        _trigger_watch_task = None
+    if _poller_task:
+        _poller_task.cancel()
+        _poller_task = None
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
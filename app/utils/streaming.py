@@ -0,0 +1,79 @@
+from typing import AsyncIterator, Dict, List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.utils import fast_json
+import asyncio
+import json
+
+_END = object()
+
+async def _prefetch(documents: AsyncIterator[Dict], maxsize: int) -> AsyncIterator[Dict]:
+    """Read ahead from the cursor into a bounded queue.
+
+    The producer blocks once the queue is full, so a slow client pauses the
+    cursor instead of letting documents pile up in memory.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def produce():
+        try:
+            async for document in documents:
+                await queue.put(document)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        # Close the source too, so an abandoned stream releases its cursor now rather than at GC
+        aclose = getattr(documents, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+async def _chunks(documents: AsyncIterator[Dict]) -> AsyncIterator[List[str]]:
+    """Group encoded documents into chunks of at most STREAM_CHUNK_SIZE"""
+    chunk = []
+    async for document in _prefetch(documents, settings.STREAM_PREFETCH_SIZE):
+        if settings.FAST_JSON:
+            chunk.append(fast_json.dumps(document).decode())
+        else:
+            chunk.append(json.dumps(jsonable_encoder(document)))
+        if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def stream_json_array(documents: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    """Encode documents as a JSON array, a chunk at a time"""
+    yield "["
+    first = True
+    async for chunk in _chunks(documents):
+        yield ("" if first else ",") + ",".join(chunk)
+        first = False
+    yield "]"
+
+async def stream_ndjson(documents: AsyncIterator[Dict]) -> AsyncIterator[str]:
+    """Encode documents as newline-delimited JSON, a chunk at a time"""
+    async for chunk in _chunks(documents):
+        yield "\n".join(chunk) + "\n"
+
+def streaming_response(documents: AsyncIterator[Dict], format: str = "json") -> StreamingResponse:
+    """Build a streaming response in the requested format ("json" or "ndjson")"""
+    if format == "ndjson":
+        return StreamingResponse(stream_ndjson(documents), media_type="application/x-ndjson")
+    return StreamingResponse(stream_json_array(documents), media_type="application/json")
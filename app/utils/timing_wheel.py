@@ -0,0 +1,190 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import time
+
+class TimerEntry:
+    """One scheduled timer; __slots__ keeps each entry to a handful of pointers"""
+    __slots__ = ("key", "when", "interval", "args", "level", "slot")
+
+    def __init__(self, key: str, when: float, interval: float, args: tuple):
+        self.key = key
+        self.when = when
+        self.interval = interval
+        self.args = args
+        self.level = 0
+        self.slot = 0
+
+class HierarchicalTimingWheel:
+    """Hierarchical timing wheel with O(1) insert and cancel.
+
+    Level 0 has 2**wheel_bits slots of one tick each; every level above covers
+    2**wheel_bits slots of the level below. Timers far in the future sit in a
+    coarse slot and are cascaded down as their slot comes round, and timers
+    beyond the top level's range simply ride the top level until they are in
+    range. Each slot is a dict, so cancelling is a pair of dict deletes.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 0.1,
+        wheel_bits: int = 6,
+        levels: int = 4,
+        start_time: Optional[float] = None
+    ):
+        self.tick_seconds = tick_seconds
+        self.wheel_bits = wheel_bits
+        self.levels = levels
+        self._mask = (1 << wheel_bits) - 1
+        self._slots: List[List[Dict[str, TimerEntry]]] = [
+            [{} for _ in range(1 << wheel_bits)] for _ in range(levels)
+        ]
+        self._entries: Dict[str, TimerEntry] = {}
+        self.current_tick = self._tick_of(time.time() if start_time is None else start_time)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def _tick_of(self, timestamp: float) -> int:
+        return math.ceil(timestamp / self.tick_seconds)
+
+    def _place(self, entry: TimerEntry):
+        deadline = max(self._tick_of(entry.when), self.current_tick + 1)
+        delta = deadline - self.current_tick
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.wheel_bits * (level + 1)):
+            level += 1
+        entry.level = level
+        entry.slot = (deadline >> (self.wheel_bits * level)) & self._mask
+        self._slots[level][entry.slot][entry.key] = entry
+
+    def schedule(self, key: str, when: float, interval: float = 0.0, args: tuple = ()) -> TimerEntry:
+        """Schedule (or reschedule) a timer at epoch time `when`, repeating every `interval` seconds"""
+        self.cancel(key)
+        entry = TimerEntry(key, when, interval, args)
+        self._entries[key] = entry
+        self._place(entry)
+        return entry
+
+    def cancel(self, key: str) -> bool:
+        """Cancel a timer by key"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        del self._slots[entry.level][entry.slot][key]
+        return True
+
+    def clear(self, now: Optional[float] = None):
+        """Drop every timer and restart the wheel at `now`, so nothing is left to catch up"""
+        for level in self._slots:
+            for slot in level:
+                slot.clear()
+        self._entries.clear()
+        self.current_tick = self._tick_of(time.time() if now is None else now)
+
+    def advance(self, now: float) -> List[Tuple[TimerEntry, float]]:
+        """Move the wheel forward to `now` and return (timer, scheduled time) for each one that came due.
+
+        Repeating timers are re-armed at their next run after `now`, so runs
+        missed while the loop was blocked are coalesced into one.
+        """
+        # Only ticks that have fully elapsed fire, so nothing runs early
+        target = math.floor(now / self.tick_seconds)
+        due: List[Tuple[TimerEntry, float]] = []
+        while self.current_tick < target:
+            self.current_tick += 1
+            tick = self.current_tick
+
+            # Cascade coarser levels whose slot boundary this tick crosses
+            for level in range(1, self.levels):
+                if tick & ((1 << (self.wheel_bits * level)) - 1):
+                    break
+                index = (tick >> (self.wheel_bits * level)) & self._mask
+                cascading = self._slots[level][index]
+                self._slots[level][index] = {}
+                for entry in cascading.values():
+                    self._place(entry)
+
+            index = tick & self._mask
+            firing = self._slots[0][index]
+            if firing:
+                self._slots[0][index] = {}
+                for entry in firing.values():
+                    due.append((entry, entry.when))
+                    if entry.interval:
+                        missed = max(math.floor((now - entry.when) / entry.interval), 0)
+                        entry.when += (missed + 1) * entry.interval
+                        self._place(entry)
+                    else:
+                        del self._entries[entry.key]
+        return due
+
+class TimingWheelScheduler:
+    """Drives a HierarchicalTimingWheel from the event loop and runs due callbacks"""
+
+    def __init__(self, callback: Callable[..., Awaitable[None]], tick_seconds: float = 0.1):
+        self.callback = callback
+        self.wheel = HierarchicalTimingWheel(tick_seconds=tick_seconds)
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self._metrics: Dict = {
+            "fired": 0,
+            "max_lag_ms": 0.0,
+            "last_lag_ms": 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def add(self, key: str, when: float, interval: float = 0.0, args: tuple = ()):
+        self.wheel.schedule(key, when, interval, args)
+
+    def remove(self, key: str) -> bool:
+        return self.wheel.cancel(key)
+
+    def start(self):
+        if self._task is None:
+            if not len(self.wheel):
+                # Nothing to catch up on, so skip the ticks that passed while idle
+                self.wheel.current_tick = self.wheel._tick_of(time.time())
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        tick = self.wheel.tick_seconds
+        while True:
+            now = time.time()
+            for entry, scheduled in self.wheel.advance(now):
+                lag_ms = max(now - scheduled, 0.0) * 1000
+                self._metrics["fired"] += 1
+                self._metrics["last_lag_ms"] = lag_ms
+                self._metrics["max_lag_ms"] = max(self._metrics["max_lag_ms"], lag_ms)
+                task = asyncio.create_task(self._fire(entry.args))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            await asyncio.sleep(tick - (time.time() % tick))
+
+    async def _fire(self, args: tuple):
+        try:
+            await self.callback(*args)
+        except Exception as e:
+            logging.error(f"Timing wheel callback failed for {args}: {str(e)}")
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self._metrics,
+            "running": self.running,
+            "timers": len(self.wheel)
+        }
@@ -0,0 +1,59 @@
+"""Background worker process: scheduler, execution queue workers and retention.
+
+Run with `python -m app.worker` alongside API processes started with
+PROCESS_ROLE=api, so each tier can be scaled on its own.
+"""
+from app.services.database import Database
+from app.services.http_client import HTTPClient
+from app.services.cache import RedisCache
+from app.services.event_buffer import EventWriteBuffer
+from app.services.trigger_cache import TriggerCache
+from app.services.execution_queue import ExecutionQueue
+from app.utils.scheduler import setup_scheduler, shutdown_scheduler
+from app.utils.logger import logger
+from app.config import settings
+import asyncio
+import signal
+
+async def start_worker_components():
+    """Start the execution workers and the scheduler, which also owns the retention jobs"""
+    await ExecutionQueue.start()
+    await setup_scheduler()
+
+async def stop_worker_components():
+    await shutdown_scheduler()
+    await ExecutionQueue.stop()
+
+async def run():
+    """Run the worker tier until SIGINT or SIGTERM"""
+    if settings.PROCESS_ROLE != "worker":
+        # As "all" the scheduler would not follow triggers written by API processes
+        logger.info(f"Running as PROCESS_ROLE=worker (was {settings.PROCESS_ROLE})")
+        settings.PROCESS_ROLE = "worker"
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await Database.connect_db()
+    try:
+        await Database.setup_indexes()
+        await HTTPClient.open_client()
+        await EventWriteBuffer.start()
+        # Queue workers read triggers through the cache, so they need its invalidations too
+        await TriggerCache.setup_change_stream()
+        await TriggerCache.warm()
+        await start_worker_components()
+        logger.info(f"Worker started (scheduler engine: {settings.SCHEDULER_ENGINE})")
+
+        await stopping.wait()
+    finally:
+        await stop_worker_components()
+        await EventWriteBuffer.stop()
+        await HTTPClient.close_client()
+        await RedisCache.close_client()
+        await Database.close_db()
+        logger.info("Worker shutdown successfully")
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+"""Compare the storage size of hot events and their archive tier documents.
+
+Builds synthetic events with realistic payloads and responses, converts them
+the way ArchiveTier.move does, and reports average BSON size per document
+plus the time to expand a cold document back. Needs no MongoDB:
+
+    python -m benchmarks.bench_archive_tier --count 10000
+"""
+from datetime import datetime, timezone
+from bson import encode
+import argparse
+import time
+
+from app.services.archive_tier import ArchiveTier
+from app.utils import compression
+from benchmarks.bench_fast_json import make_event
+
+def make_response(index: int) -> dict:
+    return {
+        "status": "accepted",
+        "request_id": f"req-{index:08d}",
+        "items": [{"sku": f"SKU-{n}", "quantity": n, "price": n * 2.5} for n in range(20)],
+        "message": "Order received and queued for fulfilment"
+    }
+
+def main(count: int):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    events = []
+    for index in range(count):
+        event = make_event(now, index)
+        event["id"] = str(event.pop("_id"))
+        event["response_data"] = make_response(index)
+        events.append(event)
+
+    hot_bytes = sum(len(encode({"_id": e["id"], **{k: v for k, v in e.items() if k != "id"}})) for e in events)
+    cold = [ArchiveTier._to_cold(dict(event), now) for event in events]
+    cold_bytes = sum(len(encode(document)) for document in cold)
+
+    start = time.perf_counter()
+    for document in cold:
+        expanded = dict(document)
+        expanded["id"] = str(expanded.pop("_id"))
+        ArchiveTier._from_cold(expanded)
+    expand_us = (time.perf_counter() - start) / count * 1_000_000
+
+    codec = "zstd" if compression.zstandard is not None else "zlib"
+    print(f"events:            {count}  (codec {codec})")
+    print(f"hot document       {hot_bytes / count:8.0f} bytes")
+    print(f"cold document      {cold_bytes / count:8.0f} bytes  ({hot_bytes / cold_bytes:.1f}x smaller)")
+    print(f"expand on read     {expand_us:8.1f} us/event")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.count)
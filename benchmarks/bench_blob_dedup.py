@@ -0,0 +1,69 @@
+"""Estimate storage and write volume saved by content-addressed event bodies.
+
+Simulates events from high-frequency triggers where most executions repeat
+the trigger's payload and get one of a few responses, then compares bytes
+written with full bodies on every event against hash refs plus one blob per
+distinct body. Needs no MongoDB:
+
+    python -m benchmarks.bench_blob_dedup --triggers 50 --events 100000
+"""
+from datetime import datetime, timezone
+from bson import ObjectId, encode
+import argparse
+import hashlib
+import random
+
+from app.config import settings
+from app.services.blob_store import BLOB_FIELDS, _canonical
+
+def make_payload(trigger: int) -> dict:
+    return {
+        "trigger": f"trigger-{trigger}",
+        "fields": {f"field_{n}": "string" for n in range(15)},
+        "metadata": {"source": "scheduler", "version": 3, "tags": ["billing", "nightly", "export"]}
+    }
+
+def make_response(variant: int) -> dict:
+    return {
+        "status": "accepted",
+        "variant": variant,
+        "items": [{"sku": f"SKU-{n}", "quantity": n} for n in range(20)]
+    }
+
+def main(triggers: int, events: int):
+    now = datetime.now(timezone.utc)
+    payloads = [make_payload(trigger) for trigger in range(triggers)]
+    full_bytes = ref_bytes = 0
+    blobs = {}
+    for _ in range(events):
+        trigger = random.randrange(triggers)
+        event = {
+            "_id": ObjectId(),
+            "trigger_id": f"trigger-{trigger}",
+            "trigger_type": "api",
+            "status": "success",
+            "created_at": now,
+            "api_payload": payloads[trigger],
+            "response_data": make_response(random.randrange(3))
+        }
+        full_bytes += len(encode(event))
+        for field in BLOB_FIELDS:
+            data = _canonical(event[field])
+            if len(data) >= settings.EVENT_BLOB_MIN_BYTES:
+                key = hashlib.sha256(data).hexdigest()
+                blobs.setdefault(key, len(encode({"_id": key, "body": event[field]})))
+                del event[field]
+                event[f"{field}_ref"] = key
+        ref_bytes += len(encode(event))
+
+    deduplicated = ref_bytes + sum(blobs.values())
+    print(f"events:            {events} from {triggers} triggers, {len(blobs)} distinct bodies")
+    print(f"full bodies        {full_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"refs + blobs       {deduplicated / 1024 / 1024:8.1f} MiB  ({full_bytes / deduplicated:.1f}x smaller)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--triggers", type=int, default=50)
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.triggers, args.events)
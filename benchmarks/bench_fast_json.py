@@ -0,0 +1,63 @@
+"""Compare the default and FAST_JSON serialization paths for an event page.
+
+Encodes synthetic events as BSON (what the driver receives), then times
+decode + _convert_id + jsonable_encoder + json.dumps against RawBSONDocument
++ orjson as done by app.utils.fast_json. Needs no MongoDB:
+
+    python -m benchmarks.bench_fast_json --count 1000 --rounds 50
+"""
+from datetime import datetime, timedelta
+from bson import ObjectId, decode, encode
+from bson.raw_bson import RawBSONDocument
+from fastapi.encoders import jsonable_encoder
+import argparse
+import json
+import time
+
+from app.services.database import Database
+from app.utils import fast_json
+
+def make_event(now: datetime, index: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "trigger_id": str(ObjectId()),
+        "trigger_type": "api",
+        "is_test": False,
+        "is_manual": index % 7 == 0,
+        "execution_time": now - timedelta(seconds=index),
+        "retention_state": "active",
+        "api_payload": {"order_id": f"A-{index}", "amount": index * 1.5, "tags": ["a", "b"]},
+        "response_data": {"ok": True, "id": index},
+        "status": "success",
+        "error_message": None,
+        "attempts": 1,
+        "created_at": now - timedelta(seconds=index)
+    }
+
+def default_path(raw_documents: list) -> bytes:
+    documents = [Database._convert_id(decode(raw)) for raw in raw_documents]
+    return json.dumps(jsonable_encoder({"items": documents, "next_cursor": None})).encode()
+
+def fast_path(raw_documents: list) -> bytes:
+    documents = [RawBSONDocument(raw) for raw in raw_documents]
+    return fast_json.dumps({"items": documents, "next_cursor": None})
+
+def main(count: int, rounds: int):
+    now = datetime.utcnow().replace(microsecond=0)
+    raw_documents = [encode(make_event(now, index)) for index in range(count)]
+    assert json.loads(default_path(raw_documents)) == json.loads(fast_path(raw_documents))
+
+    print(f"events per page:   {count}  (orjson {'installed' if fast_json.orjson else 'missing'})")
+    for name, path in (("default", default_path), ("fast_json", fast_path)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            path(raw_documents)
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        print(f"{name:<18} {elapsed:7.2f} ms/page")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    main(args.count, args.rounds)
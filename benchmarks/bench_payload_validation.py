@@ -0,0 +1,100 @@
+"""Compare eval-based payload validation with compiled, cached validators.
+
+Times one validation of a representative payload for the old eval() loop,
+the compiled legacy type map, and a JSON Schema compiled with fastjsonschema
+(when installed) and with the built-in subset compiler. Needs no MongoDB:
+
+    python -m benchmarks.bench_payload_validation --iterations 200000
+"""
+from datetime import datetime
+import argparse
+import time
+
+from app.services import payload_validator
+from app.services.payload_validator import PayloadValidator, compile_schema
+
+LEGACY_SCHEMA = {
+    "order_id": "str",
+    "amount": "float",
+    "quantity": "int",
+    "paid": "bool",
+    "tags": "list",
+    "customer": "dict"
+}
+
+JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "order_id": {"type": "string", "minLength": 1},
+        "amount": {"type": "number", "minimum": 0},
+        "quantity": {"type": "integer", "minimum": 1},
+        "paid": {"type": "boolean"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "customer": {
+            "type": "object",
+            "properties": {"email": {"type": "string"}},
+            "required": ["email"]
+        }
+    },
+    "required": ["order_id", "amount", "quantity"]
+}
+
+PAYLOAD = {
+    "order_id": "A-1001",
+    "amount": 12.5,
+    "quantity": 3,
+    "paid": True,
+    "tags": ["priority", "gift"],
+    "customer": {"email": "someone@example.com"}
+}
+
+def eval_validate(schema: dict, payload: dict) -> bool:
+    """The validation previously done by TriggerExecutor._validate_payload"""
+    try:
+        for key, value_type in schema.items():
+            if key not in payload:
+                return False
+            if not isinstance(payload[key], eval(value_type)):
+                return False
+        return True
+    except Exception:
+        return False
+
+def per_call_us(validate, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        validate(PAYLOAD)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+def main(iterations: int):
+    updated_at = datetime.utcnow()
+    results = [
+        ("eval loop", lambda payload: eval_validate(LEGACY_SCHEMA, payload)),
+        (
+            "cached legacy",
+            lambda payload: PayloadValidator.get("legacy", updated_at, LEGACY_SCHEMA)(payload)
+        )
+    ]
+    if payload_validator.fastjsonschema is not None:
+        results.append((
+            "cached fastjsonschema",
+            lambda payload: PayloadValidator.get("json_schema", updated_at, JSON_SCHEMA)(payload)
+        ))
+    subset = payload_validator._compile_json_schema_subset(JSON_SCHEMA)
+    results.append(("built-in json schema", subset))
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        compile_schema(JSON_SCHEMA)
+    compile_us = (time.perf_counter() - start) / 1000 * 1_000_000
+
+    print(f"iterations:             {iterations}")
+    for name, validate in results:
+        print(f"{name:<23} {per_call_us(validate, iterations):8.2f} us/call")
+    print(f"{'json schema compile':<23} {compile_us:8.2f} us (paid once per trigger version)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,72 @@
+"""Measure how long startup rehydration takes for a large number of triggers.
+
+Feeds synthetic trigger documents through rehydrate_scheduled_triggers in
+place of the database cursor, so it needs no MongoDB:
+
+    python -m benchmarks.bench_rehydration --count 100000
+"""
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.database import Database
+from app.utils.scheduler import scheduler, rehydrate_scheduled_triggers
+
+def make_schedule_config(now: datetime) -> dict:
+    kind = random.random()
+    if kind < 0.6:
+        return {
+            "schedule_type": "recurring",
+            "interval_type": random.choice(["minutes", "hours", "days"]),
+            "interval_value": random.randint(5, 60)
+        }
+    if kind < 0.9:
+        return {
+            "schedule_type": "recurring",
+            "specific_time": {"hour": random.randint(0, 23), "minute": random.randint(0, 59)}
+        }
+    return {
+        "schedule_type": "one_time",
+        "specific_date": now + timedelta(minutes=random.randint(5, 10000))
+    }
+
+async def main(count: int):
+    now = datetime.now(timezone.utc)
+    triggers = [
+        {
+            "id": str(ObjectId()),
+            "schedule_config": make_schedule_config(now),
+            "is_test": False,
+            "created_at": now - timedelta(minutes=random.randint(0, 10000))
+        }
+        for _ in range(count)
+    ]
+
+    async def iter_triggers(*args, **kwargs):
+        for trigger in triggers:
+            yield trigger
+
+    Database.iter_many = iter_triggers
+
+    start = time.perf_counter()
+    registered = await rehydrate_scheduled_triggers()
+    rehydrated = time.perf_counter()
+    scheduler.start(paused=True)
+    started = time.perf_counter()
+
+    print(f"triggers:          {count}")
+    print(f"registered:        {registered}")
+    print(f"jobs in store:     {len(scheduler.get_jobs())}")
+    print(f"rehydrate:         {rehydrated - start:.2f}s")
+    print(f"commit on start:   {started - rehydrated:.2f}s")
+    print(f"total:             {started - start:.2f}s")
+    scheduler.shutdown(wait=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.count))
@@ -0,0 +1,123 @@
+"""Compare the APScheduler and timing-wheel scheduler engines.
+
+Registers synthetic triggers through the scheduler module with each engine
+and reports traced memory, then fires a burst of short one-time timers on a
+loaded scheduler and reports how late they ran. Needs no MongoDB:
+
+    python -m benchmarks.bench_timing_wheel --count 100000 --fire 2000
+"""
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+import argparse
+import asyncio
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+from app.config import settings
+from app.utils import scheduler as scheduler_module
+from app.utils.timing_wheel import TimingWheelScheduler
+from benchmarks.bench_rehydration import make_schedule_config
+
+def register_all(engine: str, triggers: list) -> tuple:
+    """Register every trigger with one engine and return (seconds, traced bytes)"""
+    settings.SCHEDULER_ENGINE = engine
+    now = datetime.now(timezone.utc)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for trigger in triggers:
+        scheduler_module._register_scheduled_trigger(
+            trigger["id"],
+            trigger["schedule_config"],
+            reference_time=trigger["created_at"],
+            now=now
+        )
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size
+
+def summarize(lags: list) -> str:
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1]
+    return f"mean {statistics.mean(lags):7.1f}ms  p99 {p99:7.1f}ms  max {lags[-1]:7.1f}ms"
+
+async def jitter_apscheduler(background: int, fire: int) -> list:
+    lags = []
+    scheduler = AsyncIOScheduler(timezone=timezone.utc)
+
+    def record(run_date: float):
+        lags.append((time.time() - run_date) * 1000)
+
+    far = datetime.now(timezone.utc) + timedelta(days=1)
+    for _ in range(background):
+        scheduler.add_job(record, "date", run_date=far, args=[far.timestamp()])
+    scheduler.start()
+    base = time.time() + 1
+    for _ in range(fire):
+        run_date = base + random.random() * 3
+        scheduler.add_job(
+            record,
+            "date",
+            run_date=datetime.fromtimestamp(run_date, timezone.utc),
+            args=[run_date],
+            misfire_grace_time=None
+        )
+    while len(lags) < fire:
+        await asyncio.sleep(0.1)
+    scheduler.shutdown(wait=False)
+    return lags
+
+async def jitter_timing_wheel(background: int, fire: int) -> list:
+    lags = []
+
+    async def record(run_date: float):
+        lags.append((time.time() - run_date) * 1000)
+
+    wheel = TimingWheelScheduler(record, tick_seconds=settings.TIMING_WHEEL_TICK_MS / 1000)
+    far = time.time() + 86400
+    for index in range(background):
+        wheel.add(f"background_{index}", far, args=(far,))
+    wheel.start()
+    base = time.time() + 1
+    for index in range(fire):
+        run_date = base + random.random() * 3
+        wheel.add(f"fire_{index}", run_date, args=(run_date,))
+    while len(lags) < fire:
+        await asyncio.sleep(0.1)
+    wheel.stop()
+    return lags
+
+async def main(count: int, fire: int):
+    now = datetime.now(timezone.utc)
+    triggers = [
+        {
+            "id": str(ObjectId()),
+            "schedule_config": make_schedule_config(now),
+            "created_at": now - timedelta(minutes=random.randint(0, 10000))
+        }
+        for _ in range(count)
+    ]
+
+    print(f"triggers:          {count}")
+    for engine in ("apscheduler", "timing_wheel"):
+        elapsed, size = register_all(engine, triggers)
+        print(f"{engine:<18} register {elapsed:6.2f}s  memory {size / 1024 / 1024:7.1f} MiB")
+    scheduler_module.scheduler.remove_all_jobs()
+    scheduler_module.timing_wheel.wheel.clear()
+    gc.collect()
+
+    print(f"firing jitter ({fire} timers over 3s, {count} idle timers loaded):")
+    print(f"apscheduler        {summarize(await jitter_apscheduler(count, fire))}")
+    print(f"timing_wheel       {summarize(await jitter_timing_wheel(count, fire))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--fire", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.fire))
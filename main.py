@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.api.endpoints import triggers, events
 from app.services.database import Database
+from app.services.trigger_cache import TriggerCache
 from app.utils.scheduler import setup_scheduler
 import logging
 
@@ -45,6 +46,7 @@ async def startup_event():
     try:
         await Database.connect_db()
         await Database.setup_indexes()
+        await TriggerCache.setup_change_stream()
         await setup_scheduler()
         logging.info("Application started successfully")
     except Exception as e:
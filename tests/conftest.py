@@ -24,6 +24,12 @@ async def setup_database():
     # Cleanup after tests
     await Database.db.triggers.delete_many({})
     await Database.db.events.delete_many({})
+    await Database.db.events_archive.delete_many({})
+    await Database.db.blobs.delete_many({})
+    await Database.db.event_rollups.delete_many({})
+    await Database.db.execution_queue.delete_many({})
+    await Database.db.dead_letters.delete_many({})
+    await Database.db.retention_checkpoints.delete_many({})
     await Database.close_db()
 
 @pytest.fixture
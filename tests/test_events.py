@@ -1,3 +1,5 @@
+import asyncio
+import json
 import pytest
 from httpx import AsyncClient
 from datetime import datetime, timezone, timedelta
@@ -5,6 +7,17 @@ from app.main import app
 from app.models.event import Event, EventStatus
 from app.services.database import Database
 from app.services.event_service import EventService
+from app.services.event_buffer import EventWriteBuffer
+from app.services.event_rollup import parse_bucket_size
+from app.utils import fast_json
+from app.utils.streaming import _prefetch
+from app.services.event_partitions import EventPartitions
+from app.services.retention import RetentionService
+from app.services.archive_tier import ArchiveTier
+from app.services.blob_store import BlobStore
+from app.services.cache import RedisCache
+from bson import ObjectId
+from app.config import settings
 
 @pytest.fixture
 async def client():
@@ -26,6 +39,13 @@ async def test_get_recent_events(client):
     data = response.json()
     assert isinstance(data, list)
 
+async def test_get_recent_events_ndjson(client, sample_event):
+    response = await client.get("/api/v1/events/recent", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert any(event["id"] == sample_event for event in lines)
+
 async def test_get_archived_events(client):
     response = await client.get("/api/v1/events/archived")
     assert response.status_code == 200
@@ -142,4 +162,260 @@ async def test_event_queries():
     assert all(
         e["retention_state"] == "archived"
         for e in archived
-    ) 
\ No newline at end of file
+    )
+
+@pytest.mark.asyncio
+async def test_buffered_event_writes():
+    settings.EVENT_BUFFER_ENABLED = True
+    await EventWriteBuffer.start()
+    try:
+        event_ids = [
+            await EventService.create_event(
+                trigger_id="buffered_trigger",
+                trigger_type="scheduled",
+                is_test=True
+            )
+            for _ in range(3)
+        ]
+        await EventWriteBuffer.flush()
+    finally:
+        await EventWriteBuffer.stop()
+        settings.EVENT_BUFFER_ENABLED = False
+
+    events = await Database.find_many("events", {"trigger_id": "buffered_trigger"})
+    assert sorted(e["id"] for e in events) == sorted(event_ids)
+    assert EventWriteBuffer.get_metrics()["documents_flushed"] >= 3
+
+@pytest.mark.asyncio
+async def test_buffer_stop_keeps_in_flight_batch(monkeypatch):
+    insert_many = Database.insert_many
+
+    async def slow_insert_many(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return await insert_many(*args, **kwargs)
+    monkeypatch.setattr(Database, "insert_many", slow_insert_many)
+
+    settings.EVENT_BUFFER_ENABLED = True
+    await EventWriteBuffer.start()
+    try:
+        for _ in range(settings.EVENT_BUFFER_BATCH_SIZE):
+            await EventService.create_event(trigger_id="stopping_trigger", trigger_type="scheduled", is_test=True)
+        # Stop while the flusher is inside insert_many
+        await asyncio.sleep(0.02)
+    finally:
+        await EventWriteBuffer.stop()
+        settings.EVENT_BUFFER_ENABLED = False
+
+    count = await Database.db.events.count_documents({"trigger_id": "stopping_trigger"})
+    assert count == settings.EVENT_BUFFER_BATCH_SIZE
+
+@pytest.mark.asyncio
+async def test_buffer_retries_only_failed_partition(monkeypatch):
+    now = datetime.now(timezone.utc)
+    earlier = now - timedelta(hours=1)
+    insert_many = Database.insert_many
+    failing = {"events_" + earlier.strftime("%Y%m%d%H")}
+
+    async def flaky_insert_many(collection, documents, ordered=True):
+        result = await insert_many(collection, documents, ordered=ordered)
+        if collection in failing:
+            # The write lands but the acknowledgement is lost
+            failing.discard(collection)
+            raise ConnectionError("connection reset")
+        return result
+    monkeypatch.setattr(Database, "insert_many", flaky_insert_many)
+
+    settings.EVENT_PARTITIONING = "hourly"
+    settings.EVENT_BUFFER_ENABLED = True
+    await EventWriteBuffer.start()
+    try:
+        failed_before = EventWriteBuffer.get_metrics()["failed_documents"]
+        EventWriteBuffer._pending.extend([
+            {"_id": ObjectId(), "trigger_id": "partition_retry", "created_at": now},
+            {"_id": ObjectId(), "trigger_id": "partition_retry", "created_at": earlier}
+        ])
+        assert await EventWriteBuffer.flush() == 1
+        assert [e["created_at"] for e in EventWriteBuffer._pending] == [earlier]
+        # The retried event is already stored: a duplicate key, not a failure
+        assert await EventWriteBuffer.flush() == 1
+        assert EventWriteBuffer.get_metrics()["failed_documents"] == failed_before
+        for created_at in (now, earlier):
+            collection = Database.db[EventPartitions.name_for(created_at)]
+            assert await collection.count_documents({"trigger_id": "partition_retry"}) == 1
+    finally:
+        await EventWriteBuffer.stop()
+        settings.EVENT_BUFFER_ENABLED = False
+        for name in await EventPartitions.collections_between(earlier, now + timedelta(hours=1)):
+            await Database.db.drop_collection(name)
+        settings.EVENT_PARTITIONING = "none"
+
+@pytest.mark.asyncio
+async def test_event_stats_from_rollups():
+    for is_manual in (False, True, True):
+        await EventService.create_event(
+            trigger_id="rollup_trigger",
+            trigger_type="api",
+            is_manual=is_manual
+        )
+
+    stats = await EventService.get_event_stats(hours=1)
+    trigger_stats = next(s for s in stats if s["_id"] == "rollup_trigger")
+    assert trigger_stats["total_executions"] == 3
+    assert trigger_stats["manual_executions"] == 2
+
+    series = await EventService.get_event_timeseries(hours=1, bucket="1h", trigger_id="rollup_trigger")
+    assert sum(point["total_executions"] for point in series) == 3
+
+def test_invalid_timeseries_bucket():
+    with pytest.raises(ValueError):
+        parse_bucket_size("5x")
+
+@pytest.mark.asyncio
+async def test_raw_event_page_matches_default():
+    await EventService.create_event(trigger_id="raw_trigger", trigger_type="api", api_payload={"n": 1})
+    query = {"trigger_id": "raw_trigger"}
+
+    page = await Database.find_page("events", query, 10)
+    raw_page = await Database.find_page("events", query, 10, raw=True)
+    encoded = json.loads(fast_json.dumps(raw_page))
+    assert encoded["items"][0]["id"] == page["items"][0]["id"]
+    assert "_id" not in encoded["items"][0]
+    assert encoded["items"][0]["api_payload"] == {"n": 1}
+
+@pytest.mark.asyncio
+async def test_partitioned_events():
+    settings.EVENT_PARTITIONING = "hourly"
+    try:
+        now = datetime.now(timezone.utc)
+        assert EventPartitions.name_for(now) == "events_" + now.strftime("%Y%m%d%H")
+        event_id = await EventService.create_event(trigger_id="partitioned_trigger", trigger_type="api")
+
+        recent = await EventService.get_recent_events_page(10)
+        assert [e["id"] for e in recent["items"]] == [event_id]
+
+        # A partition past the retention window is dropped whole
+        expired = now - timedelta(hours=settings.EVENT_TOTAL_RETENTION_HOURS + 2)
+        await Database.insert_one(await EventPartitions.collection_for_write(expired), {"created_at": expired})
+        assert await EventPartitions.drop_expired(now) == 1
+        assert EventPartitions.name_for(expired) not in await Database.db.list_collection_names()
+    finally:
+        for name in await EventPartitions.collections_between(now - timedelta(days=3), now + timedelta(hours=1)):
+            await Database.db.drop_collection(name)
+        settings.EVENT_PARTITIONING = "none"
+
+@pytest.mark.asyncio
+async def test_archival_sweep_resumes_from_checkpoint():
+    past_time = datetime.now(timezone.utc) - timedelta(hours=3)
+    ids = [ObjectId(f"{int(past_time.timestamp()):08x}{i:016x}") for i in range(5)]
+    await Database.insert_many("events", [
+        {"_id": event_id, "trigger_id": "sweep_trigger", "retention_state": "active", "created_at": past_time}
+        for event_id in ids
+    ])
+
+    batch_size, max_batches = settings.RETENTION_BATCH_SIZE, settings.RETENTION_MAX_BATCHES_PER_RUN
+    settings.RETENTION_BATCH_SIZE = RetentionService._batch_size = 2
+    settings.RETENTION_MAX_BATCHES_PER_RUN = 1
+    try:
+        # Each run stops after one batch and the next one continues from its checkpoint
+        assert await RetentionService.sweep() == 2
+        assert RetentionService.get_metrics()["last_run_completed"] is False
+        checkpoint = await Database.find_one(RetentionService.CHECKPOINTS, {"_id": "events"})
+        assert checkpoint["last_id"] == ids[1]
+        assert await RetentionService.sweep() == 2
+        assert await RetentionService.sweep() == 1
+    finally:
+        settings.RETENTION_BATCH_SIZE = RetentionService._batch_size = batch_size
+        settings.RETENTION_MAX_BATCHES_PER_RUN = max_batches
+
+    archived = await Database.find_many("events", {"trigger_id": "sweep_trigger", "retention_state": "archived"})
+    assert len(archived) == 5
+
+@pytest.mark.asyncio
+async def test_archive_tier_round_trip():
+    past_time = datetime.now(timezone.utc) - timedelta(hours=3)
+    event_id = await Database.insert_one("events", {
+        "trigger_id": "cold_trigger",
+        "retention_state": "active",
+        "api_payload": {"order_id": "A-1", "items": list(range(50))},
+        "response_data": {"ok": True},
+        "created_at": past_time
+    })
+
+    settings.ARCHIVE_TIER = True
+    try:
+        await RetentionService.sweep()
+        assert await Database.find_one("events", {"_id": ObjectId(event_id)}) is None
+        cold = await Database.find_one(ArchiveTier.COLLECTION, {"_id": ObjectId(event_id)})
+        assert "api_payload" not in cold and cold["codec"] in ("zstd", "zlib")
+
+        # Reads expand the compressed fields transparently
+        archived = await EventService.get_archived_events()
+        event = next(e for e in archived if e["id"] == event_id)
+        assert event["api_payload"]["items"] == list(range(50))
+        assert event["response_data"] == {"ok": True}
+        assert event["retention_state"] == "archived"
+    finally:
+        settings.ARCHIVE_TIER = False
+
+@pytest.mark.asyncio
+async def test_deduplicated_event_bodies():
+    payload = {"fields": {f"field_{n}": "string" for n in range(30)}}
+    settings.EVENT_BLOB_DEDUP = True
+    try:
+        event_ids = [
+            await EventService.create_event(trigger_id="dedup_trigger", trigger_type="api", api_payload=payload)
+            for _ in range(3)
+        ]
+        # One blob, referenced three times; the events only carry its hash
+        blobs = await Database.find_many(BlobStore.COLLECTION, {})
+        assert len(blobs) == 1 and "refcount" not in blobs[0]
+        # The blob lives until the last referencing event's retention ends
+        retention_end = datetime.now(timezone.utc) + timedelta(hours=settings.EVENT_TOTAL_RETENTION_HOURS)
+        assert abs((blobs[0]["expires_at"].replace(tzinfo=timezone.utc) - retention_end).total_seconds()) < 60
+        stored = await Database.find_one("events", {"_id": ObjectId(event_ids[0])})
+        assert "api_payload" not in stored and stored["api_payload_ref"] == blobs[0]["id"]
+
+        recent = await EventService.get_recent_events()
+        assert all(e["api_payload"] == payload for e in recent if e["trigger_id"] == "dedup_trigger")
+    finally:
+        settings.EVENT_BLOB_DEDUP = False
+
+@pytest.mark.asyncio
+async def test_redis_cache_round_trip():
+    try:
+        await RedisCache.get_client().ping()
+    except Exception:
+        await RedisCache.close_client()
+        pytest.skip("Redis is not reachable at REDIS_URL")
+    try:
+        await RedisCache.set_cache("test:cache", {"n": 1}, expiry=1)
+        assert await RedisCache.get_cache("test:cache") == {"n": 1}
+        await RedisCache.set_many({"test:a": {"v": "a"}, "test:b": {"v": "b"}}, expiry=1)
+        assert await RedisCache.get_many(["test:a", "test:b", "test:missing"]) == {
+            "test:a": {"v": "a"},
+            "test:b": {"v": "b"},
+            "test:missing": None
+        }
+        # Entries expire after their TTL
+        await asyncio.sleep(1.2)
+        assert await RedisCache.get_cache("test:cache") is None
+    finally:
+        await RedisCache.close_client()
+    assert RedisCache._client is None
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_closes_source():
+    closed = asyncio.Event()
+
+    async def documents():
+        try:
+            for i in range(100):
+                yield {"n": i}
+        finally:
+            closed.set()
+
+    stream = _prefetch(documents(), maxsize=2)
+    assert (await stream.__anext__()) == {"n": 0}
+    # A client disconnect closes the stream before the source is exhausted
+    await stream.aclose()
+    assert closed.is_set()
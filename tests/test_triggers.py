@@ -1,11 +1,22 @@
 import pytest
+import asyncio
 from httpx import AsyncClient
 from datetime import datetime, timezone, timedelta
+from bson import ObjectId
 from app.main import app
 from app.services.database import Database
+from app.config import settings
 from app.models.trigger import TriggerCreate, TriggerType
 from app.services.trigger_service import TriggerService
-from app.utils.scheduler import execute_api_trigger
+from app.services.trigger_cache import TriggerCache
+from app.services.execution_queue import ExecutionQueue
+from app.services.dead_letters import DeadLetterService
+from app.services.http_client import HTTPClient
+from app.services.outbound_limits import OutboundLimiter, AdaptiveBulkhead, TokenBucket
+from app.services.resilience import CircuitBreaker, CircuitBreakers, CircuitOpenError, RetryPolicy, TriggerExecutionError
+from app.services.payload_validator import PayloadValidator, PayloadValidationError, is_json_schema
+from app.utils.scheduler import execute_api_trigger, rehydrate_scheduled_triggers, scheduler, poll_due_triggers, _resync_trigger_jobs
+from app.utils.timing_wheel import HierarchicalTimingWheel
 
 @pytest.fixture
 async def client():
@@ -166,4 +177,542 @@ async def test_execute_api_trigger(test_client, sample_trigger_data):
     # Execute the trigger
     payload = {"message": "test message"}
     response = test_client.post(f"/api/v1/triggers/{trigger_id}/execute", json=payload)
-    assert response.status_code == 200 
\ No newline at end of file
+    assert response.status_code == 200 
+
+@pytest.mark.asyncio
+async def test_get_triggers_page():
+    for i in range(5):
+        await Database.insert_one("triggers", {
+            "name": f"Page Trigger {i}",
+            "trigger_type": "api",
+            "is_active": True,
+            "is_deleted": False,
+            "created_at": datetime.now(timezone.utc)
+        })
+
+    seen = []
+    cursor = None
+    while True:
+        page = await TriggerService.get_triggers_page(limit=2, cursor=cursor)
+        assert len(page["items"]) <= 2
+        seen.extend(trigger["id"] for trigger in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+@pytest.mark.asyncio
+async def test_triggers_page_includes_documents_without_created_at():
+    for i in range(3):
+        await Database.insert_one("triggers", {
+            "name": f"Dated Trigger {i}",
+            "trigger_type": "api",
+            "is_active": False,
+            "is_deleted": False,
+            "created_at": datetime.now(timezone.utc)
+        })
+    for i in range(3):
+        # Stored by an old create route that never set created_at
+        await Database.insert_one("triggers", {
+            "name": f"Undated Trigger {i}",
+            "trigger_type": "api",
+            "is_deleted": False
+        })
+
+    seen = []
+    cursor = None
+    while True:
+        page = await TriggerService.get_triggers_page(limit=2, cursor=cursor, active_only=False)
+        seen.extend(trigger["id"] for trigger in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 6
+    assert len(set(seen)) == 6
+
+def test_invalid_pagination_cursor():
+    with pytest.raises(ValueError):
+        Database.decode_cursor("not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_trigger_cache():
+    trigger_id = await Database.insert_one("triggers", {
+        "name": "Cached Trigger",
+        "trigger_type": "api",
+        "is_active": True,
+        "is_deleted": False,
+        "created_at": datetime.now(timezone.utc)
+    })
+    TriggerCache.clear()
+    hits = TriggerCache.get_metrics()["hits"]
+
+    first = await TriggerService.get_trigger(trigger_id)
+    second = await TriggerService.get_trigger(trigger_id)
+    assert first == second
+    assert TriggerCache.get_metrics()["hits"] == hits + 1
+
+    # Cached copies must not leak mutations back into the cache
+    second["name"] = "Mutated"
+    assert (await TriggerService.get_trigger(trigger_id))["name"] == "Cached Trigger"
+
+    TriggerCache.invalidate(trigger_id)
+    assert TriggerCache.get(trigger_id) is None
+
+    # A fill that read the trigger before an invalidation must not be cached
+    generation = TriggerCache.generation()
+    stale = await Database.find_one("triggers", {"_id": ObjectId(trigger_id)})
+    TriggerCache.invalidate(trigger_id)
+    TriggerCache.set(trigger_id, stale, generation)
+    assert TriggerCache.get(trigger_id) is None
+
+@pytest.mark.asyncio
+async def test_trigger_routes_read_through_cache(client):
+    create_response = await client.post("/api/v1/triggers/", json={
+        "name": "Routed Cache Trigger",
+        "trigger_type": "api",
+        "api_config": {"endpoint": "https://api.example.com/test", "method": "POST", "payload_schema": {}}
+    })
+    trigger_id = create_response.json()["trigger_id"]
+    TriggerCache.clear()
+    hits = TriggerCache.get_metrics()["hits"]
+
+    assert (await client.get(f"/api/v1/triggers/{trigger_id}")).status_code == 200
+    assert (await client.get(f"/api/v1/triggers/{trigger_id}")).status_code == 200
+    assert TriggerCache.get_metrics()["hits"] == hits + 1
+
+    # Deleting through the API invalidates the cached copy
+    assert (await client.delete(f"/api/v1/triggers/{trigger_id}")).status_code == 200
+    assert (await client.get(f"/api/v1/triggers/{trigger_id}")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_rehydrate_scheduled_triggers():
+    now = datetime.now(timezone.utc)
+    trigger_id = await Database.insert_one("triggers", {
+        "name": "Rehydrated Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": {
+            "schedule_type": "recurring",
+            "interval_type": "minutes",
+            "interval_value": 10
+        },
+        "is_test": False,
+        "is_active": True,
+        "is_deleted": False,
+        "created_at": now
+    })
+    expired_id = await Database.insert_one("triggers", {
+        "name": "Expired Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": {
+            "schedule_type": "one_time",
+            "specific_date": now - timedelta(hours=1)
+        },
+        "is_test": False,
+        "is_active": True,
+        "is_deleted": False,
+        "created_at": now - timedelta(hours=2)
+    })
+    # Stored by the mounted create route before it wrote is_active/is_deleted
+    unflagged_id = await Database.insert_one("triggers", {
+        "name": "Unflagged Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": {
+            "schedule_type": "recurring",
+            "interval_type": "minutes",
+            "interval_value": 10
+        },
+        "created_at": now
+    })
+
+    await rehydrate_scheduled_triggers()
+
+    assert scheduler.get_job(f"{trigger_id}_permanent") is not None
+    assert scheduler.get_job(f"{expired_id}_permanent") is None
+    assert scheduler.get_job(f"{unflagged_id}_permanent") is not None
+
+@pytest.mark.asyncio
+async def test_resync_drops_jobs_for_triggers_deleted_while_stream_down():
+    schedule_config = {
+        "schedule_type": "recurring",
+        "interval_type": "minutes",
+        "interval_value": 10
+    }
+    kept_id = await Database.insert_one("triggers", {
+        "name": "Kept Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": schedule_config,
+        "is_active": True,
+        "is_deleted": False,
+        "created_at": datetime.now(timezone.utc)
+    })
+    await rehydrate_scheduled_triggers()
+    # Registered before the stream dropped; its document is gone by the resync
+    deleted_id = str(ObjectId())
+    scheduler.add_job(lambda: None, "interval", minutes=10, id=f"{deleted_id}_permanent")
+
+    await _resync_trigger_jobs()
+
+    assert scheduler.get_job(f"{kept_id}_permanent") is not None
+    assert scheduler.get_job(f"{deleted_id}_permanent") is None
+
+def test_timing_wheel_fires_and_cancels():
+    wheel = HierarchicalTimingWheel(tick_seconds=1, start_time=0)
+    wheel.schedule("one_time", 10)
+    wheel.schedule("far", 100000)
+    wheel.schedule("cancelled", 20)
+    wheel.schedule("repeating", 5, interval=30)
+    assert wheel.cancel("cancelled")
+
+    assert [entry.key for entry, _ in wheel.advance(9)] == ["repeating"]
+    assert [entry.key for entry, _ in wheel.advance(10)] == ["one_time"]
+    assert "one_time" not in wheel
+    # Runs missed while blocked are coalesced into one
+    assert [entry.key for entry, _ in wheel.advance(200)] == ["repeating"]
+    assert [entry.key for entry, _ in wheel.advance(100000)].count("far") == 1
+    assert len(wheel) == 1
+
+def test_timing_wheel_clear_restarts_at_now():
+    wheel = HierarchicalTimingWheel(tick_seconds=1, start_time=0)
+    wheel.schedule("stale", 10)
+    # Leadership lost and regained much later
+    wheel.clear(now=1000000)
+    assert len(wheel) == 0
+    assert wheel.current_tick == 1000000
+
+    wheel.schedule("rehydrated", 1000005)
+    assert wheel.advance(1000004) == []
+    assert [entry.key for entry, _ in wheel.advance(1000005)] == ["rehydrated"]
+
+@pytest.mark.asyncio
+async def test_poll_due_triggers():
+    now = datetime.now(timezone.utc)
+    trigger_id = await Database.insert_one("triggers", {
+        "name": "Polled Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": {
+            "schedule_type": "recurring",
+            "interval_type": "minutes",
+            "interval_value": 10
+        },
+        "is_test": False,
+        "is_active": True,
+        "is_deleted": False,
+        "created_at": now - timedelta(minutes=10),
+        "next_run_at": now - timedelta(seconds=1)
+    })
+
+    assert await poll_due_triggers() == 1
+    # Rescheduled, so a second poll finds nothing due
+    assert await poll_due_triggers() == 0
+
+    trigger = await Database.find_one("triggers", {"_id": ObjectId(trigger_id)})
+    assert trigger["next_run_at"].replace(tzinfo=timezone.utc) > now
+    assert "lease_owner" not in trigger
+    assert await Database.db.events.count_documents({"trigger_id": trigger_id}) == 1
+
+@pytest.mark.asyncio
+async def test_execution_queue_lease():
+    execution_id = await ExecutionQueue.enqueue(
+        "trigger-1",
+        {"endpoint": "https://api.example.com/test", "method": "POST"},
+        {"message": "queued"},
+        is_manual=True
+    )
+    assert (await ExecutionQueue.get_execution(execution_id))["status"] == "queued"
+
+    job = await ExecutionQueue._dequeue("worker-1")
+    assert job["id"] == execution_id
+    assert job["attempts"] == 1
+    # Leased jobs stay invisible until the visibility timeout passes
+    assert await ExecutionQueue._dequeue("worker-2") is None
+
+    await ExecutionQueue._finish(job, "worker-1", "succeeded")
+    execution = await ExecutionQueue.get_execution(execution_id)
+    assert execution["status"] == "succeeded"
+    assert "locked_by" not in execution
+
+@pytest.mark.asyncio
+async def test_execution_queue_counts_redeliveries_apart_from_retries(monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_MAX_DELIVERIES", 1)
+    execution_id = await ExecutionQueue.enqueue(
+        "trigger-1",
+        {"endpoint": "https://api.example.com/test", "method": "POST", "retry_max_attempts": 10},
+        {"message": "queued"}
+    )
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    # A retry handed back to the queue is not a redelivery
+    job = await ExecutionQueue._dequeue("worker-1")
+    await Database.update_one(
+        "execution_queue",
+        {"_id": ObjectId(execution_id)},
+        {"$set": {"status": "queued", "visible_at": past}, "$unset": {"locked_by": ""}}
+    )
+    job = await ExecutionQueue._dequeue("worker-1")
+    assert (job["attempts"], job["redeliveries"]) == (2, 0)
+
+    # An expired lease is
+    await Database.update_one("execution_queue", {"_id": ObjectId(execution_id)}, {"$set": {"visible_at": past}})
+    job = await ExecutionQueue._dequeue("worker-2")
+    assert (job["attempts"], job["redeliveries"]) == (3, 1)
+
+    await ExecutionQueue._process(job, "worker-2")
+    assert (await ExecutionQueue.get_execution(execution_id))["status"] == "failed"
+    event = await Database.find_one("events", {"trigger_id": "trigger-1"})
+    assert event["status"] == "failed"
+    assert event["error_message"] == "Exceeded maximum deliveries"
+
+@pytest.mark.asyncio
+async def test_outbound_limiter_queues_over_limit():
+    api_config = {"max_concurrency": 2, "rate_limit_per_second": 100, "rate_limit_burst": 5}
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with OutboundLimiter.limit("limited-trigger", "https://api.example.com/hook", api_config):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    # Calls over the limits wait their turn instead of being dropped
+    await asyncio.gather(*(call() for _ in range(10)))
+    assert peak == 2
+    metrics = OutboundLimiter.get_metrics()
+    assert metrics["hosts"]["api.example.com"]["acquired"] >= 10
+    assert metrics["rate_limited"] >= 5
+
+@pytest.mark.asyncio
+async def test_adaptive_bulkhead_aimd():
+    bulkhead = AdaptiveBulkhead(4)
+    for _ in range(4):
+        await bulkhead.acquire()
+
+    # A saturated limit grows by one per window of successful calls
+    for _ in range(4):
+        bulkhead.record(10.0, overloaded=False, failed=False)
+    assert bulkhead.limit == 5
+
+    # An overload signal backs off multiplicatively, once per cooldown
+    bulkhead.record(10.0, overloaded=True, failed=True)
+    bulkhead.record(10.0, overloaded=True, failed=True)
+    assert bulkhead.limit == 2
+    assert bulkhead.get_metrics()["decreases"] == 1
+
+def test_adaptive_host_limit_capped_by_connections_per_host(monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_CONCURRENCY_ENABLED", True)
+    bulkhead = OutboundLimiter._host_bulkhead("capped.example.com")
+    assert bulkhead.limit == bulkhead.max_limit == settings.HTTP_MAX_CONNECTIONS_PER_HOST
+
+@pytest.mark.asyncio
+async def test_cancelled_rate_limit_wait_returns_its_token():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    await bucket.acquire()
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert bucket.waiting == 0
+    assert bucket.tokens > -0.5
+
+def test_idle_hosts_pruned_at_cap(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOUND_LIMITER_MAX_HOSTS", 2)
+    monkeypatch.setattr(OutboundLimiter, "_hosts", {})
+    OutboundLimiter._host_bulkhead("a.example.com")
+    busy = OutboundLimiter._host_bulkhead("b.example.com")
+    busy.active = 1
+    OutboundLimiter._host_bulkhead("c.example.com")
+    assert set(OutboundLimiter._hosts) == {"b.example.com", "c.example.com"}
+
+def test_retry_backoff_and_circuit_breaker():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=5.0)
+    for attempt in range(1, 6):
+        assert 0 <= policy.backoff(attempt) <= min(5.0, 2 ** (attempt - 1))
+
+    breaker = CircuitBreaker("api.example.com")
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # After the reset window one probe goes through and a success closes the circuit
+    breaker.opened_at -= settings.CIRCUIT_RESET_SECONDS
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_half_open_circuit(monkeypatch):
+    api_config = {"endpoint": "https://probe.example.com/test", "method": "POST", "payload_schema": {}}
+    breaker = CircuitBreakers.for_url(api_config["endpoint"])
+    breaker.state = "half_open"
+
+    async def hang(**kwargs):
+        await asyncio.sleep(3600)
+    monkeypatch.setattr(HTTPClient, "request", hang)
+
+    probe = asyncio.create_task(execute_api_trigger("trigger-1", api_config))
+    await asyncio.sleep(0.05)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    # The next call is let through as the probe instead of being rejected forever
+    breaker.before_call()
+
+@pytest.mark.asyncio
+async def test_local_error_does_not_close_half_open_circuit(monkeypatch):
+    api_config = {"endpoint": "https://local-error.example.com/test", "method": "POST", "payload_schema": {}}
+    breaker = CircuitBreakers.for_url(api_config["endpoint"])
+    breaker.state = "half_open"
+
+    async def broken(**kwargs):
+        raise TypeError("Object of type object is not JSON serializable")
+    monkeypatch.setattr(HTTPClient, "request", broken)
+
+    with pytest.raises(TriggerExecutionError):
+        await execute_api_trigger("trigger-1", api_config, max_attempts=1, is_test=True)
+    assert breaker.state == "half_open"
+    # The probe slot is free for the next call
+    breaker.before_call()
+
+@pytest.mark.asyncio
+async def test_redrive_dead_letters():
+    api_config = {"endpoint": "https://api.example.com/test", "method": "POST", "payload_schema": {}}
+    for i in range(3):
+        await DeadLetterService.record("trigger-1", api_config, {"n": i}, "503 Service Unavailable", 3)
+
+    result = await ExecutionQueue.redrive_dead_letters(trigger_id="trigger-1", rate_per_second=10)
+    assert result["redriven"] == 3
+    assert await DeadLetterService.count("trigger-1") == 0
+    # Already redriven dead letters are not queued again
+    assert (await ExecutionQueue.redrive_dead_letters(trigger_id="trigger-1"))["redriven"] == 0
+
+    jobs = await Database.find_many("execution_queue", {"trigger_id": "trigger-1"}, sort=[("visible_at", 1)])
+    assert [job["payload"]["n"] for job in jobs] == [0, 1, 2]
+    # Staggered 1/rate apart
+    assert (jobs[2]["visible_at"] - jobs[0]["visible_at"]).total_seconds() == pytest.approx(0.2, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_failed_redrive_releases_claim(monkeypatch):
+    api_config = {"endpoint": "https://api.example.com/test", "method": "POST", "payload_schema": {}}
+    for i in range(2):
+        await DeadLetterService.record("trigger-1", api_config, {"n": i}, "503 Service Unavailable", 3)
+
+    async def failing_insert_many(*args, **kwargs):
+        raise ConnectionError("connection reset")
+    monkeypatch.setattr(Database, "insert_many", failing_insert_many)
+
+    with pytest.raises(ConnectionError):
+        await ExecutionQueue.redrive_dead_letters(trigger_id="trigger-1")
+    # Nothing was queued, so the dead letters are still there to redrive
+    assert await DeadLetterService.count("trigger-1") == 2
+
+def test_payload_validator_cache():
+    legacy = {"amount": "float", "customer": {"email": "str"}}
+    validator = PayloadValidator.get("trigger-1", "v1", legacy)
+    assert validator({"amount": 1, "customer": {"email": "a@example.com"}}) == []
+    assert validator({"amount": True, "customer": {}}) == ["amount: expected float", "customer.email: is required"]
+    # Same trigger version reuses the compiled validator; an update recompiles
+    assert PayloadValidator.get("trigger-1", "v1", legacy) is validator
+    assert PayloadValidator.get("trigger-1", "v2", legacy) is not validator
+
+    json_schema = {"type": "object", "properties": {"n": {"type": "integer"}}, "required": ["n"]}
+    with pytest.raises(PayloadValidationError):
+        PayloadValidator.validate("trigger-2", "v1", json_schema, {"n": "1"})
+    PayloadValidator.validate("trigger-2", "v1", json_schema, {"n": 1})
+
+    # Legacy maps with fields named "type" or "properties" stay legacy
+    assert not is_json_schema({"type": "object", "name": "str"})
+    assert not is_json_schema({"properties": "dict"})
+    assert not is_json_schema({"type": "str"})
+    assert not is_json_schema({"type": "string"})
+    assert not is_json_schema({"type": "integer"})
+    PayloadValidator.validate("trigger-4", "v1", {"type": "string"}, {"type": "a"})
+    with pytest.raises(PayloadValidationError):
+        PayloadValidator.validate("trigger-4", "v1", {"type": "string"}, {"type": 1})
+    assert is_json_schema({"$schema": "http://json-schema.org/draft-07/schema#", "type": "object"})
+    PayloadValidator.validate("trigger-3", "v1", {"type": "object", "name": "str"}, {"type": {}, "name": "a"})
+
+@pytest.mark.asyncio
+async def test_poll_trigger_created_through_api(client):
+    settings.SCHEDULER_ENGINE = "polling"
+    try:
+        response = await client.post("/api/v1/triggers/", json={
+            "name": "Polled API Trigger",
+            "trigger_type": "scheduled",
+            "schedule_config": {
+                "schedule_type": "recurring",
+                "interval_type": "minutes",
+                "interval_value": 10
+            }
+        })
+        assert response.status_code == 200
+        trigger_id = response.json()["trigger_id"]
+
+        trigger = await Database.find_one("triggers", {"_id": ObjectId(trigger_id)})
+        assert trigger["is_active"] is True and trigger["next_run_at"] is not None
+
+        # Make it due and check the poller claims it
+        await Database.update_one(
+            "triggers",
+            {"_id": ObjectId(trigger_id)},
+            {"$set": {"next_run_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+        )
+        assert await poll_due_triggers() == 1
+    finally:
+        settings.SCHEDULER_ENGINE = "apscheduler"
+
+@pytest.mark.asyncio
+async def test_api_process_stores_scheduled_test_trigger(client, monkeypatch):
+    monkeypatch.setattr(settings, "PROCESS_ROLE", "api")
+    response = await client.post("/api/v1/triggers/test", json={
+        "name": "API Role Test Trigger",
+        "trigger_type": "scheduled",
+        "schedule_config": {
+            "schedule_type": "one_time",
+            "interval_type": "minutes",
+            "interval_value": 1
+        }
+    })
+    assert response.status_code == 200
+    # Stored so the worker's change stream registers it
+    trigger = await Database.find_one("triggers", {"name": "API Role Test Trigger"})
+    assert trigger["is_test"] is True and trigger["is_active"] is True
+
+@pytest.mark.asyncio
+async def test_execute_without_payload_checks_required_fields(client):
+    create_response = await client.post("/api/v1/triggers/", json={
+        "name": "Required Payload Trigger",
+        "trigger_type": "api",
+        "api_config": {
+            "endpoint": "https://api.example.com/test",
+            "method": "POST",
+            "payload_schema": {"type": "object", "required": ["order_id"]}
+        }
+    })
+    trigger_id = create_response.json()["trigger_id"]
+
+    response = await client.post(f"/api/v1/triggers/{trigger_id}/execute")
+    assert response.status_code == 422
+    assert response.json()["detail"]
+
+    # Schemas are still compiled before the trigger is stored
+    bad_response = await client.post("/api/v1/triggers/", json={
+        "name": "Bad Schema Trigger",
+        "trigger_type": "api",
+        "api_config": {
+            "endpoint": "https://api.example.com/test",
+            "method": "POST",
+            "payload_schema": {"type": "object", "properties": {"n": {"pattern": "("}}}
+        }
+    })
+    assert bad_response.status_code == 400